@@ -5,9 +5,21 @@ Ce module fournit des fonctions pour convertir une grille NoriNori
 en formule CNF au format DIMACS, en utilisant les règles définies dans
 le module regles.py.
 """
-from typing import List, Optional
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+import io
+import logging
 from Module.NoriGrid import NoriGrid
-from Module.regles import premiere_regle, deuxieme_regle, nombre_variables
+from Module.regles import (COMMENTAIRE_REGLE_1, COMMENTAIRE_REGLE_2, clauses_premiere_regle,
+                           clauses_deuxieme_regle, formater_clause, nombre_variables)
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT
+
+
+logger = logging.getLogger(__name__)
+
+# Largeur réservée au nombre de clauses dans l'en-tête, complété après l'écriture
+LARGEUR_NOMBRE_CLAUSES: int = 20
+# Nombre de lignes regroupées avant chaque écriture dans le fichier
+TAILLE_LOT: int = 4096
 
 
 def calculer_nombre_clauses(contenu_dimacs: str) -> int:
@@ -23,52 +35,121 @@ def calculer_nombre_clauses(contenu_dimacs: str) -> int:
     return len([ligne for ligne in contenu_dimacs.strip().split('\n') 
                 if ligne and not ligne.startswith('c')])
 
-def generer_dimacs(grille: NoriGrid) -> str:
+def _sections(grille: NoriGrid, encodage: str) -> List[Tuple[str, Iterator[List[int]]]]:
+    """Associe à chaque règle son commentaire et le générateur de ses clauses."""
+    return [
+        (COMMENTAIRE_REGLE_2, clauses_deuxieme_regle(grille)),
+        (COMMENTAIRE_REGLE_1, clauses_premiere_regle(grille, encodage)),
+    ]
+
+def generer_clauses(grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT) -> Iterator[List[int]]:
+    """
+    Produit toutes les clauses de la grille sous forme de listes d'entiers.
+    
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé pour la première règle
+        
+    Returns:
+        Un itérateur sur les clauses des deux règles
+    """
+    for _, clauses in _sections(grille, encodage):
+        yield from clauses
+
+def ecrire_clauses(f: IO[str], clauses: Iterable[List[int]], taille_lot: int = TAILLE_LOT) -> int:
+    """
+    Écrit des clauses au format DIMACS par lots de lignes.
+    
+    Args:
+        f: Fichier (ou tampon texte) de destination
+        clauses: Les clauses à écrire
+        taille_lot: Nombre de lignes regroupées par écriture
+        
+    Returns:
+        Le nombre de clauses écrites
+    """
+    nombre: int = 0
+    lot: List[str] = []
+    for clause in clauses:
+        lot.append(formater_clause(clause))
+        if len(lot) >= taille_lot:
+            f.write("\n".join(lot))
+            f.write("\n")
+            nombre += len(lot)
+            lot.clear()
+    if lot:
+        f.write("\n".join(lot))
+        f.write("\n")
+        nombre += len(lot)
+    return nombre
+
+def _commentaire_entete(grille: NoriGrid) -> str:
+    return f"c Fichier DIMACS CNF pour un puzzle NoriNori de taille {grille.width}x{grille.height}\n"
+
+def generer_dimacs(grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT) -> str:
     """
     Génère le contenu complet du fichier DIMACS pour la grille donnée.
     
+    Pour les grandes grilles, préférer ecrire_dimacs qui écrit directement
+    dans un fichier sans construire le contenu en mémoire.
+    
     Args:
         grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé pour la première règle
         
     Returns:
         Le contenu complet du fichier DIMACS
     """
-    # Générer les clauses pour les deux règles
-    clauses_regle1: str = premiere_regle(grille)
-    clauses_regle2: str = deuxieme_regle(grille)
+    contenu: io.StringIO = io.StringIO()
+    num_clauses: int = 0
+    for commentaire, clauses in _sections(grille, encodage):
+        contenu.write(commentaire + "\n")
+        num_clauses += ecrire_clauses(contenu, clauses)
     
-    # Concaténer les clauses
-    contenu_clauses: str = clauses_regle2 + clauses_regle1
-    
-    # Calculer le nombre de variables et de clauses
-    num_vars: int = nombre_variables(grille)
-    num_clauses: int = calculer_nombre_clauses(contenu_clauses)
+    # Calculer le nombre de variables
+    num_vars: int = nombre_variables(grille, encodage)
     
     # Construire l'en-tête du fichier DIMACS
-    en_tete: str = (
-        f"c Fichier DIMACS CNF pour un puzzle NoriNori de taille {grille.width}x{grille.height}\n"
-        f"p cnf {num_vars} {num_clauses}\n"
-    )
+    en_tete: str = _commentaire_entete(grille) + f"p cnf {num_vars} {num_clauses}\n"
     
-    return en_tete + contenu_clauses
+    return en_tete + contenu.getvalue()
 
-def ecrire_dimacs(grille: NoriGrid, chemin_fichier: str = 'clauses.cnf') -> None:
+def ecrire_dimacs(grille: NoriGrid, chemin_fichier: str = 'clauses.cnf',
+                  encodage: str = ENCODAGE_PAR_DEFAUT) -> None:
     """
     Écrit un fichier DIMACS pour la grille NoriNori donnée.
+    
+    Les clauses sont produites et écrites au fil de l'eau : la mémoire utilisée
+    ne dépend pas du nombre de clauses. Le nombre de clauses de la ligne
+    « p cnf » est réservé puis complété une fois toutes les clauses écrites.
+    
     Args:
         grille: Une grille où chaque cellule contient l'identifiant de sa région
         chemin_fichier: Chemin où écrire le fichier DIMACS (par défaut: 'clauses.cnf')
+        encodage: L'encodage de cardinalité utilisé pour la première règle
         
     Raises:
         IOError: Si l'écriture du fichier échoue
     """
+    num_vars: int = nombre_variables(grille, encodage)
     
     try:
         with open(chemin_fichier, 'w', encoding='utf-8') as f:
-            f.write(generer_dimacs(grille))
-        print(f"Fichier DIMACS écrit avec succès: {chemin_fichier}")
+            f.write(_commentaire_entete(grille))
+            position_entete: int = f.tell()
+            f.write(f"p cnf {num_vars} {'':<{LARGEUR_NOMBRE_CLAUSES}}\n")
+            
+            num_clauses: int = 0
+            for commentaire, clauses in _sections(grille, encodage):
+                f.write(commentaire + "\n")
+                num_clauses += ecrire_clauses(f, clauses)
+            
+            # Compléter l'en-tête avec le nombre de clauses
+            f.seek(position_entete)
+            f.write(f"p cnf {num_vars} {num_clauses:<{LARGEUR_NOMBRE_CLAUSES}}")
+        logger.info("Fichier DIMACS écrit avec succès: %s", chemin_fichier)
     except IOError as e:
-        print(f"Erreur lors de l'écriture du fichier DIMACS: {e}")
+        logger.error("Erreur lors de l'écriture du fichier DIMACS: %s", e)
         raise
 
 def valider_grille(Nori: NoriGrid) -> bool:
@@ -84,7 +165,7 @@ def valider_grille(Nori: NoriGrid) -> bool:
     Raises:
         ValueError: Si la grille est invalide
     """
-    if not Nori.grid:
+    if Nori.height == 0:
         raise ValueError("La grille est vide")
     
     height: int = Nori.height
@@ -93,25 +174,28 @@ def valider_grille(Nori: NoriGrid) -> bool:
     if width == 0:
         raise ValueError("La grille a une largeur de 0")
     
-    # Vérifier que toutes les lignes ont la même longueur
-    for row in Nori.grid:
-        if len(row) != width:
-            raise ValueError("Les lignes de la grille n'ont pas toutes la même longueur")
+    # Vérifier que toutes les lignes ont la même longueur (garanti en représentation compacte)
+    if not Nori.is_compact:
+        for row in Nori.grid:
+            if len(row) != width:
+                raise ValueError("Les lignes de la grille n'ont pas toutes la même longueur")
     
     # Vérifier que chaque région a au moins 2 cellules
-    for region_id, count in Nori.regions.items():
+    for region_id, count in Nori.iter_regions():
         if len(count) < 2:
             raise ValueError(f"La région {region_id} a seulement {len(count)} cellule(s)")
     
     return True
 
-def convertir_grille(grille: List[List[int]], chemin_fichier: Optional[str] = None) -> str:
+def convertir_grille(grille: List[List[int]], chemin_fichier: Optional[str] = None,
+                     encodage: str = ENCODAGE_PAR_DEFAUT) -> str:
     """
     Convertit une grille NoriNori en fichier DIMACS et retourne le contenu.
     
     Args:
         grille: Une grille où chaque cellule contient l'identifiant de sa région
         chemin_fichier: Chemin où écrire le fichier DIMACS (optionnel)
+        encodage: L'encodage de cardinalité utilisé pour la première règle
         
     Returns:
         Le contenu du fichier DIMACS
@@ -123,16 +207,16 @@ def convertir_grille(grille: List[List[int]], chemin_fichier: Optional[str] = No
     valider_grille(grille)
     
     # Générer le contenu DIMACS
-    contenu_dimacs: str = generer_dimacs(grille)
+    contenu_dimacs: str = generer_dimacs(grille, encodage)
     
     # Écrire le fichier si un chemin est spécifié
     if chemin_fichier:
         try:
             with open(chemin_fichier, 'w', encoding='utf-8') as f:
                 f.write(contenu_dimacs)
-            print(f"Fichier DIMACS écrit avec succès: {chemin_fichier}")
+            logger.info("Fichier DIMACS écrit avec succès: %s", chemin_fichier)
         except IOError as e:
-            print(f"Erreur lors de l'écriture du fichier DIMACS: {e}")
+            logger.error("Erreur lors de l'écriture du fichier DIMACS: %s", e)
             raise
     
     return contenu_dimacs
@@ -1,17 +1,49 @@
+import logging
 import random
-from typing import List, Dict, Tuple, Optional
+import struct
+from array import array
+from typing import List, Dict, Iterator, Tuple, Optional
+
+# En-tête de la forme sérialisée : largeur, hauteur (entiers non signés 16 bits)
+_ENTETE = struct.Struct('<HH')
+# Plus grand identifiant de région stocké sur 16 bits ('H'), au-delà 32 bits ('I')
+_MAX_ID_16_BITS: int = 0xFFFF
+
+
+def _type_identifiants(max_id: int) -> str:
+    """Type des tableaux d'identifiants de régions : 'H' si possible, 'I' sinon."""
+    return 'H' if max_id <= _MAX_ID_16_BITS else 'I'
+
+logger = logging.getLogger(__name__)
 
 class NoriGrid:
-    def __init__(self, width: int, height: int, num_regions: Optional[int] = None) -> None:
+    """
+    Grille NoriNori, stockée sous l'une de deux représentations :
+    
+    - listes (par défaut) : ``grid`` est une liste de lignes et ``regions`` un
+      dictionnaire région -> liste de tuples (row, col) ;
+    - compacte (après ``compact()``) : un tableau plat ``array('H')`` cellule ->
+      région (``array('I')`` si un identifiant dépasse 65535), et un index de
+      type CSR région -> indices plats des cellules.
+    
+    Les accesseurs (get_cell_region, get_region_cells, iter_regions,
+    cell_regions, printGrid) fonctionnent avec les deux représentations. En
+    représentation compacte, ``grid`` et ``regions`` sont reconstruits à
+    chaque accès : les modifier n'a aucun effet sur la grille.
+    """
+    __slots__ = ('width', 'height', '_grid', '_regions',
+                 '_cells', '_region_ids', '_region_ptr', '_region_cells')
+    
+    def __init__(self, width: int, height: int, num_regions: Optional[int] = None,
+                 compact: bool = False) -> None:
+        self._init_layout(width, height)
         self.grid: list[list[int]] = []
-        self.height = height
-        self.width = width
         # Dictionnaire qui stocke les cellules de chaque région
         # Clé: identifiant de région, Valeur: liste de tuples (row, col)
         self.regions: Dict[int, List[Tuple[int, int]]] = {}
         
         if (self.height <= 0 or self.width <= 0 or self.height * self.width != self.height**2):
-            print("error: invalid grid size")
+            logger.error("invalid grid size: %dx%d", width, height)
             
             
         # Initialiser la grille avec des zéros (cellules non assignées)
@@ -40,9 +72,196 @@ class NoriGrid:
         
         # Vérifier que toutes les régions ont au moins 2 cellules
         self._validate_regions()
+        
+        if compact:
+            self.compact()
+    
+    def _init_layout(self, width: int, height: int) -> None:
+        """Initialise tous les attributs (représentation listes, vide)."""
+        self.width = width
+        self.height = height
+        self._grid: Optional[List[List[int]]] = []
+        self._regions: Optional[Dict[int, List[Tuple[int, int]]]] = {}
+        self._cells: Optional[array] = None
+        self._region_ids: Optional[array] = None
+        self._region_ptr: Optional[array] = None
+        self._region_cells: Optional[array] = None
+    
+    @property
+    def is_compact(self) -> bool:
+        """Indique si la grille utilise la représentation compacte."""
+        return self._cells is not None
+    
+    @property
+    def grid(self) -> List[List[int]]:
+        """La grille sous forme de liste de lignes d'identifiants de régions."""
+        if self._grid is not None:
+            return self._grid
+        width = self.width
+        return [self._cells[i * width:(i + 1) * width].tolist() for i in range(self.height)]
+    
+    @grid.setter
+    def grid(self, grid: List[List[int]]) -> None:
+        self._expand()
+        self._grid = grid
+    
+    @property
+    def regions(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Dictionnaire région -> liste des cellules (row, col)."""
+        if self._regions is not None:
+            return self._regions
+        return dict(self.iter_regions())
+    
+    @regions.setter
+    def regions(self, regions: Dict[int, List[Tuple[int, int]]]) -> None:
+        self._expand()
+        self._regions = regions
+    
+    def compact(self) -> None:
+        """
+        Passe à la représentation compacte : un tableau plat cellule -> région
+        (array('H'), ou array('I') si un identifiant dépasse 65535) et un index
+        CSR région -> cellules, sans listes ni tuples. L'ordre des régions et
+        des cellules de chaque région est conservé.
+        """
+        if self.is_compact:
+            return
+        width = self.width
+        code: str = _type_identifiants(max(self._regions, default=0))
+        self._cells = array(code, (region_id for row in self._grid for region_id in row))
+        self._region_ids = array(code, self._regions.keys())
+        # Les cellules de la région d'identifiant r sont
+        # _region_cells[_region_ptr[r]:_region_ptr[r + 1]]
+        self._region_ptr = array('I', bytes(4 * (max(self._region_ids, default=0) + 2)))
+        self._region_cells = array('I')
+        for region_id in sorted(self._region_ids):
+            self._region_cells.extend(r * width + c for r, c in self._regions[region_id])
+            self._region_ptr[region_id + 1] = len(self._region_cells)
+        # Les identifiants absents ont une plage vide
+        for region_id in range(1, len(self._region_ptr)):
+            if self._region_ptr[region_id] < self._region_ptr[region_id - 1]:
+                self._region_ptr[region_id] = self._region_ptr[region_id - 1]
+        self._grid = None
+        self._regions = None
+    
+    def _expand(self) -> None:
+        """Repasse à la représentation listes (avant une modification de la grille)."""
+        if not self.is_compact:
+            return
+        grid = self.grid
+        regions = dict(self.iter_regions())
+        self._init_layout(self.width, self.height)
+        self._grid = grid
+        self._regions = regions
+    
+    def iter_regions(self) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+        """
+        Parcourt les régions dans leur ordre de création.
+        
+        Returns:
+            Un itérateur de couples (identifiant de région, liste de cellules (row, col))
+        """
+        if self._regions is not None:
+            yield from self._regions.items()
+            return
+        for region_id in self._region_ids:
+            yield region_id, self.get_region_cells(region_id)
+    
+    def cell_regions(self) -> array:
+        """
+        Retourne les identifiants de régions de toutes les cellules, ligne par ligne.
+        
+        Returns:
+            Un tableau plat array('H'), ou array('I') si un identifiant dépasse
+            65535 (partagé avec la grille en représentation compacte)
+        """
+        if self._cells is not None:
+            return self._cells
+        code: str = _type_identifiants(max(self._regions, default=0))
+        return array(code, (region_id for row in self._grid for region_id in row))
+    
+    def regions_plates(self) -> Tuple[array, array, array]:
+        """
+        Retourne les régions sous forme de tableaux plats, dans leur ordre de création.
+        
+        Returns:
+            Un triplet (identifiants des régions, au format de cell_regions ;
+            tailles des régions ; indices plats ``row * width + col`` des
+            cellules concaténés région par région)
+        """
+        tailles: array = array('I')
+        cellules: array = array('I')
+        if self._regions is not None:
+            ids: array = array(_type_identifiants(max(self._regions, default=0)))
+            width: int = self.width
+            for region_id, cells in self._regions.items():
+                ids.append(region_id)
+                tailles.append(len(cells))
+                cellules.extend(r * width + c for r, c in cells)
+            return ids, tailles, cellules
+        ids = array(self._region_ids.typecode)
+        for region_id in self._region_ids:
+            debut: int = self._region_ptr[region_id]
+            fin: int = self._region_ptr[region_id + 1]
+            ids.append(region_id)
+            tailles.append(fin - debut)
+            cellules.extend(self._region_cells[debut:fin])
+        return ids, tailles, cellules
+    
+    @classmethod
+    def from_grid(cls, grid: List[List[int]], compact: bool = False) -> "NoriGrid":
+        """
+        Construit une grille à partir d'identifiants de régions existants.
+        
+        Args:
+            grid: Liste de lignes, chaque cellule contenant l'identifiant de sa région
+            compact: Utiliser la représentation compacte
+            
+        Returns:
+            La grille correspondante (les régions ne sont ni générées ni fusionnées)
+        """
+        nori = cls.__new__(cls)
+        nori._init_layout(len(grid[0]) if grid else 0, len(grid))
+        nori._grid = [list(row) for row in grid]
+        for i, row in enumerate(nori._grid):
+            for j, region_id in enumerate(row):
+                nori._regions.setdefault(region_id, []).append((i, j))
+        if compact:
+            nori.compact()
+        return nori
+    
+    def to_bytes(self) -> bytes:
+        """
+        Sérialise la grille sous une forme compacte.
+        
+        Returns:
+            La largeur et la hauteur suivies des identifiants de régions
+            (16 bits, ou 32 bits si un identifiant dépasse 65535, ligne par ligne)
+        """
+        return _ENTETE.pack(self.width, self.height) + self.cell_regions().tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, compact: bool = False) -> "NoriGrid":
+        """
+        Reconstruit une grille sérialisée par to_bytes.
+        
+        Args:
+            data: La forme sérialisée de la grille
+            compact: Utiliser la représentation compacte
+            
+        Returns:
+            La grille correspondante
+        """
+        width, height = _ENTETE.unpack_from(data)
+        # La taille des identifiants se déduit de la longueur des données
+        cells = array('I' if len(data) - _ENTETE.size > 2 * width * height else 'H')
+        cells.frombytes(data[_ENTETE.size:])
+        return cls.from_grid([cells[i * width:(i + 1) * width].tolist() for i in range(height)],
+                             compact)
     
     def _validate_regions(self) -> None:
         """Vérifie que toutes les régions ont au moins 2 cellules."""
+        self._expand()
         invalid_regions = []
         for region_id, cells in self.regions.items():
             if len(cells) < 2:
@@ -82,78 +301,100 @@ class NoriGrid:
         """
         Génère des régions aléatoires dans la grille.
         
+        L'état des cellules est gardé dans un tableau plat et la frontière de
+        la région en croissance est maintenue de façon incrémentale : la
+        génération est linéaire en nombre de cellules. Pour une même graine,
+        les appels au module random (et donc les régions produites) sont
+        identiques à ceux de l'algorithme d'origine.
+        
         Args:
             num_regions: Le nombre souhaité de régions
         """
+        self._expand()
+        height, width = self.height, self.width
         # S'assurer que le nombre de régions est sensé
-        total_cells = self.width * self.height
+        total_cells = width * height
         max_regions = total_cells // 2  # Besoin d'au moins 2 cellules par région
         num_regions = min(num_regions, max_regions)
         
         # Initialiser le dictionnaire des régions
         self.regions = {}
         
-        # Garder trace des cellules déjà assignées
-        unassigned_cells = [(i, j) for i in range(self.height) for j in range(self.width)]
-        random.shuffle(unassigned_cells)
+        # Ordre aléatoire des cellules ; les cellules sont prises depuis la fin
+        order = [(i, j) for i in range(height) for j in range(width)]
+        random.shuffle(order)
+        # assigned[r * width + c] vaut 1 si la cellule appartient déjà à une région
+        assigned = bytearray(total_cells)
+        remaining = total_cells
+        end = len(order)
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        
+        def pop_unassigned() -> Tuple[int, int]:
+            """Retire la dernière cellule non assignée dans l'ordre aléatoire."""
+            nonlocal end, remaining
+            end -= 1
+            while assigned[order[end][0] * width + order[end][1]]:
+                end -= 1
+            cell = order[end]
+            assigned[cell[0] * width + cell[1]] = 1
+            remaining -= 1
+            return cell
+        
+        def free_neighbors(r: int, c: int) -> List[Tuple[int, int]]:
+            """Voisins non assignés d'une cellule, dans l'ordre des directions."""
+            neighbors = []
+            for dr, dc in directions:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < height and 0 <= nc < width and not assigned[nr * width + nc]:
+                    neighbors.append((nr, nc))
+            return neighbors
         
         for region_id in range(1, num_regions + 1):
             # Choisir une taille pour cette région (entre 2 et 6 cellules)
-            if len(unassigned_cells) < 2:
+            if remaining < 2:
                 break  # or handle appropriately
-            region_size = random.randint(2, min(6, len(unassigned_cells)))
-
+            region_size = random.randint(2, min(6, remaining))
             
-            # Si pas assez de cellules restantes, terminer
-            if len(unassigned_cells) < region_size:
-                break
-                
             # Initialiser la liste des cellules de cette région
             self.regions[region_id] = []
                 
             # Sélectionner la première cellule de cette région
-            seed_cell = unassigned_cells.pop()
-            current_region = [seed_cell]
+            seed_cell = pop_unassigned()
             self.grid[seed_cell[0]][seed_cell[1]] = region_id
             self.regions[region_id].append(seed_cell)
             
+            # Frontière : voisins non assignés de chaque cellule de la région,
+            # dans l'ordre d'ajout des cellules (un voisin commun apparaît
+            # plusieurs fois, ce qui augmente sa probabilité d'être choisi)
+            candidates = free_neighbors(*seed_cell)
+            
             # Grandir la région à partir de la cellule de départ
             for _ in range(region_size - 1):
-                # Trouver des cellules adjacentes non assignées à une région existante
-                candidates = []
-                for cell in current_region:
-                    r, c = cell
-                    neighbors = []
-                    # Vérifier les 4 directions
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nr, nc = r + dr, c + dc
-                        if (0 <= nr < self.height and 0 <= nc < self.width and 
-                            (nr, nc) in unassigned_cells):
-                            neighbors.append((nr, nc))
-                    candidates.extend(neighbors)
-                
-                # S'il n'y a plus de cellules adjacentes disponibles, chercher n'importe quelle cellule
+                # S'il n'y a plus de cellules adjacentes disponibles, on arrête
                 if not candidates:
-                    # Si on ne peut pas grandir la région davantage, on arrête
                     break
                 
                 # Sélectionner une cellule adjacente au hasard
                 next_cell = random.choice(candidates)
-                unassigned_cells.remove(next_cell)
-                current_region.append(next_cell)
+                assigned[next_cell[0] * width + next_cell[1]] = 1
+                remaining -= 1
                 self.grid[next_cell[0]][next_cell[1]] = region_id
                 self.regions[region_id].append(next_cell)
+                
+                # Mettre à jour la frontière
+                candidates = [cell for cell in candidates if cell != next_cell]
+                candidates.extend(free_neighbors(*next_cell))
         
         # S'il reste des cellules non assignées, les ajouter à des régions existantes
-        while unassigned_cells:
-            cell = unassigned_cells.pop()
-            r, c = cell
+        existing_regions = None
+        while remaining:
+            r, c = pop_unassigned()
             
             # Chercher des régions adjacentes
             adjacent_regions = set()
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            for dr, dc in directions:
                 nr, nc = r + dr, c + dc
-                if (0 <= nr < self.height and 0 <= nc < self.width and 
+                if (0 <= nr < height and 0 <= nc < width and 
                     self.grid[nr][nc] > 0):
                     adjacent_regions.add(self.grid[nr][nc])
             
@@ -162,7 +403,8 @@ class NoriGrid:
                 chosen_region = random.choice(list(adjacent_regions))
             else:
                 # Sinon, choisir n'importe quelle région existante
-                existing_regions = list(self.regions.keys())
+                if existing_regions is None:
+                    existing_regions = list(self.regions.keys())
                 chosen_region = random.choice(existing_regions)
                 
             # Ajouter cette cellule à la région choisie
@@ -171,16 +413,23 @@ class NoriGrid:
    
     def printGrid(self) -> None:
         """Affiche la grille et des informations sur les régions."""
-        for i in range(self.height):
+        for row in self.grid:
             # Affiche chaque élément avec alignement fixe
-            print(f"{self.grid[i]}")
+            print(f"{row}")
         
         # Afficher des statistiques sur les régions
         print("\nInformations sur les régions:")
-        print(f"Nombre total de régions: {len(self.regions)}")
-        for region_id, cells in self.regions.items():
+        print(f"Nombre total de régions: {self.num_regions}")
+        for region_id, cells in self.iter_regions():
             print(f"Région {region_id}: {len(cells)} cellules")
     
+    @property
+    def num_regions(self) -> int:
+        """Le nombre de régions de la grille."""
+        if self._regions is not None:
+            return len(self._regions)
+        return len(self._region_ids)
+    
     def get_region_cells(self, region_id: int) -> List[Tuple[int, int]]:
         """
         Récupère toutes les cellules d'une région spécifique.
@@ -191,9 +440,13 @@ class NoriGrid:
         Returns:
             Une liste de coordonnées (row, col) des cellules dans cette région
         """
-        if region_id in self.regions:
-            return self.regions[region_id]
-        return []
+        if self._regions is not None:
+            return self._regions.get(region_id, [])
+        if not 0 <= region_id < len(self._region_ptr) - 1:
+            return []
+        width = self.width
+        return [divmod(cell, width) for cell in
+                self._region_cells[self._region_ptr[region_id]:self._region_ptr[region_id + 1]]]
     
     def get_cell_region(self, row: int, col: int) -> int:
         """
@@ -207,8 +460,69 @@ class NoriGrid:
             L'identifiant de la région, ou 0 si hors limites
         """
         if 0 <= row < self.height and 0 <= col < self.width:
-            return self.grid[row][col]
+            if self._cells is not None:
+                return self._cells[row * self.width + col]
+            return self._grid[row][col]
         return 0
+    
+    def count_solutions(self, limit: Optional[int] = 2, encodage: Optional[str] = None,
+                        time_limit: Optional[float] = None) -> int:
+        """
+        Compte les solutions de la grille (colorations distinctes des cellules).
+        
+        Un seul solveur incrémental est utilisé : chaque solution trouvée est
+        exclue par une clause de blocage et la recherche continue avec les
+        clauses déjà apprises.
+        
+        Args:
+            limit: Arrête le comptage à ce nombre de solutions (None : toutes)
+            encodage: L'encodage de cardinalité (celui par défaut si None)
+            time_limit: Budget optionnel en secondes pour chaque résolution
+            
+        Returns:
+            Le nombre de solutions trouvées (au plus limit)
+            
+        Raises:
+            TimeoutError: Si le budget est épuisé avant la fin du comptage
+        """
+        from Module.SatSolver import SatSolver
+        from Module.cardinalite import ENCODAGE_PAR_DEFAUT
+        
+        solveur = SatSolver()
+        solveur.load_grid(self, encodage or ENCODAGE_PAR_DEFAUT, pretraitement=True)
+        nombre: int = solveur.count_models(range(1, self.width * self.height + 1), limit, time_limit)
+        if solveur.status == "UNKNOWN":
+            raise TimeoutError(f"Comptage interrompu après {nombre} solution(s)")
+        return nombre
+    
+    def is_unique(self, encodage: Optional[str] = None,
+                  time_limit: Optional[float] = None) -> bool:
+        """
+        Vérifie que la grille a exactement une solution.
+        
+        Args:
+            encodage: L'encodage de cardinalité (celui par défaut si None)
+            time_limit: Budget optionnel en secondes pour chaque résolution
+            
+        Returns:
+            True si la grille a une et une seule solution
+        """
+        return self.count_solutions(2, encodage, time_limit) == 1
+    
+    def writeGrid(self, file_path: str, solution: Optional[List[int]] = None) -> None:
+        """
+        Enregistre la grille dans un fichier au format corpus binaire (corpus.py).
+        
+        La grille se relit avec ``CorpusReader(file_path)[0]``.
+        
+        Args:
+            file_path: Le chemin du fichier (remplacé s'il existe)
+            solution: Indices plats des cellules colorées, enregistrés avec la
+                grille s'ils sont donnés
+        """
+        from Module.corpus import write_corpus
+        
+        write_corpus(file_path, [(self, solution)], solutions=solution is not None)
 
 if __name__ == "__main__":
     w = int(input("entrer la longueur du terrain \n"))
@@ -2,19 +2,149 @@
 SAT Solver and DIMACS Parser Module
 
 This module combines functionality for parsing DIMACS CNF format files and
-solving Boolean satisfiability problems using the DPLL algorithm from dpll.py.
+solving Boolean satisfiability problems, either with the CDCL engine from
+cdcl.py (default) or with the DPLL algorithm from dpll.py.
 """
-from typing import Dict, List, Tuple, Optional
-from Module.DPLL import DpllNode
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional, Sequence
+from itertools import compress, count
+import logging
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import time
+from Module.cdcl import CdclSolver
+from Module.heuristics import POLARITIES, make_heuristic
+from Module.dpll import DpllTrace, dpll
+from Module.NoriGrid import NoriGrid
+from Module.DimacsGen import ecrire_dimacs, generer_clauses
+from Module.regles import nombre_variables
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT
+from Module.encodage_vectorise import encoder_grille, numpy_disponible
+from Module.cache import CacheEntry, CnfCache, flatten_clauses
+from Module.pretraitement import clauses_reduites, propager
+from Module.simplify import Simplifier
+from Module.stats import ProgressCallback, SolverStats
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: the bulk parser falls back to array('i')
+    np = None
+
+ENGINES: Tuple[str, ...] = ("cdcl", "dpll")
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the memory-mapped file tokenized at a time by parse_dimacs_bulk
+_PARSE_CHUNK: int = 1024 * 1024
+# Comment, problem and end-of-file ("%") lines, blanked out before bulk tokenizing
+_NON_CLAUSE_LINE = re.compile(rb'^[ \t]*[cp%][^\n]*', re.MULTILINE)
+_PROBLEM_LINE = re.compile(rb'^[ \t]*p[ \t]+cnf[ \t]+(-?\d+)[ \t]+(-?\d+)', re.MULTILINE)
+
+def default_portfolio(size: int) -> List[Dict[str, Any]]:
+    """
+    Build ``size`` diversified CDCL configurations for portfolio solving.
+    
+    The first configuration is the default solver; the others vary the seed,
+    the branching heuristic, the decision polarity, the random decision rate
+    and the restart policy.
+    
+    Args:
+        size: Number of configurations
+        
+    Returns:
+        A list of keyword-argument dictionaries for CdclSolver
+    """
+    heuristics: Tuple[str, ...] = ("vsids", "shuffled")
+    random_freqs: Tuple[float, ...] = (0.0, 0.02, 0.1)
+    configs: List[Dict[str, Any]] = [{}]
+    for i in range(1, size):
+        configs.append({
+            "heuristic": heuristics[i % len(heuristics)],
+            "seed": i,
+            "polarity": POLARITIES[i % len(POLARITIES)],
+            "random_freq": random_freqs[(i // len(POLARITIES)) % len(random_freqs)],
+            "restarts": ("luby", "glucose")[(i // len(heuristics)) % 2],
+        })
+    return configs
+
+
+def _new_cdcl(num_vars: int, options: Dict[str, Any], grille: Optional[NoriGrid]) -> CdclSolver:
+    """Create an empty CdclSolver, building the "region" heuristic from the grid if requested."""
+    if options.get("heuristic") == "region":
+        options = dict(options)
+        options["heuristic"] = make_heuristic("region", options.get("seed"),
+                                              options.get("polarity"), grille)
+    return CdclSolver(num_vars, **options)
+
+
+def _portfolio_worker(index: int, num_vars: int, literals: Sequence[int], offsets: Sequence[int],
+                      grid_bytes: Optional[bytes], options: Dict[str, Any],
+                      time_limit: Optional[float], results: Any) -> None:
+    """
+    Run one portfolio member and report (index, result, model, stats) on the queue.
+
+    The worker only receives plain data (the flat CNF and the serialized grid)
+    and builds its own solver, so it also works with the "spawn" start method.
+    """
+    grille: Optional[NoriGrid] = None if grid_bytes is None else NoriGrid.from_bytes(grid_bytes)
+    solver: CdclSolver = _new_cdcl(num_vars, options, grille)
+    result: Optional[bool] = False
+    if solver.add_clauses_flat(literals, offsets):
+        result = solver.solve(time_limit)
+    results.put((index, result, solver.model() if result else None, solver.statistics()))
+
 
 class SatSolver:
     """
     A class that handles both parsing DIMACS CNF files and solving SAT problems.
     """
-    def __init__(self) -> None:
-        """Initialize the SAT solver."""
+    def __init__(self, engine: str = "cdcl", **options: Any) -> None:
+        """
+        Initialize the SAT solver.
+
+        Args:
+            engine: Search engine used by ``solve``, either "cdcl" or "dpll"
+            **options: CDCL options (heuristic, seed, polarity, random_freq,
+                restarts, phase_saving, learned clause reduction limits,
+                timings), see CdclSolver; heuristic="region" is available through solve_grid
+
+        Raises:
+            ValueError: If the engine name is unknown
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {ENGINES})")
+        self.engine: str = engine
+        self.options: Dict[str, Any] = options
         self.num_vars: int = 0
         self.clauses: List[List[int]] = []
+        # Flat representation filled by parse_dimacs_bulk: clause i is
+        # literals[offsets[i]:offsets[i + 1]]
+        self.literals: Optional[Sequence[int]] = None
+        self.offsets: Optional[Sequence[int]] = None
+        # Outcome of the last solve: "SAT", "UNSAT" or "UNKNOWN" (time limit reached)
+        self.status: Optional[str] = None
+        # Statistics of the last solve (search counters and phase timings);
+        # parse_time and encode_time are those of the loaded problem
+        self.stats: SolverStats = SolverStats()
+        # Optional callback called every progress_interval conflicts during a
+        # CDCL solve; returning False stops the search ("UNKNOWN" status)
+        self.progress: Optional[ProgressCallback] = None
+        self.progress_interval: int = 1000
+        # Optional DPLL search trace (RingBufferTrace, FileTrace), dpll engine only
+        self.trace: Optional[DpllTrace] = None
+        # Grid being solved by solve_grid, used by the "region" heuristic
+        self.grid: Optional[NoriGrid] = None
+        # Configuration of the worker that answered the last solve_portfolio call
+        self.portfolio_winner: Optional[Dict[str, Any]] = None
+        # Simplification passes applied to the loaded clauses, see simplify
+        self.simplifiers: List[Simplifier] = []
+        # Persistent CDCL solver reused by incremental solves (add_clause, assumptions)
+        self._cdcl: Optional[CdclSolver] = None
+        # Assumptions responsible for the last UNSAT answer under assumptions
+        self.failed_assumptions: List[int] = []
     
     def parse_dimacs(self, file_path: str) -> Tuple[int, List[List[int]]]:
         """
@@ -31,59 +161,75 @@ class SatSolver:
             FileNotFoundError: If the input file cannot be found
             ValueError: If the file format is invalid
         """
+        start: float = time.perf_counter()
+        with open(file_path, 'r') as f:
+            text: str = f.read()
+        logger.debug("Read %d bytes from %s", len(text), file_path)
+        result: Tuple[int, List[List[int]]] = self.parse_dimacs_text(text)
+        self.stats.parse_time = time.perf_counter() - start
+        return result
+    
+    def parse_dimacs_text(self, text: str) -> Tuple[int, List[List[int]]]:
+        """
+        Parse DIMACS CNF text (the content of a file) and load its clauses.
+        
+        Args:
+            text: The DIMACS text
+            
+        Returns:
+            A tuple containing (number of variables, list of clauses)
+            
+        Raises:
+            ValueError: If the text format is invalid
+        """
+        start: float = time.perf_counter()
         num_vars: int = 0
         num_clauses: int = 0
         clauses: List[List[int]] = []
         
-        with open(file_path, 'r') as f:
-            lines: List[str] = f.readlines()
-            
-            # Print debug info
-            print(f"Read {len(lines)} lines from {file_path}")
+        for line in text.splitlines():
+            # Remove leading/trailing whitespace
+            line = line.strip()
             
-            for line in lines:
-                # Remove leading/trailing whitespace
-                line = line.strip()
+            # Skip empty lines and comment lines
+            if not line or line.startswith('c'):
+                continue
                 
-                # Skip empty lines and comment lines
-                if not line or line.startswith('c'):
-                    continue
-                    
-                # Parse problem line
-                if line.startswith('p cnf'):
-                    parts: List[str] = line.split()
-                    if len(parts) != 4:
-                        raise ValueError(f"Invalid problem line format: {line}")
+            # Parse problem line
+            if line.startswith('p cnf'):
+                parts: List[str] = line.split()
+                if len(parts) != 4:
+                    raise ValueError(f"Invalid problem line format: {line}")
+                try:
+                    num_vars = int(parts[2])
+                    num_clauses = int(parts[3])
+                    logger.debug("Problem specification: %d variables, %d clauses",
+                                 num_vars, num_clauses)
+                except ValueError:
+                    raise ValueError(f"Invalid variable or clause count: {line}")
+            else:
+                # Parse clause line
+                clause: List[int] = []
+                for lit in line.split():
                     try:
-                        num_vars = int(parts[2])
-                        num_clauses = int(parts[3])
-                        print(f"Problem specification: {num_vars} variables, {num_clauses} clauses")
+                        lit_val: int = int(lit)
+                        if lit_val == 0:  # End of clause marker
+                            if clause:
+                                clauses.append(clause)
+                                clause = []
+                        else:
+                            clause.append(lit_val)
                     except ValueError:
-                        raise ValueError(f"Invalid variable or clause count: {line}")
-                else:
-                    # Parse clause line
-                    clause: List[int] = []
-                    for lit in line.split():
-                        try:
-                            lit_val: int = int(lit)
-                            if lit_val == 0:  # End of clause marker
-                                if clause:
-                                    clauses.append(clause)
-                                    clause = []
-                            else:
-                                clause.append(lit_val)
-                        except ValueError:
-                            raise ValueError(f"Invalid literal in clause: {lit}")
-                    
-                    # Handle case where line doesn't end with 0
-                    if clause:
-                        clauses.append(clause)
-        
+                        raise ValueError(f"Invalid literal in clause: {lit}")
+                
+                # Handle case where line doesn't end with 0
+                if clause:
+                    clauses.append(clause)
+    
         # Verify the number of clauses matches what was specified
         if num_clauses > 0 and len(clauses) != num_clauses:
-            # Warning (removed logging dependency)
-            # print(f"Warning: Number of clauses ({len(clauses)}) doesn't match specification ({num_clauses})")
-            pass
+            logger.warning("Number of clauses (%d) doesn't match specification (%d)",
+                           len(clauses), num_clauses)
         
         if num_vars == 0:
             raise ValueError("Missing or invalid problem specification line")
@@ -91,28 +237,439 @@ class SatSolver:
         # Store the parsed data as instance variables
         self.num_vars = num_vars
         self.clauses = clauses
+        self.literals = self.offsets = None
+        self.grid = None
+        self.simplifiers = []
+        self._cdcl = None
+        self.stats = SolverStats(parse_time=time.perf_counter() - start)
         
         return num_vars, clauses
     
-    def solve(self) -> Optional[Dict[int, bool]]:
+    def parse_dimacs_bulk(self, file_path: str) -> Tuple[int, Sequence[int], Sequence[int]]:
+        """
+        Parse a DIMACS CNF file in bulk into a flat literal array.
+        
+        The file is memory-mapped and tokenized in one pass, by chunks of
+        whole lines (with NumPy when available, otherwise with ``array('i')``),
+        so that no full-size copy of the file is made. No per-clause Python list is
+        built: the CNF is stored as one flat array of literals plus an array of
+        clause offsets, which ``solve`` consumes directly.
+        
+        Args:
+            file_path: Path to the DIMACS CNF file
+            
+        Returns:
+            A tuple (number of variables, literals, offsets) where clause i is
+            ``literals[offsets[i]:offsets[i + 1]]``
+            
+        Raises:
+            FileNotFoundError: If the input file cannot be found
+            ValueError: If the file format is invalid
+        """
+        start: float = time.perf_counter()
+        # NumPy: per-chunk literal arrays and clause bounds, concatenated at the end
+        literal_parts: List[Any] = []
+        bound_parts: List[Any] = []
+        total: int = 0
+        last: int = 0
+        # No NumPy: flat arrays grown chunk by chunk
+        literals: Any = array('i')
+        offsets: Any = array('q', [0])
+        with open(file_path, 'rb') as f:
+            # An empty file cannot be mapped, and has no problem line anyway
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Missing or invalid problem specification line")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                problem = _PROBLEM_LINE.search(data)
+                if problem is None:
+                    raise ValueError("Missing or invalid problem specification line")
+                num_vars: int = int(problem.group(1))
+                position: int = 0
+                while position < len(data):
+                    # Chunks end on a line boundary, so that comment and problem
+                    # lines are blanked out whole; only one chunk is copied at a time
+                    end: int = data.find(b'\n', min(position + _PARSE_CHUNK, len(data)))
+                    end = len(data) if end < 0 else end + 1
+                    chunk: bytes = _NON_CLAUSE_LINE.sub(b'', data[position:end])
+                    position = end
+                    try:
+                        if np is not None:
+                            tokens = np.fromstring(chunk, dtype=np.int32, sep=' ')
+                            if not len(tokens):
+                                continue
+                            ends = np.flatnonzero(tokens == 0)
+                            part = tokens[tokens != 0]
+                            # Number of literals of the file before each terminating 0
+                            bound_parts.append(ends - np.arange(len(ends)) + total)
+                            literal_parts.append(part)
+                            total += len(part)
+                            last = int(tokens[-1])
+                        else:
+                            tokens = array('i', map(int, chunk.split()))
+                            before: int = len(literals)
+                            literals.extend(filter(None, tokens))
+                            # Positions of the terminating 0s, found without a Python-level token loop
+                            zero_positions: Iterator[int] = compress(count(), map((0).__eq__, tokens))
+                            for index, zero in enumerate(zero_positions):
+                                bound: int = before + zero - index
+                                if bound != offsets[-1]:
+                                    offsets.append(bound)
+                    except ValueError:
+                        raise ValueError(f"Invalid literal in clauses of {file_path}")
+        
+        if np is not None:
+            literals = np.concatenate(literal_parts) if literal_parts else np.zeros(0, np.int32)
+            bounds = np.concatenate(bound_parts) if bound_parts else np.zeros(0, np.int64)
+            if last != 0:
+                bounds = np.append(bounds, len(literals))
+            offsets = np.concatenate(([0], bounds)).astype(np.int64)
+            # Drop empty clauses (consecutive 0 markers)
+            offsets = offsets[np.concatenate(([True], np.diff(offsets) > 0))]
+        elif len(literals) != offsets[-1]:
+            offsets.append(len(literals))
+        
+        if num_vars == 0:
+            raise ValueError("Missing or invalid problem specification line")
+        
+        self.num_vars = num_vars
+        self.clauses = []
+        self.literals = literals
+        self.offsets = offsets
+        self.grid = None
+        self.simplifiers = []
+        self._cdcl = None
+        self.stats = SolverStats(parse_time=time.perf_counter() - start)
+        
+        return num_vars, literals, offsets
+    
+    def iter_clauses(self) -> Iterator[List[int]]:
+        """
+        Iterate over the loaded clauses, whichever representation holds them.
+        
+        Returns:
+            An iterator of clauses, each clause being a list of literals
+        """
+        if self.literals is None or self.offsets is None:
+            yield from self.clauses
+            return
+        literals: List[int] = self.literals.tolist()
+        offsets: List[int] = self.offsets.tolist()
+        for i in range(len(offsets) - 1):
+            yield literals[offsets[i]:offsets[i + 1]]
+    
+    def load_clauses(self, clauses: Iterable[List[int]], num_vars: Optional[int] = None) -> None:
+        """
+        Load clauses directly from integer lists, without going through DIMACS text.
+        
+        Args:
+            clauses: Iterable of clauses, each clause being a list of non-zero literals
+            num_vars: Number of variables; inferred from the largest literal if omitted
+        """
+        self.clauses = [list(clause) for clause in clauses]
+        self.literals = self.offsets = None
+        self.grid = None
+        self.simplifiers = []
+        self._cdcl = None
+        self.stats = SolverStats()
+        if num_vars is None:
+            num_vars = max((abs(lit) for clause in self.clauses for lit in clause), default=0)
+        self.num_vars = num_vars
+    
+    def load_flat(self, literals: Sequence[int], offsets: Sequence[int], num_vars: int) -> None:
+        """
+        Load clauses stored as one flat literal array plus clause offsets.
+        
+        Args:
+            literals: Flat sequence of non-zero literals (array('i'), ndarray, list...)
+            offsets: Clause boundaries; clause i is literals[offsets[i]:offsets[i + 1]]
+            num_vars: Number of variables
+        """
+        self.num_vars = num_vars
+        self.clauses = []
+        self.literals = literals
+        self.offsets = offsets
+        self.grid = None
+        self.simplifiers = []
+        self._cdcl = None
+        self.stats = SolverStats()
+    
+    def add_clause(self, clause: Iterable[int]) -> None:
+        """
+        Add a clause to the loaded problem, keeping the solver state.
+        
+        With the CDCL engine, the solver built by a previous ``solve`` is kept
+        (with its learned clauses) and receives the new clause, so the next
+        ``solve`` continues from there instead of starting over. Clauses must
+        not mention variables removed by ``simplify`` (freeze them).
+        
+        Args:
+            clause: Iterable of non-zero DIMACS literals
+        """
+        if self.literals is not None and self.offsets is not None:
+            # Switch to the list representation to append clauses
+            self.clauses = list(self.iter_clauses())
+            self.literals = self.offsets = None
+        clause = list(clause)
+        self.clauses.append(clause)
+        self.num_vars = max([self.num_vars] + [abs(lit) for lit in clause])
+        if self._cdcl is not None:
+            self._cdcl.add_clause(clause)
+    
+    def solve(self, time_limit: Optional[float] = None,
+              assumptions: Sequence[int] = ()) -> Optional[Dict[int, bool]]:
+        """
+        Solve the SAT problem with the selected engine.
+        
+        Args:
+            time_limit: Optional budget in seconds (CDCL engine only); when it
+                is exceeded ``status`` is set to "UNKNOWN"
+            assumptions: DIMACS literals assumed true for this call only; when
+                the problem is unsatisfiable under them, the responsible ones
+                are listed in ``failed_assumptions`` (CDCL engine)
+        
+        Returns:
+            Dictionary mapping variable numbers to boolean values (True/False),
+            or None if the problem is unsatisfiable, the time limit was reached
+            or the progress callback stopped the search (statistics in ``stats``)
+        """
+        start: float = time.perf_counter()
+        loaded: SolverStats = self.stats
+        self.stats = SolverStats(parse_time=loaded.parse_time, encode_time=loaded.encode_time)
+        try:
+            return self._solve(time_limit, assumptions)
+        finally:
+            self.stats.solve_time = time.perf_counter() - start
+    
+    def _solve(self, time_limit: Optional[float],
+               assumptions: Sequence[int]) -> Optional[Dict[int, bool]]:
+        """Body of ``solve``; fills the search counters of ``stats``."""
+        self.failed_assumptions = []
+        self.num_vars = max([self.num_vars] + [abs(lit) for lit in assumptions])
+        if self.engine == "dpll":
+            model: Optional[Dict[int, bool]] = self._solve_dpll(assumptions)
+            self.status = "UNSAT" if model is None else "SAT"
+            return self._extend_model(model)
+
+        self.status = "UNSAT"
+        if self._cdcl is None:
+            self._cdcl = self._load_cdcl(self.options)
+        solver: Optional[CdclSolver] = self._cdcl
+        if solver is None:
+            return None
+        before: SolverStats = solver.statistics()
+        result: Optional[bool] = solver.solve(time_limit, assumptions, self.progress,
+                                              self.progress_interval)
+        search: SolverStats = solver.statistics() - before
+        search.parse_time, search.encode_time = self.stats.parse_time, self.stats.encode_time
+        self.stats = search
+        self.failed_assumptions = list(solver.failed_assumptions)
+        if result is None:
+            self.status = "UNKNOWN"
+            return None
+        if not result:
+            return None
+        self.status = "SAT"
+        return self._extend_model(solver.model())
+    
+    def enumerate_models(self, variables: Sequence[int], limit: Optional[int] = None,
+                         time_limit: Optional[float] = None) -> Iterator[Dict[int, bool]]:
+        """
+        Enumerate the models that differ on the given variables.
+        
+        After each model, a blocking clause excluding its projection on
+        ``variables`` is added and the same solver keeps searching, so learned
+        clauses are reused. The blocking clauses are guarded by a fresh
+        selector variable passed as an assumption, and the selector is
+        disabled at the end: the loaded problem is left equivalent to the
+        original one.
+        
+        Args:
+            variables: Variables on which models must differ (e.g. the cells of a grid)
+            limit: Stop after this many models
+            time_limit: Optional budget in seconds for each solve; when it is
+                exceeded the enumeration stops with ``status`` "UNKNOWN"
+            
+        Yields:
+            The models, as dictionaries mapping variable numbers to boolean values
+        """
+        selector: int = self.num_vars + 1
+        found: int = 0
+        try:
+            while limit is None or found < limit:
+                model: Optional[Dict[int, bool]] = self.solve(time_limit, [selector])
+                if model is None:
+                    return
+                model.pop(selector, None)
+                found += 1
+                yield model
+                self.add_clause([-selector] + [-var if model[var] else var for var in variables])
+        finally:
+            self.add_clause([-selector])
+    
+    def count_models(self, variables: Sequence[int], limit: Optional[int] = None,
+                     time_limit: Optional[float] = None) -> int:
+        """
+        Count the models that differ on the given variables (see ``enumerate_models``).
+        
+        Args:
+            variables: Variables on which models must differ
+            limit: Stop counting at this many models (e.g. 2 for a uniqueness check)
+            time_limit: Optional budget in seconds for each solve
+            
+        Returns:
+            The number of models found; it is a lower bound when ``status`` is "UNKNOWN"
+        """
+        return sum(1 for _ in self.enumerate_models(variables, limit, time_limit))
+    
+    def simplify(self, frozen: Iterable[int] = (), eliminate: bool = True) -> bool:
+        """
+        Simplify the loaded clauses in place (see simplify.py).
+        
+        Subsumption, strengthening and bounded variable elimination are run on
+        the current clauses; models found by later solves are extended back to
+        the original variables automatically.
+        
+        Args:
+            frozen: Variables that must not be eliminated
+            eliminate: Also run bounded variable elimination
+            
+        Returns:
+            False if the clauses were found unsatisfiable, True otherwise
+        """
+        simplifier: Simplifier = Simplifier(self.num_vars, self.iter_clauses(), frozen)
+        simplifier.simplify(eliminate)
+        grid: Optional[NoriGrid] = self.grid
+        stats: SolverStats = self.stats
+        simplifiers: List[Simplifier] = self.simplifiers + [simplifier]
+        self.load_clauses(simplifier.simplified_clauses(), simplifier.num_vars)
+        self.grid = grid
+        self.stats = stats
+        self.simplifiers = simplifiers
+        return simplifier.ok
+    
+    def _extend_model(self, model: Optional[Dict[int, bool]]) -> Optional[Dict[int, bool]]:
+        """Rebuild the values of the variables removed by simplify, latest pass first."""
+        if model is None:
+            return None
+        for simplifier in reversed(self.simplifiers):
+            model = simplifier.extend_model(model)
+        return model
+
+    def _load_cdcl(self, options: Dict[str, Any]) -> Optional[CdclSolver]:
+        """
+        Build a CDCL solver loaded with the current clauses.
+        
+        Args:
+            options: Keyword arguments for CdclSolver
+            
+        Returns:
+            The loaded solver, or None if the clauses are trivially unsatisfiable
+        """
+        solver: CdclSolver = _new_cdcl(self.num_vars, options, self.grid)
+        if self.literals is not None and self.offsets is not None:
+            if not solver.add_clauses_flat(self.literals, self.offsets):
+                return None
+        else:
+            for clause in self.clauses:
+                if not solver.add_clause(clause):
+                    return None
+        return solver
+    
+    def solve_portfolio(self, workers: Optional[int] = None,
+                        configs: Optional[List[Dict[str, Any]]] = None,
+                        time_limit: Optional[float] = None) -> Optional[Dict[int, bool]]:
+        """
+        Solve the loaded problem with several diversified CDCL processes at once.
+        
+        Each worker process runs the same CNF with a different configuration
+        (seed, branching order, polarity, random decisions). The first worker
+        to finish wins and the others are terminated.
+        
+        Args:
+            workers: Number of processes (os.cpu_count() if None); ignored when
+                ``configs`` is given
+            configs: Explicit CdclSolver keyword arguments, one per process
+            time_limit: Optional overall budget in seconds
+            
+        Returns:
+            Dictionary mapping variable numbers to boolean values (True/False),
+            or None if the problem is unsatisfiable or no worker finished in time
+            (see ``status``). The winning configuration is kept in
+            ``portfolio_winner``.
+        """
+        if configs is None:
+            configs = default_portfolio(workers or os.cpu_count() or 1)
+        self.portfolio_winner = None
+        self.status = "UNKNOWN"
+        
+        literals: Sequence[int]
+        offsets: Sequence[int]
+        if self.literals is not None and self.offsets is not None:
+            literals, offsets = self.literals, self.offsets
+        else:
+            literals, offsets = flatten_clauses(self.clauses)
+        grid_bytes: Optional[bytes] = None if self.grid is None else self.grid.to_bytes()
+        
+        results: Any = multiprocessing.Queue()
+        processes: List[multiprocessing.Process] = [
+            multiprocessing.Process(target=_portfolio_worker,
+                                    args=(i, self.num_vars, literals, offsets, grid_bytes, config,
+                                          time_limit, results),
+                                    daemon=True)
+            for i, config in enumerate(configs)
+        ]
+        for process in processes:
+            process.start()
+        
+        deadline: Optional[float] = None if time_limit is None else time.monotonic() + time_limit
+        model: Optional[Dict[int, bool]] = None
+        pending: int = len(processes)
+        try:
+            while pending:
+                try:
+                    index, result, found, stats = results.get(timeout=0.1)
+                except queue.Empty:
+                    if deadline is not None and time.monotonic() > deadline:
+                        break
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        break
+                    continue
+                pending -= 1
+                if result is None:
+                    continue
+                self.portfolio_winner = configs[index]
+                stats.parse_time, stats.encode_time = self.stats.parse_time, self.stats.encode_time
+                self.stats = stats
+                self.status = "SAT" if result else "UNSAT"
+                model = self._extend_model(found)
+                break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+            results.close()
+        return model
+    
+    def _solve_dpll(self, assumptions: Sequence[int] = ()) -> Optional[Dict[int, bool]]:
         """
         Solve the SAT problem using the DPLL algorithm from dpll.py.
         
+        Args:
+            assumptions: DIMACS literals assumed true, added as unit clauses
+        
         Returns:
             Dictionary mapping variable numbers to boolean values (True/False),
             or None if the problem is unsatisfiable
         """
-        # Create a deep copy of clauses to avoid modifying the original
-        clauses_copy: List[List[int]] = [clause.copy() for clause in self.clauses]
+        clauses: List[List[int]] = list(self.iter_clauses()) + [[lit] for lit in assumptions]
         
         # Initialize assignment with None values (undecided)
         assignment: Dict[int, Optional[bool]] = {var: None for var in range(1, self.num_vars + 1)}
         
-        # Create root node for DPLL decision tree (optional)
-        root_node: DpllNode = DpllNode(assignment)
-        DpllNode
-        # Run the DPLL algorithm from dpll.py
-        result: bool = DpllNode.dpll(clauses_copy, assignment, self.num_vars, root_node)
+        # Run the DPLL algorithm from dpll.py (search tree recorded only if a trace is set)
+        result: bool = dpll(clauses, assignment, self.num_vars, self.trace, self.stats)
         
         if result:
             # Ensure all variables have assignments (some might not be constrained)
@@ -125,21 +682,108 @@ class SatSolver:
             return final_assignment
         return None
     
-    def solve_file(self, file_path: str) -> Optional[Dict[int, bool]]:
+    def solve_file(self, file_path: str, bulk: bool = False,
+                   simplify: bool = False) -> Optional[Dict[int, bool]]:
         """
         Parse a DIMACS CNF file and solve the SAT problem in one step.
         
         Args:
             file_path: Path to the DIMACS CNF file
+            bulk: Use the memory-mapped bulk parser (parse_dimacs_bulk)
+            simplify: Simplify the clauses before solving (see simplify)
             
         Returns:
             Dictionary mapping variable numbers to boolean values (True/False),
             or None if the problem is unsatisfiable
         """
-        print(file_path)
-        self.parse_dimacs(file_path)
+        logger.info("Solving %s", file_path)
+        if bulk:
+            self.parse_dimacs_bulk(file_path)
+        else:
+            self.parse_dimacs(file_path)
+        if simplify:
+            self.simplify()
         return self.solve()
     
+    def load_grid(self, grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT,
+                  pretraitement: bool = False) -> None:
+        """
+        Encode a NoriNori grid and load its clauses, without solving.
+        
+        The vectorized encoder (encodage_vectorise.py) is used when NumPy is
+        installed, the pure Python rules from regles.py otherwise.
+        
+        Args:
+            grille: The grid to encode
+            encodage: Cardinality encoding used for the region rule
+            pretraitement: Fix the cells decided by the structural rules of
+                pretraitement.py first, and encode only the remaining cells
+        """
+        start: float = time.perf_counter()
+        if pretraitement:
+            num_vars, clauses = clauses_reduites(propager(grille), encodage)
+            self.load_clauses(clauses, num_vars)
+        elif numpy_disponible():
+            # Vectorized encoder (same clauses), loaded without per-clause lists
+            num_vars, literals, offsets = encoder_grille(grille, encodage)
+            self.load_flat(literals, offsets, num_vars)
+        else:
+            self.load_clauses(generer_clauses(grille, encodage), nombre_variables(grille, encodage))
+        self.grid = grille
+        self.stats.encode_time = time.perf_counter() - start
+    
+    def solve_grid(self, grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT,
+                   dimacs_path: Optional[str] = None,
+                   time_limit: Optional[float] = None,
+                   cache: Optional[CnfCache] = None,
+                   pretraitement: bool = False) -> Optional[Dict[int, bool]]:
+        """
+        Encode a NoriNori grid (see ``load_grid``) and solve it in memory,
+        skipping the DIMACS round-trip.
+        
+        Args:
+            grille: The grid to solve
+            encodage: Cardinality encoding used for the region rule
+            dimacs_path: If given, also export the CNF to this DIMACS file
+            time_limit: Optional budget in seconds, see ``solve``
+            cache: Optional CNF cache; a hit skips encoding, and solving too
+                when the result of that grid is already known
+            pretraitement: Fix the cells decided by the structural rules of
+                pretraitement.py first, and encode only the remaining cells
+            
+        Returns:
+            Dictionary mapping variable numbers to boolean values (True/False),
+            or None if the grid has no solution. Variable ``row * width + col + 1``
+            is True when that cell is shaded.
+        """
+        if dimacs_path is not None:
+            ecrire_dimacs(grille, dimacs_path, encodage)
+        
+        # The preprocessed CNF differs from the plain one: cache it separately
+        variant: str = encodage + "/pretraitement" if pretraitement else encodage
+        entry: Optional[CacheEntry] = cache.get(grille, variant) if cache is not None else None
+        if entry is not None:
+            self.load_flat(entry.literals, entry.offsets, entry.num_vars)
+            self.grid = grille
+            if entry.status is not None:
+                self.status = entry.status
+                return entry.model
+        else:
+            self.load_grid(grille, encodage, pretraitement)
+        self.grid = grille
+        
+        key: Optional[str] = entry.key if entry is not None else None
+        if cache is not None and key is None:
+            if self.literals is not None and self.offsets is not None:
+                key = cache.put(grille, variant, self.num_vars, self.literals, self.offsets)
+            else:
+                key = cache.put(grille, variant, self.num_vars, *flatten_clauses(self.clauses))
+        
+        model: Optional[Dict[int, bool]] = self.solve(time_limit)
+        if cache is not None and key is not None and self.status in ("SAT", "UNSAT"):
+            cache.store_result(key, self.status, model)
+        return model
+    
 if __name__=="__main__":
     s = SatSolver()
     print(s.solve_file("DIMACS/exemple.cnf"))
\ No newline at end of file
@@ -0,0 +1,447 @@
+"""
+Batch Solving Module
+
+This module solves many NoriNori grids in parallel over a process pool.
+Grids are read from a directory of JSON files, from a JSONL file, or
+generated with NoriGrid, and are shipped to the workers in the compact form
+produced by ``NoriGrid.to_bytes``. Results are streamed back in completion
+order and summarized in a throughput report.
+
+Usage:
+    python -m Module.batch --jsonl grids.jsonl --workers 8 --timeout 10
+    python -m Module.batch --dir grids/ --output results.jsonl
+    python -m Module.batch --generate 1000 --size 10 --regions 30 --seed 0
+    python -m Module.batch --jsonl grids.jsonl --cache .cnf-cache
+    python -m Module.batch --generate 1000 --size 6 --dedupe
+    python -m Module.batch --jsonl grids.jsonl --backend natif
+    python -m Module.batch --jsonl grids.jsonl --verify
+    python -m Module.batch --corpus regression.ncrp --workers 8
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT, ENCODAGES
+from Module.cache import CnfCache
+from Module.corpus import CorpusReader
+from Module.moteur import BACKEND_PAR_DEFAUT, BACKENDS, MoteurNoriNori
+from Module.encodage_vectorise import numpy_disponible
+from Module.symetrie import FormeCanonique, MemoSolutions
+from Module.verification import ResultatVerification, verifier
+
+# A task is an identifier plus the serialized grid
+Task = Tuple[str, bytes]
+
+# Number of results checked together by the post-solve verification
+VERIFY_BATCH: int = 256
+# Tasks submitted ahead per worker: the input is read lazily, so only this
+# many grids per worker are held in memory at once
+WINDOW_PER_WORKER: int = 2
+# Solved symmetry classes remembered by --dedupe (least recently used forgotten first)
+DEDUPE_MEMO_SIZE: int = 100_000
+
+
+def _grid_from_json(data: Any) -> NoriGrid:
+    """Build a grid from a JSON value: either a list of rows or {"grid": rows}."""
+    rows: List[List[int]] = data["grid"] if isinstance(data, dict) else data
+    return NoriGrid.from_grid(rows)
+
+
+def tasks_from_directory(directory: str) -> Iterator[Task]:
+    """
+    Read every ``*.json`` file of a directory as one grid.
+
+    Args:
+        directory: Directory containing one JSON grid per file
+
+    Returns:
+        An iterator of (task id, serialized grid); the id is the file name
+    """
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            data: Any = json.load(f)
+        yield name, _grid_from_json(data).to_bytes()
+
+
+def tasks_from_jsonl(file_path: str) -> Iterator[Task]:
+    """
+    Read one grid per line of a JSONL file.
+
+    Args:
+        file_path: Path to the JSONL file; each line is a list of rows or an
+            object with a "grid" key and an optional "id" key
+
+    Returns:
+        An iterator of (task id, serialized grid); the id defaults to the line number
+    """
+    with open(file_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            data: Any = json.loads(line)
+            task_id: str = str(data.get("id", line_number)) if isinstance(data, dict) else str(line_number)
+            yield task_id, _grid_from_json(data).to_bytes()
+
+
+def tasks_from_corpus(file_path: str) -> Iterator[Task]:
+    """
+    Read the grids of a binary corpus (see corpus.py).
+
+    Args:
+        file_path: Path to the corpus file
+
+    Returns:
+        An iterator of (task id, serialized grid); the id is the grid index
+    """
+    with CorpusReader(file_path) as reader:
+        for index in range(len(reader)):
+            yield str(index), reader.grid_bytes(index)
+
+
+def tasks_from_generator(count: int, size: int, num_regions: Optional[int] = None,
+                         seed: Optional[int] = None) -> Iterator[Task]:
+    """
+    Generate random square grids with NoriGrid.
+
+    Args:
+        count: Number of grids to generate
+        size: Width and height of each grid
+        num_regions: Number of regions requested per grid (NoriGrid default if None)
+        seed: Random seed, for reproducible batches
+
+    Returns:
+        An iterator of (task id, serialized grid)
+    """
+    if seed is not None:
+        random.seed(seed)
+    if num_regions is None:
+        num_regions = max(1, (size * size) // 4)
+    for index in range(count):
+        yield str(index), NoriGrid(size, size, num_regions).to_bytes()
+
+
+# CnfCache of each cache directory in this process, reused by the tasks of a
+# worker so that its size estimate survives between writes (see cache.py);
+# each worker only counts its own writes, and an eviction scan resyncs it
+_caches: Dict[str, CnfCache] = {}
+
+
+def _worker_cache(cache_dir: str) -> CnfCache:
+    """Return the process-wide CnfCache of a directory, created on first use."""
+    cache: Optional[CnfCache] = _caches.get(cache_dir)
+    if cache is None:
+        cache = _caches[cache_dir] = CnfCache(cache_dir)
+    return cache
+
+
+def _solve_task(task_id: str, payload: bytes, encodage: str,
+                time_limit: Optional[float], cache_dir: Optional[str] = None,
+                backend: str = BACKEND_PAR_DEFAUT) -> Dict[str, Any]:
+    """Worker entry point: decode a grid, solve it and return a JSON-friendly result."""
+    start: float = time.perf_counter()
+    grille: NoriGrid = NoriGrid.from_bytes(payload)
+    solver: Union[SatSolver, MoteurNoriNori]
+    model: Optional[Dict[int, bool]]
+    if backend == "natif":
+        solver = MoteurNoriNori()
+        model = solver.solve_grid(grille, time_limit)
+    else:
+        solver = SatSolver()
+        cache: Optional[CnfCache] = _worker_cache(cache_dir) if cache_dir is not None else None
+        model = solver.solve_grid(grille, encodage, time_limit=time_limit, cache=cache)
+    shaded: Optional[List[int]] = None
+    if model is not None:
+        shaded = [cell for cell in range(grille.width * grille.height) if model[cell + 1]]
+    return {
+        "id": task_id,
+        "status": solver.status,
+        "shaded": shaded,
+        "time": time.perf_counter() - start,
+    }
+
+
+class BatchReport:
+    """
+    Aggregated statistics of a batch run.
+    """
+    def __init__(self) -> None:
+        self.total: int = 0
+        self.sat: int = 0
+        self.unsat: int = 0
+        self.unknown: int = 0
+        self.errors: int = 0
+        # SAT results rejected by the post-solve verification
+        self.invalid: int = 0
+        self.solve_time: float = 0.0
+        self.wall_time: float = 0.0
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Account for one task result."""
+        self.total += 1
+        status: str = result["status"]
+        if status == "SAT":
+            self.sat += 1
+        elif status == "UNSAT":
+            self.unsat += 1
+        elif status == "UNKNOWN":
+            self.unknown += 1
+        else:
+            self.errors += 1
+        if result.get("verified") is False:
+            self.invalid += 1
+        self.solve_time += result.get("time", 0.0)
+
+    @property
+    def throughput(self) -> float:
+        """Grids solved per second of wall time."""
+        return self.total / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the report as a JSON-friendly dictionary."""
+        return {
+            "total": self.total,
+            "sat": self.sat,
+            "unsat": self.unsat,
+            "unknown": self.unknown,
+            "errors": self.errors,
+            "invalid": self.invalid,
+            "wall_time": self.wall_time,
+            "solve_time": self.solve_time,
+            "throughput": self.throughput,
+        }
+
+
+def _verify_results(results: List[Dict[str, Any]], payloads: Dict[str, bytes]) -> None:
+    """
+    Check the SAT results against their grids, one vectorized pass per grid size.
+
+    Every SAT result gets a "verified" key; a rejected one also gets a
+    "faults" key with the offending cells (see verification.py).
+    """
+    groups: Dict[Tuple[int, int], List[Tuple[Dict[str, Any], NoriGrid]]] = {}
+    for result in results:
+        if result["status"] == "SAT" and result["shaded"] is not None:
+            grille: NoriGrid = NoriGrid.from_bytes(payloads[result["id"]])
+            groups.setdefault((grille.width, grille.height), []).append((result, grille))
+    for group in groups.values():
+        verdicts: ResultatVerification = verifier([grille for _, grille in group],
+                                                  [result["shaded"] for result, _ in group])
+        for index, (result, _) in enumerate(group):
+            result["verified"] = bool(verdicts.valides[index])
+            if not result["verified"]:
+                result["faults"] = verdicts.fautes(index)
+
+
+def solve_batch(tasks: Iterable[Task], workers: Optional[int] = None,
+                time_limit: Optional[float] = None, encodage: str = ENCODAGE_PAR_DEFAUT,
+                report: Optional[BatchReport] = None,
+                cache_dir: Optional[str] = None,
+                dedupe: bool = False,
+                backend: str = BACKEND_PAR_DEFAUT,
+                verify: bool = False,
+                memo_size: int = DEDUPE_MEMO_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Solve grids over a process pool and stream the results in completion order.
+
+    Tasks are read lazily: at most WINDOW_PER_WORKER tasks per worker are in
+    flight, and new ones are submitted as results come back, so ``tasks`` may
+    be a generator over a very large corpus.
+
+    Args:
+        tasks: Iterable of (task id, serialized grid)
+        workers: Number of worker processes (os.cpu_count() if None)
+        time_limit: Per-task solving budget in seconds; tasks exceeding it
+            are reported with status "UNKNOWN"
+        encodage: Cardinality encoding used for the region rule
+        report: Optional report updated as results arrive
+        cache_dir: Optional CnfCache directory shared by the workers; grids
+            already solved are answered from the cache
+        dedupe: Solve only one grid per symmetry class (rotations, reflections
+            and region relabelings, see symetrie.py); the other grids of the
+            class get its solution mapped back to their orientation. Solved
+            classes are kept in a MemoSolutions table of ``memo_size``
+            entries; a grid whose class was forgotten is solved again
+        backend: "sat" (CNF encoding and SatSolver) or "natif" (the native
+            constraint engine of moteur.py, which ignores encodage and cache_dir)
+        verify: Check the SAT results with the vectorized verifier of
+            verification.py (requires NumPy); results are then released by
+            groups of VERIFY_BATCH
+        memo_size: Number of solved symmetry classes remembered by ``dedupe``
+
+    Returns:
+        An iterator of result dictionaries with keys "id", "status" ("SAT",
+        "UNSAT", "UNKNOWN" or "ERROR"), "shaded" (flat indices of the shaded
+        cells, or None) and "time"; deduplicated results also have a
+        "duplicate_of" key with the id of the grid actually solved. With
+        ``verify``, SAT results have a "verified" key, and a "faults" key
+        when the check fails
+
+    Raises:
+        ImportError: If ``verify`` is set and NumPy is not installed
+    """
+    if verify and not numpy_disponible():
+        raise ImportError("--verify requires NumPy (pip install numpy)")
+    start: float = time.perf_counter()
+    window: int = WINDOW_PER_WORKER * (workers or os.cpu_count() or 1)
+    source: Iterator[Task] = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures: Dict[Future, Tuple[str, Optional[bytes]]] = {}
+        # Grids waiting for the result of the first grid of their symmetry class,
+        # dropped once the class is answered
+        classes: Dict[bytes, List[Tuple[str, FormeCanonique]]] = {}
+        # Solved (SAT or UNSAT) symmetry classes, bounded
+        memo: MemoSolutions = MemoSolutions(taille_max=memo_size)
+        # Grids of the in-flight and verify-pending tasks, kept only for the verification
+        payloads: Dict[str, bytes] = {}
+        pending: List[Dict[str, Any]] = []
+
+        def duplicate_result(result: Dict[str, Any], canonical: Optional[List[int]],
+                             duplicate_id: str, duplicate: FormeCanonique) -> Dict[str, Any]:
+            shaded: Optional[List[int]] = None
+            if canonical is not None:
+                shaded = duplicate.vers_origine(canonical)
+            return dict(result, id=duplicate_id, time=0.0, duplicate_of=result["id"],
+                        shaded=shaded)
+
+        def fill() -> List[Dict[str, Any]]:
+            """Read tasks until the window is full; return the answers of already-solved classes."""
+            ready: List[Dict[str, Any]] = []
+            while len(futures) < window and len(ready) < window:
+                try:
+                    task_id, payload = next(source)
+                except StopIteration:
+                    break
+                if verify:
+                    payloads[task_id] = payload
+                key: Optional[bytes] = None
+                if dedupe:
+                    forme: FormeCanonique = FormeCanonique(NoriGrid.from_bytes(payload))
+                    key = forme.cle
+                    found, shaded = memo.chercher(forme)
+                    if found:
+                        ready.append({"id": task_id, "status": "UNSAT" if shaded is None else "SAT",
+                                      "shaded": shaded, "time": 0.0,
+                                      "duplicate_of": memo.origine(forme)})
+                        continue
+                    if key in classes:
+                        classes[key].append((task_id, forme))
+                        continue
+                    classes[key] = [(task_id, forme)]
+                future: Future = pool.submit(_solve_task, task_id, payload, encodage, time_limit,
+                                             cache_dir, backend)
+                futures[future] = (task_id, key)
+            return ready
+
+        def checked(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            """With ``verify``, hold the results until VERIFY_BATCH of them can be checked."""
+            if not verify:
+                return results
+            pending.extend(results)
+            if len(pending) < VERIFY_BATCH:
+                return []
+            _verify_results(pending, payloads)
+            for result in pending:
+                payloads.pop(result["id"], None)
+            results = pending[:]
+            pending.clear()
+            return results
+
+        def release(results: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for result in results:
+                if report is not None:
+                    report.add(result)
+                    report.wall_time = time.perf_counter() - start
+                yield result
+
+        while True:
+            ready: List[Dict[str, Any]] = fill()
+            if ready:
+                yield from release(checked(ready))
+                continue
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id, key = futures.pop(future)
+                try:
+                    result: Dict[str, Any] = future.result()
+                except Exception as e:
+                    result = {"id": task_id, "status": "ERROR", "shaded": None,
+                              "time": 0.0, "error": str(e)}
+                results: List[Dict[str, Any]] = [result]
+                if key is not None:
+                    (_, representative), *duplicates = classes.pop(key)
+                    canonical: Optional[List[int]] = None
+                    if result["shaded"] is not None:
+                        canonical = representative.vers_canonique(result["shaded"])
+                    if result["status"] in ("SAT", "UNSAT"):
+                        memo.memoriser(representative, result["shaded"], result["id"])
+                    results.extend(duplicate_result(result, canonical, duplicate_id, duplicate)
+                                   for duplicate_id, duplicate in duplicates)
+                yield from release(checked(results))
+        if pending:
+            _verify_results(pending, payloads)
+            yield from release(pending)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Solve many NoriNori grids in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="directory of JSON grid files")
+    source.add_argument("--jsonl", help="JSONL file with one grid per line")
+    source.add_argument("--corpus", help="binary grid corpus (see corpus.py)")
+    source.add_argument("--generate", type=int, metavar="COUNT", help="number of grids to generate")
+    parser.add_argument("--size", type=int, default=10, help="grid size for --generate")
+    parser.add_argument("--regions", type=int, help="number of regions for --generate")
+    parser.add_argument("--seed", type=int, help="random seed for --generate")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--timeout", type=float, help="per-task time limit in seconds")
+    parser.add_argument("--encodage", choices=ENCODAGES, default=ENCODAGE_PAR_DEFAUT)
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_PAR_DEFAUT,
+                        help="solve through the SAT encoding or the native constraint engine")
+    parser.add_argument("--output", help="write results to this JSONL file instead of stdout")
+    parser.add_argument("--cache", help="directory of the CNF cache shared by the workers")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="solve a single grid per rotation/reflection/relabeling class")
+    parser.add_argument("--memo-size", type=int, default=DEDUPE_MEMO_SIZE,
+                        help="solved classes remembered by --dedupe")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the solutions with the vectorized verifier (requires NumPy)")
+    args = parser.parse_args(argv)
+
+    tasks: Iterable[Task]
+    if args.dir:
+        tasks = tasks_from_directory(args.dir)
+    elif args.jsonl:
+        tasks = tasks_from_jsonl(args.jsonl)
+    elif args.corpus:
+        tasks = tasks_from_corpus(args.corpus)
+    else:
+        tasks = tasks_from_generator(args.generate, args.size, args.regions, args.seed)
+
+    report: BatchReport = BatchReport()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in solve_batch(tasks, args.workers, args.timeout, args.encodage, report,
+                                  args.cache, args.dedupe, args.backend, args.verify,
+                                  args.memo_size):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(report.as_dict()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Benchmark Module
+
+Reproducible performance measurements of the whole pipeline: grid generation
+(NoriGrid.generate_random_regions), encoding (premiere_regle, deuxieme_regle,
+generer_dimacs), parsing (SatSolver.parse_dimacs) and solving
+(SatSolver.solve), swept over grid sizes and region counts with fixed seeds.
+The native constraint engine (moteur.py) can be measured on the same grids
+as an extra "native" stage, to compare both backends per size class.
+
+For each stage the wall time, the peak Python memory (tracemalloc, measured
+in a second run so that tracing does not skew the timings), the clause and
+variable counts and the solver decisions/conflicts are recorded. Results are
+written as JSON and/or CSV, and can be compared with a stored baseline to
+flag regressions.
+
+Usage:
+    python -m Module.benchmark --sizes 10 20 30 --seeds 0 1 2 --output bench.json
+    python -m Module.benchmark --output new.json --baseline bench.json --tolerance 0.25
+    python -m Module.benchmark --sizes 10 20 --native
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.DimacsGen import ecrire_dimacs, generer_dimacs
+from Module.regles import premiere_regle, deuxieme_regle, nombre_variables
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT, ENCODAGES
+from Module.moteur import MoteurNoriNori
+
+FIELDS: Tuple[str, ...] = ("size", "regions", "seed", "stage", "time", "peak_kb",
+                           "variables", "clauses", "decisions", "conflicts", "status")
+
+# Timings below this many seconds are too noisy to flag as regressions
+MIN_TIME: float = 0.005
+
+
+def _measure(stage: Callable[[], Any], memory: bool) -> Tuple[Any, float, Optional[float]]:
+    """
+    Run a stage and measure it.
+
+    Args:
+        stage: Deterministic function to measure
+        memory: Also measure the peak traced memory, in a second run
+
+    Returns:
+        A tuple (result of the first run, wall time in seconds, peak memory in KiB or None)
+    """
+    start: float = time.perf_counter()
+    result: Any = stage()
+    elapsed: float = time.perf_counter() - start
+    peak: Optional[float] = None
+    if memory:
+        tracemalloc.start()
+        try:
+            stage()
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_case(size: int, num_regions: int, seed: int, encodage: str = ENCODAGE_PAR_DEFAUT,
+             memory: bool = True, time_limit: Optional[float] = None,
+             native: bool = False) -> List[Dict[str, Any]]:
+    """
+    Benchmark every stage on one generated grid.
+
+    Args:
+        size: Width and height of the grid
+        num_regions: Number of regions requested from NoriGrid
+        seed: Random seed of the generation
+        encodage: Cardinality encoding used for the region rule
+        memory: Measure the peak memory of each stage
+        time_limit: Optional solving budget in seconds
+        native: Also solve the grid with the native constraint engine
+
+    Returns:
+        One record per stage (see FIELDS)
+    """
+    base: Dict[str, Any] = {"size": size, "regions": num_regions, "seed": seed}
+    records: List[Dict[str, Any]] = []
+
+    def record(stage: str, elapsed: float, peak: Optional[float], **values: Any) -> None:
+        entry: Dict[str, Any] = dict.fromkeys(FIELDS)
+        entry.update(base, stage=stage, time=elapsed, peak_kb=peak, **values)
+        records.append(entry)
+
+    def generate() -> NoriGrid:
+        random.seed(seed)
+        return NoriGrid(size, size, num_regions)
+
+    grille, elapsed, peak = _measure(generate, memory)
+    record("generate", elapsed, peak)
+
+    def encode() -> str:
+        premiere_regle(grille, encodage)
+        deuxieme_regle(grille)
+        return generer_dimacs(grille, encodage)
+
+    contenu, elapsed, peak = _measure(encode, memory)
+    num_vars: int = nombre_variables(grille, encodage)
+    num_clauses: int = sum(1 for line in contenu.splitlines() if line and line[0] not in "cp")
+    record("encode", elapsed, peak, variables=num_vars, clauses=num_clauses)
+
+    fd, path = tempfile.mkstemp(suffix=".cnf")
+    os.close(fd)
+    try:
+        ecrire_dimacs(grille, path, encodage)
+
+        def parse() -> SatSolver:
+            parsed: SatSolver = SatSolver()
+            parsed.parse_dimacs(path)
+            return parsed
+
+        solver, elapsed, peak = _measure(parse, memory)
+        # solve() keeps the CDCL state (learnt clauses) between calls: the
+        # memory run solves its own freshly parsed copy, not a warm re-solve
+        unsolved: List[SatSolver] = [solver, parse()] if memory else [solver]
+    finally:
+        os.remove(path)
+    record("parse", elapsed, peak, variables=solver.num_vars, clauses=len(solver.clauses))
+
+    _, elapsed, peak = _measure(lambda: unsolved.pop(0).solve(time_limit), memory)
+    record("solve", elapsed, peak, variables=solver.num_vars, clauses=len(solver.clauses),
+           decisions=solver.stats.decisions, conflicts=solver.stats.conflicts,
+           status=solver.status)
+
+    if native:
+        moteur: MoteurNoriNori = MoteurNoriNori()
+        _, elapsed, peak = _measure(lambda: moteur.solve_grid(grille, time_limit), memory)
+        record("native", elapsed, peak, decisions=moteur.stats.decisions,
+               conflicts=moteur.stats.conflicts, status=moteur.status)
+    return records
+
+
+def run_suite(sizes: List[int], seeds: List[int], region_ratios: List[float],
+              encodage: str = ENCODAGE_PAR_DEFAUT, memory: bool = True,
+              time_limit: Optional[float] = None, native: bool = False) -> Dict[str, Any]:
+    """
+    Sweep grid sizes, region counts and seeds.
+
+    Args:
+        sizes: Grid sizes to benchmark
+        seeds: Random seeds, one generated grid per seed
+        region_ratios: Number of regions as a fraction of the number of cells
+        encodage: Cardinality encoding used for the region rule
+        memory: Measure the peak memory of each stage
+        time_limit: Optional solving budget in seconds
+        native: Also solve every grid with the native constraint engine
+
+    Returns:
+        A dictionary with run metadata ("meta") and the list of records ("results")
+    """
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        for ratio in region_ratios:
+            num_regions: int = max(1, int(size * size * ratio))
+            for seed in seeds:
+                results.extend(run_case(size, num_regions, seed, encodage, memory, time_limit,
+                                        native))
+    meta: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "encodage": encodage,
+    }
+    return {"meta": meta, "results": results}
+
+
+def write_json(run: Dict[str, Any], file_path: str) -> None:
+    """Write a benchmark run as JSON."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+
+
+def write_csv(run: Dict[str, Any], file_path: str) -> None:
+    """Write the records of a benchmark run as CSV."""
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(run["results"])
+
+
+def compare(run: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Compare a run with a baseline run.
+
+    A stage regresses when its time or peak memory exceeds the baseline by more
+    than ``tolerance`` (relative), or when its clause/variable counts changed.
+
+    Args:
+        run: The new benchmark run
+        baseline: The stored baseline run
+        tolerance: Allowed relative slowdown or memory growth
+
+    Returns:
+        A human-readable description of every regression found
+    """
+    def key(entry: Dict[str, Any]) -> Tuple[Any, ...]:
+        return entry["size"], entry["regions"], entry["seed"], entry["stage"]
+
+    reference: Dict[Tuple[Any, ...], Dict[str, Any]] = {key(e): e for e in baseline["results"]}
+    regressions: List[str] = []
+    for entry in run["results"]:
+        old: Optional[Dict[str, Any]] = reference.get(key(entry))
+        if old is None:
+            continue
+        label: str = "size={} regions={} seed={} stage={}".format(*key(entry))
+        if entry["time"] > MIN_TIME and entry["time"] > old["time"] * (1 + tolerance):
+            regressions.append(f"{label}: time {old['time']:.4f}s -> {entry['time']:.4f}s")
+        if entry["peak_kb"] and old["peak_kb"] and entry["peak_kb"] > old["peak_kb"] * (1 + tolerance):
+            regressions.append(f"{label}: peak {old['peak_kb']:.0f}KiB -> {entry['peak_kb']:.0f}KiB")
+        for field in ("variables", "clauses"):
+            if old[field] is not None and entry[field] != old[field]:
+                regressions.append(f"{label}: {field} {old[field]} -> {entry[field]}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark NoriNori generation, encoding and solving.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 10, 15, 20])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--region-ratios", type=float, nargs="+", default=[0.15, 0.25],
+                        help="number of regions as a fraction of the number of cells")
+    parser.add_argument("--encodage", choices=ENCODAGES, default=ENCODAGE_PAR_DEFAUT)
+    parser.add_argument("--timeout", type=float, help="solving time limit per grid, in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurements")
+    parser.add_argument("--native", action="store_true",
+                        help="also solve each grid with the native constraint engine")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--csv", help="write the results as CSV")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    # Progress messages of the pipeline must not end up in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        run: Dict[str, Any] = run_suite(args.sizes, args.seeds, args.region_ratios, args.encodage,
+                                        not args.no_memory, args.timeout, args.native)
+    if args.output:
+        write_json(run, args.output)
+    if args.csv:
+        write_csv(run, args.csv)
+    if not args.output and not args.csv:
+        json.dump(run, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline: Dict[str, Any] = json.load(f)
+        regressions: List[str] = compare(run, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+CNF Cache Module
+
+A content-addressed on-disk cache of encoded grids. The key is a SHA-256 of
+the grid layout (``NoriGrid.to_bytes``) and of the cardinality encoding; the
+value is the encoded CNF in a compact binary file (flat int32 literal array
+plus int64 clause offsets, as produced by the vectorized encoder or the bulk
+DIMACS parser) and, once known, the solver result (status and model) in a
+small JSON sidecar.
+
+A hit skips encoding and parsing entirely, and a hit with a known result
+skips solving too. The cache is bounded in total size: entries are evicted
+least recently used first, using file modification times (refreshed on every
+hit) so that several processes can share a cache directory.
+"""
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+from Module.NoriGrid import NoriGrid
+
+# Binary CNF file: magic, format version, number of variables, of literals, of offsets
+_HEADER = struct.Struct('<4sIQQQ')
+_MAGIC: bytes = b'NCNF'
+_VERSION: int = 1
+
+DEFAULT_MAX_BYTES: int = 256 * 1024 * 1024
+# Eviction frees space down to this fraction of max_bytes, so that the next
+# writes do not trigger another scan right away
+EVICT_TARGET: float = 0.9
+
+
+def _as_array(values: Sequence[int], typecode: str) -> array:
+    """Convert a flat sequence (array, ndarray, list...) to an array of ``typecode``."""
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if hasattr(values, 'astype'):
+        # NumPy arrays: one bulk conversion instead of an element-wise copy
+        result: array = array(typecode)
+        result.frombytes(values.astype(typecode).tobytes())
+        return result
+    return array(typecode, values)
+
+
+def flatten_clauses(clauses: Iterable[List[int]]) -> Tuple[array, array]:
+    """
+    Convert clauses to the flat representation stored in the cache.
+
+    Args:
+        clauses: Iterable of clauses, each clause being a list of literals
+
+    Returns:
+        A tuple (literals, offsets) where clause i is ``literals[offsets[i]:offsets[i + 1]]``
+    """
+    literals: array = array('i')
+    offsets: array = array('q', [0])
+    for clause in clauses:
+        literals.extend(clause)
+        offsets.append(len(literals))
+    return literals, offsets
+
+
+class CacheEntry:
+    """
+    A cached CNF and, if known, its solver result.
+    """
+    def __init__(self, key: str, num_vars: int, literals: array, offsets: array,
+                 status: Optional[str] = None, model: Optional[Dict[int, bool]] = None) -> None:
+        self.key: str = key
+        self.num_vars: int = num_vars
+        self.literals: array = literals
+        self.offsets: array = offsets
+        # "SAT" or "UNSAT" once solved, None otherwise
+        self.status: Optional[str] = status
+        self.model: Optional[Dict[int, bool]] = model
+
+
+class CnfCache:
+    """
+    Size-bounded, content-addressed cache of encoded grids on disk.
+    """
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Args:
+            directory: Cache directory (created if missing); may be shared between processes
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        # Approximate total size: scanned once, then updated by each write;
+        # the directory is only scanned again when it exceeds max_bytes
+        self._approx_size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(grille: NoriGrid, encodage: str) -> str:
+        """
+        Compute the cache key of a grid and an encoding.
+
+        Args:
+            grille: The grid (only its layout matters)
+            encodage: Cardinality encoding used for the region rule, possibly
+                followed by an encoding variant (e.g. "sequentiel/pretraitement")
+
+        Returns:
+            The hexadecimal SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        digest.update(f"nori-cnf/{_VERSION}/{encodage}/".encode())
+        digest.update(grille.to_bytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """Write a file through a temporary file so readers never see partial content."""
+        if self._approx_size is None:
+            self._approx_size = self.size()
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # A replaced file no longer counts in the total
+            try:
+                previous: int = os.stat(path).st_size
+            except OSError:
+                previous = 0
+            os.replace(tmp, path)
+            self._approx_size += len(data) - previous
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def get(self, grille: NoriGrid, encodage: str) -> Optional[CacheEntry]:
+        """
+        Look up the CNF of a grid.
+
+        Args:
+            grille: The grid
+            encodage: Cardinality encoding used for the region rule
+
+        Returns:
+            The cached entry, or None on a miss (or an unreadable entry)
+        """
+        key: str = self.key(grille, encodage)
+        path: str = self._path(key, '.cnf')
+        try:
+            with open(path, 'rb') as f:
+                magic, version, num_vars, num_literals, num_offsets = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION:
+                    raise ValueError(f"Unsupported cache file: {path}")
+                literals: array = array('i')
+                literals.fromfile(f, num_literals)
+                offsets: array = array('q')
+                offsets.fromfile(f, num_offsets)
+        except (OSError, EOFError, ValueError, struct.error):
+            self.misses += 1
+            return None
+
+        status: Optional[str] = None
+        model: Optional[Dict[int, bool]] = None
+        try:
+            with open(self._path(key, '.json'), encoding='utf-8') as f:
+                result: Dict[str, Any] = json.load(f)
+            status = result["status"]
+            if result.get("model") is not None:
+                bits: bytes = bytes.fromhex(result["model"])
+                model = {var: bool(bits[(var - 1) >> 3] >> ((var - 1) & 7) & 1)
+                         for var in range(1, num_vars + 1)}
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # Refresh the entry for the LRU order
+        for extension in ('.cnf', '.json'):
+            try:
+                os.utime(self._path(key, extension))
+            except OSError:
+                pass
+        self.hits += 1
+        return CacheEntry(key, num_vars, literals, offsets, status, model)
+
+    def put(self, grille: NoriGrid, encodage: str, num_vars: int,
+            literals: Sequence[int], offsets: Sequence[int]) -> str:
+        """
+        Store the CNF of a grid, then evict old entries if the cache is too large.
+
+        The size check uses a running estimate, so the cache directory is only
+        scanned when the estimate exceeds ``max_bytes``.
+
+        Args:
+            grille: The grid
+            encodage: Cardinality encoding used for the region rule
+            num_vars: Number of variables of the CNF
+            literals: Flat literal array
+            offsets: Clause boundaries; clause i is literals[offsets[i]:offsets[i + 1]]
+
+        Returns:
+            The key of the entry
+        """
+        key: str = self.key(grille, encodage)
+        flat_literals: array = _as_array(literals, 'i')
+        flat_offsets: array = _as_array(offsets, 'q')
+        header: bytes = _HEADER.pack(_MAGIC, _VERSION, num_vars, len(flat_literals), len(flat_offsets))
+        self._write_atomic(self._path(key, '.cnf'),
+                           header + flat_literals.tobytes() + flat_offsets.tobytes())
+        if self._approx_size is not None and self._approx_size > self.max_bytes:
+            self.evict()
+        return key
+
+    def store_result(self, key: str, status: str, model: Optional[Dict[int, bool]] = None) -> None:
+        """
+        Record the solver result of a cached CNF.
+
+        Args:
+            key: Key returned by ``put`` (or ``CacheEntry.key``)
+            status: "SAT" or "UNSAT"
+            model: The model found, stored as a packed bitset
+        """
+        packed: Optional[str] = None
+        if model is not None:
+            bits: bytearray = bytearray((max(model, default=0) + 7) // 8)
+            for var, value in model.items():
+                if value:
+                    bits[(var - 1) >> 3] |= 1 << ((var - 1) & 7)
+            packed = bits.hex()
+        data: bytes = json.dumps({"status": status, "model": packed}).encode('utf-8')
+        self._write_atomic(self._path(key, '.json'), data)
+
+    def size(self) -> int:
+        """Total size of the cache files, in bytes."""
+        total: int = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.cnf', '.json')):
+                try:
+                    total += entry.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries if the cache exceeds ``max_bytes``,
+        down to ``EVICT_TARGET`` of it.
+
+        Returns:
+            The number of entries removed
+        """
+        entries: Dict[str, List[float]] = {}
+        total: int = 0
+        for entry in os.scandir(self.directory):
+            key, extension = os.path.splitext(entry.name)
+            if extension not in ('.cnf', '.json'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            # [size of the entry's files, most recent use]
+            record: List[float] = entries.setdefault(key, [0, 0.0])
+            record[0] += stat.st_size
+            record[1] = max(record[1], stat.st_mtime)
+            total += stat.st_size
+        self._approx_size = total
+        if total <= self.max_bytes:
+            return 0
+
+        removed: int = 0
+        target: float = self.max_bytes * EVICT_TARGET
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= target:
+                break
+            for extension in ('.cnf', '.json'):
+                try:
+                    os.remove(self._path(key, extension))
+                except OSError:
+                    pass
+            total -= int(size)
+            removed += 1
+        self._approx_size = total
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._approx_size = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.cnf', '.json')):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
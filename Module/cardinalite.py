@@ -0,0 +1,276 @@
+"""
+Encodages de cardinalité pour les contraintes « exactement k » en CNF.
+
+Ce module fournit plusieurs encodages de la contrainte « exactement k
+variables parmi n sont vraies », utilisée par la première règle du NoriNori
+(exactement deux cellules colorées par région) :
+
+- naif : énumération des sous-ensembles, sans variable auxiliaire
+  (O(n^(k+1)) clauses) ;
+- sequentiel : compteur séquentiel unaire (Sinz), O(n·k) clauses ;
+- totalisateur : arbre de compteurs unaires (Bailleux-Boufkhad), O(n·k) clauses
+  pour k fixé ;
+- reseau : réseau de cardinalité pair-impair (Asín et al.), O(n·log²k) clauses.
+
+Les encodages auxiliaires produisent un compteur unaire dont la sortie j est
+équivalente à « au moins j entrées sont vraies » ; la contrainte s'exprime
+alors par deux clauses unitaires sur ces sorties.
+"""
+from functools import lru_cache
+from typing import List, Tuple
+import itertools
+
+ENCODAGES: Tuple[str, ...] = ("naif", "sequentiel", "totalisateur", "reseau")
+ENCODAGE_PAR_DEFAUT: str = "sequentiel"
+
+
+class CompteurVariables:
+    """Alloue des identifiants de variables auxiliaires consécutifs."""
+
+    def __init__(self, prochaine: int) -> None:
+        """
+        Args:
+            prochaine: Premier identifiant de variable disponible
+        """
+        self.prochaine: int = prochaine
+
+    def nouvelle(self) -> int:
+        """Retourne un nouvel identifiant de variable auxiliaire."""
+        var: int = self.prochaine
+        self.prochaine += 1
+        return var
+
+
+def verifier_encodage(encodage: str) -> None:
+    """
+    Vérifie qu'un nom d'encodage est connu.
+
+    Raises:
+        ValueError: Si l'encodage n'existe pas
+    """
+    if encodage not in ENCODAGES:
+        raise ValueError(f"Encodage inconnu: {encodage} (attendu: {', '.join(ENCODAGES)})")
+
+
+def _fusion_unaire(a: List[int], b: List[int], m: int,
+                   compteur: CompteurVariables, clauses: List[List[int]]) -> List[int]:
+    """
+    Additionne deux compteurs unaires (nœud de totalisateur tronqué à m).
+
+    Args:
+        a: Sorties du premier compteur (a[i-1] équivaut à « au moins i »)
+        b: Sorties du second compteur
+        m: Nombre maximal de sorties conservées
+        compteur: Allocateur de variables auxiliaires
+        clauses: Liste recevant les clauses générées
+
+    Returns:
+        Les sorties du compteur somme
+    """
+    p, q = len(a), len(b)
+    taille: int = min(p + q, m)
+    r: List[int] = [compteur.nouvelle() for _ in range(taille)]
+
+    for i in range(p + 1):
+        for j in range(q + 1):
+            # a_i ET b_j => r_(i+j)
+            if 0 < i + j <= taille:
+                clause: List[int] = []
+                if i:
+                    clause.append(-a[i - 1])
+                if j:
+                    clause.append(-b[j - 1])
+                clause.append(r[i + j - 1])
+                clauses.append(clause)
+            # NON a_(i+1) ET NON b_(j+1) => NON r_(i+j+1)
+            if i + j < taille:
+                clause = []
+                if i < p:
+                    clause.append(a[i])
+                if j < q:
+                    clause.append(b[j])
+                clause.append(-r[i + j])
+                clauses.append(clause)
+    return r
+
+
+def _compteur_sequentiel(variables: List[int], m: int,
+                         compteur: CompteurVariables, clauses: List[List[int]]) -> List[int]:
+    """Compteur unaire construit en ajoutant les entrées une par une."""
+    sorties: List[int] = [variables[0]]
+    for var in variables[1:]:
+        sorties = _fusion_unaire(sorties, [var], m, compteur, clauses)
+    return sorties
+
+
+def _totalisateur(variables: List[int], m: int,
+                  compteur: CompteurVariables, clauses: List[List[int]]) -> List[int]:
+    """Compteur unaire construit comme un arbre binaire équilibré de fusions."""
+    if len(variables) == 1:
+        return [variables[0]]
+    milieu: int = len(variables) // 2
+    gauche: List[int] = _totalisateur(variables[:milieu], m, compteur, clauses)
+    droite: List[int] = _totalisateur(variables[milieu:], m, compteur, clauses)
+    return _fusion_unaire(gauche, droite, m, compteur, clauses)
+
+
+class _Reseau:
+    """
+    Réseau de comparateurs construit symboliquement, puis élagué : seules les
+    portes qui influencent les sorties demandées produisent des clauses.
+    """
+
+    def __init__(self, entrees: List[int]) -> None:
+        # Les fils sont numérotés à partir de 0 ; les entrées sont les premiers fils
+        self.litteraux: List[int] = list(entrees)
+        self.comparateurs: List[Tuple[int, int, int, int]] = []
+
+    def _fil(self) -> int:
+        self.litteraux.append(0)
+        return len(self.litteraux) - 1
+
+    def comparer(self, x: int, y: int) -> Tuple[int, int]:
+        """Ajoute un comparateur et retourne les fils (max, min)."""
+        haut, bas = self._fil(), self._fil()
+        self.comparateurs.append((x, y, haut, bas))
+        return haut, bas
+
+    def fusionner(self, a: List[int], b: List[int]) -> List[int]:
+        """Fusion pair-impair de Batcher de deux suites triées (décroissantes)."""
+        if not a:
+            return b
+        if not b:
+            return a
+        if len(a) == 1 and len(b) == 1:
+            return list(self.comparer(a[0], b[0]))
+        pairs: List[int] = self.fusionner(a[0::2], b[0::2])
+        impairs: List[int] = self.fusionner(a[1::2], b[1::2])
+        sortie: List[int] = [pairs[0]]
+        i: int = 0
+        while i < len(impairs) and i + 1 < len(pairs):
+            sortie.extend(self.comparer(impairs[i], pairs[i + 1]))
+            i += 1
+        sortie.extend(impairs[i:])
+        sortie.extend(pairs[i + 1:])
+        return sortie
+
+    def trier(self, fils: List[int], m: int) -> List[int]:
+        """Trie les fils ; seules les m premières sorties sont conservées."""
+        if len(fils) <= 1:
+            return fils
+        milieu: int = len(fils) // 2
+        gauche: List[int] = self.trier(fils[:milieu], m)
+        droite: List[int] = self.trier(fils[milieu:], m)
+        return self.fusionner(gauche, droite)[:m]
+
+    def encoder(self, sorties: List[int], compteur: CompteurVariables,
+                clauses: List[List[int]]) -> List[int]:
+        """
+        Génère les clauses des portes utiles aux sorties données.
+
+        Returns:
+            Les littéraux correspondant aux sorties
+        """
+        utile: List[bool] = [False] * len(self.litteraux)
+        for fil in sorties:
+            utile[fil] = True
+        portes: List[Tuple[int, int, int, int]] = []
+        for x, y, haut, bas in reversed(self.comparateurs):
+            if utile[haut] or utile[bas]:
+                utile[x] = utile[y] = True
+                portes.append((x, y, haut, bas))
+        portes.reverse()
+
+        lit: List[int] = self.litteraux
+        for x, y, haut, bas in portes:
+            if utile[haut]:
+                lit[haut] = compteur.nouvelle()
+            if utile[bas]:
+                lit[bas] = compteur.nouvelle()
+        for x, y, haut, bas in portes:
+            if utile[haut]:
+                # haut <=> x OU y
+                clauses.append([-lit[x], lit[haut]])
+                clauses.append([-lit[y], lit[haut]])
+                clauses.append([-lit[haut], lit[x], lit[y]])
+            if utile[bas]:
+                # bas <=> x ET y
+                clauses.append([-lit[x], -lit[y], lit[bas]])
+                clauses.append([-lit[bas], lit[x]])
+                clauses.append([-lit[bas], lit[y]])
+        return [lit[fil] for fil in sorties]
+
+
+def _reseau_cardinalite(variables: List[int], m: int,
+                        compteur: CompteurVariables, clauses: List[List[int]]) -> List[int]:
+    """Compteur unaire obtenu par un réseau de tri tronqué aux m premières sorties."""
+    reseau: _Reseau = _Reseau(variables)
+    sorties: List[int] = reseau.trier(list(range(len(variables))), m)
+    return reseau.encoder(sorties, compteur, clauses)
+
+
+_COMPTEURS = {
+    "sequentiel": _compteur_sequentiel,
+    "totalisateur": _totalisateur,
+    "reseau": _reseau_cardinalite,
+}
+
+
+def exactement_k(variables: List[int], k: int, compteur: CompteurVariables,
+                 encodage: str = ENCODAGE_PAR_DEFAUT) -> List[List[int]]:
+    """
+    Génère les clauses imposant qu'exactement k variables soient vraies.
+
+    Args:
+        variables: Les variables concernées
+        k: Le nombre de variables vraies attendu
+        compteur: Allocateur des variables auxiliaires
+        encodage: L'encodage de cardinalité à utiliser (voir ENCODAGES)
+
+    Returns:
+        La liste des clauses, chaque clause étant une liste d'entiers
+
+    Raises:
+        ValueError: Si l'encodage est inconnu
+    """
+    verifier_encodage(encodage)
+    n: int = len(variables)
+    if k > n:
+        return [[]]
+    if k == n or k == 0:
+        return [[var if k else -var] for var in variables]
+
+    if encodage == "naif":
+        clauses: List[List[int]] = []
+        # Au moins k : tout sous-ensemble de n-k+1 variables en contient une vraie
+        for sous_ensemble in itertools.combinations(variables, n - k + 1):
+            clauses.append(list(sous_ensemble))
+        # Au plus k : tout sous-ensemble de k+1 variables en contient une fausse
+        for sous_ensemble in itertools.combinations(variables, k + 1):
+            clauses.append([-var for var in sous_ensemble])
+        return clauses
+
+    clauses = []
+    sorties: List[int] = _COMPTEURS[encodage](list(variables), k + 1, compteur, clauses)
+    clauses.append([sorties[k - 1]])
+    if len(sorties) > k:
+        clauses.append([-sorties[k]])
+    return clauses
+
+
+@lru_cache(maxsize=None)
+def nombre_auxiliaires(n: int, k: int, encodage: str = ENCODAGE_PAR_DEFAUT) -> int:
+    """
+    Calcule le nombre de variables auxiliaires introduites par exactement_k.
+
+    Args:
+        n: Le nombre de variables de la contrainte
+        k: Le nombre de variables vraies attendu
+        encodage: L'encodage de cardinalité
+
+    Returns:
+        Le nombre de variables auxiliaires
+    """
+    compteur: CompteurVariables = CompteurVariables(n + 1)
+    exactement_k(list(range(1, n + 1)), k, compteur, encodage)
+    return compteur.prochaine - (n + 1)
@@ -0,0 +1,680 @@
+"""
+CDCL Algorithm Implementation
+
+Conflict-driven clause learning solver: two-watched-literal unit propagation,
+an assignment trail with backtracking (no clause copying), first-UIP conflict
+analysis with learned clauses and non-chronological backjumping.
+
+The solver is incremental: clauses can be added between calls to ``solve``,
+learned clauses are kept across calls, and each call may take assumptions
+(literals decided first, MiniSat style). When the formula is unsatisfiable
+under the assumptions, the subset of assumptions responsible is reported in
+``failed_assumptions``.
+
+Long searches are kept in check by restarts (Luby sequence or glucose-style,
+driven by the LBD of recent learned clauses) with phase saving, so that a
+restart resumes close to the abandoned assignment, and by a periodic
+reduction of the learned clause database: clauses with a small LBD ("glue"
+clauses) are kept, the others are ranked by LBD and activity and the worst
+part is deleted.
+
+Search counters and phase timings are available as a SolverStats snapshot
+(``statistics``); the propagation, branching and analysis timings are only
+measured when the solver is built with ``timings=True``. ``solve`` can call a
+progress callback every N conflicts, which may abort the search.
+
+Internally a literal is encoded as ``2 * var + sign`` (sign is 1 for a negated
+literal), so the negation of a literal ``l`` is ``l ^ 1``.
+"""
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import random
+import time
+
+from Module.heuristics import BranchingHeuristic, make_heuristic
+from Module.stats import ProgressCallback, SolverStats
+
+TRUE: int = 1
+FALSE: int = -1
+UNDEF: int = 0
+
+RESTARTS: Tuple[str, ...] = ("luby", "glucose", "none")
+
+# Glucose restarts: window of recent LBDs and margin over the global average
+_LBD_WINDOW: int = 50
+_LBD_MARGIN: float = 0.8
+# Decay of the learned clause activities
+_CLAUSE_DECAY: float = 0.999
+
+
+def to_internal(lit: int) -> int:
+    """Convert a DIMACS literal into the internal literal encoding."""
+    return 2 * lit if lit > 0 else -2 * lit + 1
+
+
+def to_dimacs(lit: int) -> int:
+    """Convert an internal literal back into a DIMACS literal."""
+    return -(lit >> 1) if lit & 1 else lit >> 1
+
+
+def luby(i: int) -> int:
+    """Return the i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    size: int = 1
+    power: int = 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        power -= 1
+        i %= size
+    return 1 << power
+
+
+class Clause:
+    """
+    A clause of internal literals; ``lits[0]`` and ``lits[1]`` are watched.
+
+    Learned clauses also carry their LBD (number of distinct decision levels
+    when learned) and an activity bumped when they take part in a conflict.
+    """
+    __slots__ = ('lits', 'learnt', 'lbd', 'activity')
+
+    def __init__(self, lits: List[int], learnt: bool = False, lbd: int = 0) -> None:
+        self.lits: List[int] = lits
+        self.learnt: bool = learnt
+        self.lbd: int = lbd
+        self.activity: float = 0.0
+
+
+class CdclSolver:
+    """
+    A CDCL SAT solver working in place on a single assignment trail.
+    """
+    def __init__(self, num_vars: int = 0, heuristic: Union[str, BranchingHeuristic] = "index",
+                 seed: Optional[int] = None, polarity: Optional[str] = None,
+                 random_freq: float = 0.0, restarts: str = "luby", restart_base: int = 100,
+                 phase_saving: bool = True, reduce_interval: int = 2000,
+                 reduce_increment: int = 300, reduce_fraction: float = 0.5,
+                 glue_lbd: int = 2, timings: bool = False) -> None:
+        """
+        Initialize an empty solver.
+
+        Args:
+            num_vars: Number of variables to allocate up front
+            heuristic: Branching strategy, a name from heuristics.HEURISTICS
+                (except "region", which needs a grid) or a heuristic instance
+            seed: Seed of the random generators (solver and named heuristic)
+            polarity: Value tried first on a decision: "true", "false" or
+                "random" (heuristic default if None; ignored for an instance)
+            random_freq: Probability of branching on a random unassigned variable
+            restarts: Restart policy, one of RESTARTS: "luby" (restart_base
+                times the Luby sequence, in conflicts), "glucose" (when recent
+                learned clauses have a worse LBD than average) or "none"
+            restart_base: Unit of the Luby restart intervals, in conflicts
+            phase_saving: Decide variables with the value they had last
+                (instead of the heuristic polarity once they have been assigned)
+            reduce_interval: Conflicts before the first learned clause
+                database reduction
+            reduce_increment: Growth of the interval after each reduction
+            reduce_fraction: Share of the reducible learned clauses deleted by
+                a reduction
+            glue_lbd: Learned clauses with an LBD up to this value are never deleted
+            timings: Measure the time spent in propagation, branching and
+                conflict analysis (two clock reads per search step); when
+                False only ``solve_time`` is measured
+
+        Raises:
+            ValueError: If the heuristic, polarity or restart policy name is unknown
+        """
+        if restarts not in RESTARTS:
+            raise ValueError(f"Unknown restart policy: {restarts} (expected one of {RESTARTS})")
+        if isinstance(heuristic, str):
+            heuristic = make_heuristic(heuristic, seed, polarity)
+        self.heuristic: BranchingHeuristic = heuristic
+        self.rng: random.Random = random.Random(seed)
+        self.random_freq: float = random_freq
+        self.restart_policy: str = restarts
+        self.restart_base: int = restart_base
+        self.phase_saving: bool = phase_saving
+        self.reduce_interval: int = reduce_interval
+        self.reduce_increment: int = reduce_increment
+        self.reduce_fraction: float = reduce_fraction
+        self.glue_lbd: int = glue_lbd
+        self.timings: bool = timings
+        self.num_vars: int = 0
+        self.clauses: List[Clause] = []
+        self.learnts: List[Clause] = []
+        # Indexed by internal literal
+        self.values: List[int] = [UNDEF, UNDEF]
+        self.watches: List[List[Clause]] = [[], []]
+        # Indexed by variable
+        self.level: List[int] = [0]
+        self.reason: List[Optional[Clause]] = [None]
+        self.seen: List[bool] = [False]
+        # Last value of each variable (its sign bit), -1 if never assigned
+        self.phase: List[int] = [-1]
+
+        self.trail: List[int] = []
+        self.trail_lim: List[int] = []
+        self.qhead: int = 0
+        self.ok: bool = True
+        # Assumptions of the last solve that made it unsatisfiable (DIMACS literals)
+        self.failed_assumptions: List[int] = []
+        # Learned clause activity increment, and conflict count of the next reduction
+        self.clause_increment: float = 1.0
+        self.next_reduce: int = reduce_interval
+        # LBDs of the last learned clauses and running total, for glucose restarts
+        self.recent_lbds: Deque[int] = deque(maxlen=_LBD_WINDOW)
+        self.lbd_total: int = 0
+
+        # Cumulative counters and timings, see statistics
+        self.decisions: int = 0
+        self.propagations: int = 0
+        self.conflicts: int = 0
+        self.restarts: int = 0
+        self.learned: int = 0
+        self.propagate_time: float = 0.0
+        self.branch_time: float = 0.0
+        self.analyze_time: float = 0.0
+        self.solve_time: float = 0.0
+
+        self.heuristic.attach(self)
+        self._grow(num_vars)
+
+    def _grow(self, num_vars: int) -> None:
+        """Allocate per-variable storage up to ``num_vars``."""
+        missing: int = num_vars - self.num_vars
+        if missing <= 0:
+            return
+        self.values.extend([UNDEF] * (2 * missing))
+        self.watches.extend([] for _ in range(2 * missing))
+        self.level.extend([0] * missing)
+        self.reason.extend([None] * missing)
+        self.seen.extend([False] * missing)
+        self.phase.extend([-1] * missing)
+        self.heuristic.new_vars(list(range(self.num_vars + 1, num_vars + 1)))
+        self.num_vars = num_vars
+
+    def decision_level(self) -> int:
+        """Return the current decision level."""
+        return len(self.trail_lim)
+
+    def add_clause(self, clause: Iterable[int]) -> bool:
+        """
+        Add a clause given as DIMACS literals.
+
+        The clause is simplified against the top-level assignment: duplicate
+        literals and literals false at level 0 are dropped, tautologies and
+        satisfied clauses are ignored.
+
+        Args:
+            clause: Iterable of non-zero DIMACS literals
+
+        Returns:
+            False if the formula is now known to be unsatisfiable, True otherwise
+        """
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self._cancel_until(0)
+
+        values: List[int] = self.values
+        lits: List[int] = []
+        seen_lits = set()
+        for lit in clause:
+            var: int = abs(lit)
+            if var > self.num_vars:
+                self._grow(var)
+                values = self.values
+            ilit: int = to_internal(lit)
+            if ilit ^ 1 in seen_lits or values[ilit] == TRUE:
+                return True
+            if ilit in seen_lits or values[ilit] == FALSE:
+                continue
+            seen_lits.add(ilit)
+            lits.append(ilit)
+
+        if not lits:
+            self.ok = False
+            return False
+        if len(lits) == 1:
+            self._enqueue(lits[0], None)
+            return True
+
+        c: Clause = Clause(lits)
+        self._attach(c)
+        self.clauses.append(c)
+        return True
+
+    def add_clauses_flat(self, literals: Sequence[int], offsets: Sequence[int]) -> bool:
+        """
+        Add clauses stored as one flat literal array plus clause offsets.
+
+        Args:
+            literals: Flat sequence of DIMACS literals (array('i'), ndarray, list...)
+            offsets: Clause boundaries; clause i is literals[offsets[i]:offsets[i + 1]]
+
+        Returns:
+            False if the formula is now known to be unsatisfiable, True otherwise
+        """
+        lits: List[int] = literals.tolist() if hasattr(literals, 'tolist') else list(literals)
+        bounds: List[int] = offsets.tolist() if hasattr(offsets, 'tolist') else list(offsets)
+        for i in range(len(bounds) - 1):
+            if not self.add_clause(lits[bounds[i]:bounds[i + 1]]):
+                return False
+        return True
+
+    def _attach(self, c: Clause) -> None:
+        """Register the two watched literals of a clause."""
+        self.watches[c.lits[0]].append(c)
+        self.watches[c.lits[1]].append(c)
+
+    def _enqueue(self, lit: int, reason: Optional[Clause]) -> None:
+        """Assign ``lit`` to true at the current decision level."""
+        var: int = lit >> 1
+        self.values[lit] = TRUE
+        self.values[lit ^ 1] = FALSE
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self) -> Optional[Clause]:
+        """
+        Run unit propagation over the watch lists.
+
+        Returns:
+            The conflicting clause, or None if no conflict was found
+        """
+        trail: List[int] = self.trail
+        values: List[int] = self.values
+        watches: List[List[Clause]] = self.watches
+
+        while self.qhead < len(trail):
+            false_lit: int = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            ws: List[Clause] = watches[false_lit]
+            i: int = 0
+            j: int = 0
+            n: int = len(ws)
+            while i < n:
+                c: Clause = ws[i]
+                i += 1
+                lits: List[int] = c.lits
+                # Make sure the false literal is lits[1]
+                if lits[0] == false_lit:
+                    lits[0] = lits[1]
+                    lits[1] = false_lit
+                first: int = lits[0]
+                if values[first] == TRUE:
+                    ws[j] = c
+                    j += 1
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(lits)):
+                    lit: int = lits[k]
+                    if values[lit] != FALSE:
+                        lits[1] = lit
+                        lits[k] = false_lit
+                        watches[lit].append(c)
+                        break
+                else:
+                    # Clause is unit or conflicting
+                    ws[j] = c
+                    j += 1
+                    if values[first] == FALSE:
+                        while i < n:
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        del ws[j:]
+                        self.qhead = len(trail)
+                        return c
+                    self._enqueue(first, c)
+            del ws[j:]
+        return None
+
+    def _analyze(self, confl: Clause) -> Tuple[List[int], int]:
+        """
+        First-UIP conflict analysis.
+
+        Args:
+            confl: The conflicting clause
+
+        Returns:
+            A tuple (learnt clause, backjump level). ``learnt[0]`` is the
+            asserting literal and ``learnt[1]`` (if any) has the highest level
+            among the remaining literals.
+        """
+        seen: List[bool] = self.seen
+        level: List[int] = self.level
+        trail: List[int] = self.trail
+        current: int = len(self.trail_lim)
+
+        bump = self.heuristic.bump
+        bump_clause = self._bump_clause
+        learnt: List[int] = [0]
+        counter: int = 0
+        p: int = -1
+        index: int = len(trail) - 1
+        c: Optional[Clause] = confl
+
+        while True:
+            assert c is not None
+            if c.learnt:
+                bump_clause(c)
+            lits: List[int] = c.lits
+            for k in range(0 if p == -1 else 1, len(lits)):
+                q: int = lits[k]
+                var: int = q >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    bump(var)
+                    if level[var] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # Next literal of the current level on the trail
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            p = trail[index]
+            index -= 1
+            c = self.reason[p >> 1]
+            seen[p >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = p ^ 1
+
+        # Drop literals implied by the rest of the learnt clause
+        kept: List[int] = [learnt[0]]
+        for q in learnt[1:]:
+            r: Optional[Clause] = self.reason[q >> 1]
+            if r is None or any(not seen[l >> 1] and level[l >> 1] > 0 for l in r.lits[1:]):
+                kept.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        learnt = kept
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best: int = 1
+        for k in range(2, len(learnt)):
+            if level[learnt[k] >> 1] > level[learnt[best] >> 1]:
+                best = k
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def _bump_clause(self, c: Clause) -> None:
+        """Increase the activity of a learned clause involved in a conflict."""
+        c.activity += self.clause_increment
+        if c.activity > 1e20:
+            for learnt in self.learnts:
+                learnt.activity *= 1e-20
+            self.clause_increment *= 1e-20
+
+    def _restart_due(self, since_restart: int) -> bool:
+        """
+        Tell whether the search should restart.
+
+        Args:
+            since_restart: Conflicts since the last restart
+
+        Returns:
+            True if the restart policy asks for a restart now
+        """
+        if self.restart_policy == "luby":
+            return since_restart >= self.restart_base * luby(self.restarts)
+        if self.restart_policy == "glucose":
+            recent: Deque[int] = self.recent_lbds
+            return (len(recent) == _LBD_WINDOW and
+                    sum(recent) * _LBD_MARGIN * self.learned > self.lbd_total * _LBD_WINDOW)
+        return False
+
+    def _locked(self, c: Clause) -> bool:
+        """Tell whether ``c`` is the reason of a current assignment."""
+        first: int = c.lits[0]
+        return self.values[first] == TRUE and self.reason[first >> 1] is c
+
+    def reduce_learnts(self) -> int:
+        """
+        Delete the least useful learned clauses.
+
+        Glue clauses (LBD up to ``glue_lbd``) and clauses that are the reason
+        of a current assignment are kept; the others are ranked by LBD, then
+        activity, and the worst ``reduce_fraction`` of them is removed.
+
+        Returns:
+            The number of deleted clauses
+        """
+        kept: List[Clause] = []
+        candidates: List[Clause] = []
+        for c in self.learnts:
+            if c.lbd <= self.glue_lbd or self._locked(c):
+                kept.append(c)
+            else:
+                candidates.append(c)
+        candidates.sort(key=lambda c: (c.lbd, -c.activity))
+        cut: int = len(candidates) - int(len(candidates) * self.reduce_fraction)
+        removed: Set[int] = {id(c) for c in candidates[cut:]}
+        if not removed:
+            return 0
+        self.learnts = kept + candidates[:cut]
+        for ws in self.watches:
+            ws[:] = [c for c in ws if id(c) not in removed]
+        return len(removed)
+
+    def _cancel_until(self, target: int) -> None:
+        """Undo every assignment made above decision level ``target``."""
+        if len(self.trail_lim) <= target:
+            return
+        values: List[int] = self.values
+        reason: List[Optional[Clause]] = self.reason
+        phase: List[int] = self.phase
+        saving: bool = self.phase_saving
+        unassigned = self.heuristic.unassigned
+        start: int = self.trail_lim[target]
+        for lit in self.trail[start:]:
+            var: int = lit >> 1
+            values[lit] = UNDEF
+            values[lit ^ 1] = UNDEF
+            reason[var] = None
+            if saving:
+                phase[var] = lit & 1
+            unassigned(var)
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = start
+        self.heuristic.backtrack(start)
+
+    def _pick_branch(self) -> Optional[int]:
+        """Return the next decision literal, or None if all variables are assigned."""
+        var: Optional[int] = None
+        if self.random_freq and self.rng.random() < self.random_freq:
+            candidate: int = self.rng.randint(1, self.num_vars)
+            if self.values[2 * candidate] == UNDEF:
+                var = candidate
+        if var is None:
+            var = self.heuristic.pick()
+            if var is None:
+                return None
+        return self.heuristic.literal(var)
+
+    def _analyze_final(self, lit: int) -> List[int]:
+        """
+        Find the assumptions that imply the negation of the assumption ``lit``.
+
+        Args:
+            lit: An assumption (internal literal) found false
+
+        Returns:
+            The responsible assumptions, ``lit`` included, as DIMACS literals
+        """
+        failed: List[int] = [to_dimacs(lit)]
+        if not self.trail_lim:
+            return failed
+        seen: List[bool] = self.seen
+        seen[lit >> 1] = True
+        for i in range(len(self.trail) - 1, self.trail_lim[0] - 1, -1):
+            var: int = self.trail[i] >> 1
+            if not seen[var]:
+                continue
+            r: Optional[Clause] = self.reason[var]
+            if r is None:
+                # Decisions below the assumption levels are assumptions; this
+                # includes the opposite of ``lit`` when both were assumed
+                if self.trail[i] != lit:
+                    failed.append(to_dimacs(self.trail[i]))
+            else:
+                for q in r.lits[1:]:
+                    if self.level[q >> 1] > 0:
+                        seen[q >> 1] = True
+            seen[var] = False
+        seen[lit >> 1] = False
+        return failed
+
+    def statistics(self) -> SolverStats:
+        """Return a snapshot of the cumulative counters and timings."""
+        return SolverStats(decisions=self.decisions, propagations=self.propagations,
+                           conflicts=self.conflicts, restarts=self.restarts,
+                           learned=self.learned, propagate_time=self.propagate_time,
+                           branch_time=self.branch_time, analyze_time=self.analyze_time,
+                           solve_time=self.solve_time)
+
+    def solve(self, time_limit: Optional[float] = None,
+              assumptions: Sequence[int] = (),
+              progress: Optional[ProgressCallback] = None,
+              progress_interval: int = 1000) -> Optional[bool]:
+        """
+        Search for a satisfying assignment.
+
+        Args:
+            time_limit: Optional budget in seconds; the search gives up once
+                it is exceeded
+            assumptions: DIMACS literals assumed true for this call only
+            progress: Optional callback called with ``statistics()`` every
+                ``progress_interval`` conflicts; returning False stops the search
+            progress_interval: Number of conflicts between two progress calls
+
+        Returns:
+            True if the formula is satisfiable (see ``model``), False if it is
+            unsatisfiable (under the assumptions, see ``failed_assumptions``),
+            None if the time limit was reached or the progress callback stopped
+            the search
+
+        Raises:
+            ValueError: If progress_interval is not positive
+        """
+        if progress_interval <= 0:
+            raise ValueError(f"progress_interval must be positive, got {progress_interval}")
+        start: float = time.perf_counter()
+        try:
+            return self._search(time_limit, assumptions, progress, progress_interval)
+        finally:
+            self.solve_time += time.perf_counter() - start
+
+    def _search(self, time_limit: Optional[float], assumptions: Sequence[int],
+                progress: Optional[ProgressCallback], progress_interval: int) -> Optional[bool]:
+        """Body of ``solve``."""
+        self.failed_assumptions = []
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        for lit in assumptions:
+            if abs(lit) > self.num_vars:
+                self._grow(abs(lit))
+        assumed: List[int] = [to_internal(lit) for lit in assumptions]
+        deadline: Optional[float] = None if time_limit is None else time.monotonic() + time_limit
+        # Phase timings are only sampled on demand, see the timings option
+        timed: bool = self.timings
+        clock = time.perf_counter
+        now: float = 0.0
+        since_restart: int = 0
+
+        while True:
+            if timed:
+                before: float = clock()
+                confl: Optional[Clause] = self._propagate()
+                now = clock()
+                self.propagate_time += now - before
+            else:
+                confl = self._propagate()
+            if confl is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                since_restart += 1
+                learnt, backjump = self._analyze(confl)
+                lbd: int = len({self.level[q >> 1] for q in learnt})
+                self.heuristic.decay()
+                self.clause_increment /= _CLAUSE_DECAY
+                self._cancel_until(backjump)
+                self.learned += 1
+                self.recent_lbds.append(lbd)
+                self.lbd_total += lbd
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    c: Clause = Clause(learnt, learnt=True, lbd=lbd)
+                    self._attach(c)
+                    self.learnts.append(c)
+                    self._enqueue(learnt[0], c)
+                if self.conflicts >= self.next_reduce:
+                    self.next_reduce = self.conflicts + self.reduce_interval
+                    self.reduce_interval += self.reduce_increment
+                    self.reduce_learnts()
+                if timed:
+                    self.analyze_time += clock() - now
+                if deadline is not None and self.conflicts % 64 == 0 and time.monotonic() > deadline:
+                    self._cancel_until(0)
+                    return None
+                if (progress is not None and self.conflicts % progress_interval == 0
+                        and progress(self.statistics()) is False):
+                    self._cancel_until(0)
+                    return None
+            else:
+                if since_restart and self._restart_due(since_restart):
+                    # Keep the assumption levels, redo the search above them
+                    self.restarts += 1
+                    since_restart = 0
+                    self.recent_lbds.clear()
+                    self._cancel_until(min(len(assumed), len(self.trail_lim)))
+                lit: Optional[int] = None
+                while len(self.trail_lim) < len(assumed):
+                    # Decide the next assumption (a dummy level if it already holds)
+                    p: int = assumed[len(self.trail_lim)]
+                    if self.values[p] == TRUE:
+                        self.trail_lim.append(len(self.trail))
+                    elif self.values[p] == FALSE:
+                        self.failed_assumptions = self._analyze_final(p)
+                        self._cancel_until(0)
+                        return False
+                    else:
+                        lit = p
+                        break
+                if lit is None:
+                    lit = self._pick_branch()
+                if timed:
+                    self.branch_time += clock() - now
+                if lit is None:
+                    return True
+                self.decisions += 1
+                if deadline is not None and self.decisions % 1024 == 0 and time.monotonic() > deadline:
+                    self._cancel_until(0)
+                    return None
+                self.trail_lim.append(len(self.trail))
+                self._enqueue(lit, None)
+
+    def model(self) -> Dict[int, bool]:
+        """
+        Return the current assignment as a dictionary.
+
+        Returns:
+            Dictionary mapping variable numbers to boolean values; unassigned
+            variables are reported as True
+        """
+        values: List[int] = self.values
+        return {var: values[2 * var] != FALSE for var in range(1, self.num_vars + 1)}
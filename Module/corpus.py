@@ -0,0 +1,346 @@
+"""
+Grid Corpus Module
+
+A compact binary format for large collections of grids, read through a
+memory map so that grid i can be fetched without loading the rest.
+
+File layout (little-endian):
+
+- header: magic ``NCRP``, format version, flags (bit 0: solutions are
+  stored), number of grids, offset of the index;
+- records, one per grid: width and height (uint16) followed by the region id
+  of every cell (uint16, row by row), which is exactly ``NoriGrid.to_bytes``;
+  when the corpus stores solutions, the record ends with the shaded cells as
+  a packed bitset (bit ``row * width + col``, ceil(width * height / 8)
+  bytes, all zero when the solution is unknown);
+- index: ``count + 1`` uint64 record offsets (the last one is the end of the
+  records), aligned on 8 bytes and read in place from the memory map.
+
+Usage:
+    python -m Module.corpus pack puzzles.jsonl corpus.ncrp
+    python -m Module.corpus info corpus.ncrp
+    python -m Module.corpus show corpus.ncrp 42
+"""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+
+from Module.NoriGrid import NoriGrid
+
+# Header: magic, format version, flags, number of grids, offset of the index
+_HEADER = struct.Struct('<4sIIQQ')
+_MAGIC: bytes = b'NCRP'
+_VERSION: int = 1
+_FLAG_SOLUTIONS: int = 1
+# Record prefix: width and height
+_DIMENSIONS = struct.Struct('<HH')
+
+# A solution: flat indices of the shaded cells, or a SatSolver model ({variable: bool})
+Solution = Union[Sequence[int], Dict[int, bool]]
+
+
+def _cells_bytes(grille: NoriGrid) -> bytes:
+    """
+    Region ids of the cells as little-endian uint16.
+
+    Raises:
+        ValueError: If a region id does not fit in 16 bits
+    """
+    cells: array = grille.cell_regions()
+    if cells.typecode != 'H':
+        raise ValueError(f"Region id {max(cells)} does not fit the uint16 cells of a corpus")
+    if sys.byteorder == 'big':
+        cells = array('H', cells)
+        cells.byteswap()
+    return cells.tobytes()
+
+
+def _pack_solution(solution: Optional[Solution], size: int) -> bytes:
+    """Pack the shaded cells of a solution into a bitset of ceil(size / 8) bytes."""
+    bits: int = 0
+    if isinstance(solution, dict):
+        for cell in range(size):
+            if solution[cell + 1]:
+                bits |= 1 << cell
+    elif solution is not None:
+        for cell in solution:
+            if not 0 <= cell < size:
+                raise ValueError(f"Shaded cell {cell} outside a grid of {size} cells")
+            bits |= 1 << cell
+    return bits.to_bytes((size + 7) // 8, 'little')
+
+
+class CorpusWriter:
+    """
+    Write grids (and optionally their solutions) to a corpus file.
+
+    The file is written under a temporary name and moved into place by
+    ``close``, so readers never see a partial corpus. The temporary file is
+    created with mode 0666, which the kernel restricts by the umask: the
+    corpus gets the usual permissions of a new file, not the owner-only mode
+    of ``tempfile.mkstemp``.
+    """
+    def __init__(self, file_path: str, solutions: bool = False) -> None:
+        """
+        Args:
+            file_path: Path of the corpus file to create (replaced if it exists)
+            solutions: Store a solution bitset with every grid
+        """
+        self.file_path: str = file_path
+        self.solutions: bool = solutions
+        self._temp_path: str = f"{os.path.abspath(file_path)}.{uuid.uuid4().hex}.tmp"
+        fd: int = os.open(self._temp_path,
+                          os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(bytes(_HEADER.size))
+        self._offsets: array = array('Q')
+        self._position: int = _HEADER.size
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def add(self, grille: NoriGrid, solution: Optional[Solution] = None) -> int:
+        """
+        Append a grid.
+
+        Args:
+            grille: The grid
+            solution: Its solution (shaded cells or model); only stored when
+                the corpus was opened with ``solutions=True``
+
+        Returns:
+            The index of the grid in the corpus
+
+        Raises:
+            ValueError: If a shaded cell is outside the grid, or a region id
+                does not fit in 16 bits
+        """
+        size: int = grille.width * grille.height
+        record: bytes = _DIMENSIONS.pack(grille.width, grille.height) + _cells_bytes(grille)
+        if self.solutions:
+            record += _pack_solution(solution, size)
+        self._offsets.append(self._position)
+        self._file.write(record)
+        self._position += len(record)
+        return len(self._offsets) - 1
+
+    def extend(self, items: Iterable[Tuple[NoriGrid, Optional[Solution]]]) -> None:
+        """Append (grid, solution) pairs."""
+        for grille, solution in items:
+            self.add(grille, solution)
+
+    def close(self) -> None:
+        """Write the index and the header, and move the file into place."""
+        if self._file.closed:
+            return
+        count: int = len(self._offsets)
+        padding: int = -self._position % 8
+        index_offset: int = self._position + padding
+        self._offsets.append(self._position)
+        if sys.byteorder == 'big':
+            self._offsets.byteswap()
+        self._file.write(bytes(padding))
+        self._file.write(self._offsets.tobytes())
+        self._file.seek(0)
+        flags: int = _FLAG_SOLUTIONS if self.solutions else 0
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, flags, count, index_offset))
+        self._file.close()
+        os.replace(self._temp_path, self.file_path)
+
+    def abort(self) -> None:
+        """Discard the file being written."""
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self._temp_path)
+
+
+class CorpusReader:
+    """
+    Random access to the grids of a corpus file through a memory map.
+    """
+    def __init__(self, file_path: str) -> None:
+        """
+        Args:
+            file_path: Path of the corpus file
+
+        Raises:
+            ValueError: If the file is not a corpus of a supported version
+        """
+        self.file_path: str = file_path
+        with open(file_path, "rb") as f:
+            self._map: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, count, index_offset = _HEADER.unpack_from(self._map)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{file_path} is not a grid corpus (version {_VERSION})")
+            end: int = index_offset + 8 * (count + 1)
+            if end > len(self._map):
+                raise ValueError(f"{file_path} is truncated")
+        except ValueError:
+            self._map.close()
+            raise
+        except struct.error:
+            self._map.close()
+            raise ValueError(f"{file_path} is truncated")
+        self.count: int = count
+        self.has_solutions: bool = bool(flags & _FLAG_SOLUTIONS)
+        self._offsets: Union[memoryview, array]
+        if sys.byteorder == 'big':
+            self._offsets = array('Q')
+            self._offsets.frombytes(self._map[index_offset:end])
+            self._offsets.byteswap()
+        else:
+            self._offsets = memoryview(self._map)[index_offset:end].cast('Q')
+
+    def __enter__(self) -> "CorpusReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> NoriGrid:
+        return NoriGrid.from_bytes(self.grid_bytes(index))
+
+    def __iter__(self) -> Iterator[NoriGrid]:
+        for index in range(self.count):
+            yield self[index]
+
+    def _record(self, index: int) -> Tuple[int, int, int]:
+        """Return (start offset, width, height) of a record."""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Grid {index} out of range (corpus of {self.count} grids)")
+        start: int = self._offsets[index]
+        width, height = _DIMENSIONS.unpack_from(self._map, start)
+        return start, width, height
+
+    def dimensions(self, index: int) -> Tuple[int, int]:
+        """Return the (width, height) of grid ``index`` without decoding it."""
+        _, width, height = self._record(index)
+        return width, height
+
+    def grid_bytes(self, index: int) -> bytes:
+        """
+        Return grid ``index`` serialized as by ``NoriGrid.to_bytes``.
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        start, width, height = self._record(index)
+        return self._map[start:start + _DIMENSIONS.size + 2 * width * height]
+
+    def solution(self, index: int) -> Optional[List[int]]:
+        """
+        Return the stored solution of grid ``index``.
+
+        Returns:
+            The flat indices of the shaded cells, or None if the corpus has no
+            solutions or this one is unknown
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        if not self.has_solutions:
+            return None
+        start, width, height = self._record(index)
+        size: int = width * height
+        begin: int = start + _DIMENSIONS.size + 2 * size
+        bits: int = int.from_bytes(self._map[begin:begin + (size + 7) // 8], 'little')
+        if not bits:
+            return None
+        shaded: List[int] = []
+        while bits:
+            low: int = bits & -bits
+            shaded.append(low.bit_length() - 1)
+            bits ^= low
+        return shaded
+
+
+def write_corpus(file_path: str, items: Iterable[Tuple[NoriGrid, Optional[Solution]]],
+                 solutions: bool = False) -> int:
+    """
+    Write a corpus in one call.
+
+    Args:
+        file_path: Path of the corpus file
+        items: (grid, solution) pairs
+        solutions: Store the solutions
+
+    Returns:
+        The number of grids written
+    """
+    with CorpusWriter(file_path, solutions) as writer:
+        writer.extend(items)
+        return len(writer)
+
+
+def _items_from_jsonl(file_path: str) -> Iterator[Tuple[NoriGrid, Optional[List[int]]]]:
+    """Read (grid, shaded cells) pairs from JSONL lines: rows, or {"grid": rows, "shaded": [...]}."""
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            data: Any = json.loads(line)
+            if isinstance(data, dict):
+                yield NoriGrid.from_grid(data["grid"]), data.get("shaded")
+            else:
+                yield NoriGrid.from_grid(data), None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pack and inspect binary grid corpora.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="convert a JSONL file of grids to a corpus")
+    pack.add_argument("input", help="JSONL file (rows, or objects with grid and shaded keys)")
+    pack.add_argument("output", help="corpus file to write")
+    pack.add_argument("--no-solutions", action="store_true", help="do not store the solutions")
+    info = commands.add_parser("info", help="print the size of a corpus")
+    info.add_argument("corpus")
+    show = commands.add_parser("show", help="print one grid of a corpus as JSON")
+    show.add_argument("corpus")
+    show.add_argument("index", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        count: int = write_corpus(args.output, _items_from_jsonl(args.input),
+                                  solutions=not args.no_solutions)
+        print(json.dumps({"grids": count, "bytes": os.path.getsize(args.output)}))
+        return
+    with CorpusReader(args.corpus) as reader:
+        if args.command == "info":
+            print(json.dumps({"grids": len(reader), "solutions": reader.has_solutions,
+                              "bytes": os.path.getsize(args.corpus)}))
+        else:
+            grille: NoriGrid = reader[args.index]
+            print(json.dumps({"id": args.index, "grid": grille.grid,
+                              "shaded": reader.solution(args.index)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,125 +1,218 @@
-
 """
 DPLL Algorithm Implementation
+
+The search runs on a single shared assignment array with an undo trail:
+clauses are never copied. Each clause keeps a count of its true and false
+literals, updated through occurrence lists when a variable is assigned and
+restored when the trail is unwound. Branching is chronological, on the
+lowest-numbered unassigned variable, True first.
+
+Recording of the search tree is opt-in: pass a DpllTrace (bounded ring buffer
+or file stream) to receive one DpllNode per decision. Search counters are
+added to an optional SolverStats.
 """
-from typing import Dict, List, Optional, Set
+from collections import deque
+from typing import Deque, Dict, IO, List, Optional, Tuple
+
+from Module.stats import SolverStats
+
+
 class DpllNode:
-    def __init__(self, assignment: Dict[int, Optional[bool]], var: Optional[int] = None, 
-                 value: Optional[bool] = None) -> None:
-        self.assignment: Dict[int, Optional[bool]] = assignment.copy()
-        self.var: Optional[int] = var
-        self.value: Optional[bool] = value
-        self.left: Optional[DpllNode] = None  # False branch
-        self.right: Optional[DpllNode] = None  # True branch
+    """A decision of the search, as recorded by a trace."""
+    __slots__ = ('var', 'value', 'depth', 'is_solution')
+
+    def __init__(self, var: int, value: bool, depth: int) -> None:
+        self.var: int = var
+        self.value: bool = value
+        self.depth: int = depth
         self.is_solution: bool = False
 
-    def apply_assignment(clauses: List[List[int]], var: int, value: bool) -> Optional[List[List[int]]]:
-        """Apply a variable assignment to the set of clauses."""
-        lit: int = var if value else -var
-        new_clauses: List[List[int]] = []
-        
-        for clause in clauses:
-            if lit in clause:
+    def __repr__(self) -> str:
+        return f"DpllNode(var={self.var}, value={self.value}, depth={self.depth})"
+
+
+class DpllTrace:
+    """Receives the decisions of a DPLL search. The base class discards them."""
+
+    def record(self, node: DpllNode) -> None:
+        """Called for every decision."""
+
+    def solution(self, node: Optional[DpllNode]) -> None:
+        """Called once with the last decision when a solution is found."""
+        if node is not None:
+            node.is_solution = True
+
+
+class RingBufferTrace(DpllTrace):
+    """Keeps only the last ``capacity`` decisions in memory."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.nodes: Deque[DpllNode] = deque(maxlen=capacity)
+
+    def record(self, node: DpllNode) -> None:
+        self.nodes.append(node)
+
+
+class FileTrace(DpllTrace):
+    """Streams decisions to a text file, one "depth var value" line each."""
+
+    def __init__(self, file_path: str) -> None:
+        self.file: IO[str] = open(file_path, 'w', encoding='utf-8')
+
+    def record(self, node: DpllNode) -> None:
+        self.file.write(f"{node.depth} {node.var} {int(node.value)}\n")
+
+    def solution(self, node: Optional[DpllNode]) -> None:
+        super().solution(node)
+        self.file.write("s SATISFIABLE\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "FileTrace":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _index(lit: int) -> int:
+    """Index of a literal in the occurrence lists."""
+    return 2 * lit if lit > 0 else -2 * lit + 1
+
+
+def dpll(clauses: List[List[int]], assignment: Dict[int, Optional[bool]], num_vars: int,
+         trace: Optional[DpllTrace] = None, stats: Optional[SolverStats] = None) -> bool:
+    """
+    DPLL algorithm with unit propagation and chronological backtracking.
+
+    Args:
+        clauses: The clauses (lists of non-zero literals); they are not modified
+        assignment: Dictionary filled with the variable values when a solution is found
+        num_vars: Number of variables
+        trace: Optional sink receiving every decision
+        stats: Optional statistics to which decisions, propagations (assigned
+            literals) and conflicts are added
+
+    Returns:
+        True if the clauses are satisfiable, False otherwise
+    """
+    if any(len(clause) == 0 for clause in clauses):
+        if stats is not None:
+            stats.conflicts += 1
+        return False
+
+    # value[var]: 1 true, -1 false, 0 unassigned
+    value: List[int] = [0] * (num_vars + 1)
+    occurrences: List[List[int]] = [[] for _ in range(2 * num_vars + 2)]
+    for index, clause in enumerate(clauses):
+        for lit in clause:
+            occurrences[_index(lit)].append(index)
+    num_true: List[int] = [0] * len(clauses)
+    num_false: List[int] = [0] * len(clauses)
+    trail: List[int] = []
+    # [decisions, conflicts]; propagations are counted by the trail
+    counts: List[int] = [0, 0]
+    propagated: List[int] = [0]
+
+    def assign(lit: int) -> bool:
+        """Assign a literal and propagate; returns False on conflict."""
+        queue: List[int] = [lit]
+        while queue:
+            lit = queue.pop()
+            var: int = abs(lit)
+            current: int = value[var]
+            if current:
+                if (current > 0) != (lit > 0):
+                    counts[1] += 1
+                    return False
                 continue
-            new_clause: List[int] = [l for l in clause if l != -lit]
-            if not new_clause:
-                return None
-            new_clauses.append(new_clause)
-        
-        return new_clauses
-
-    def dpll(clauses: List[List[int]], assignment: Dict[int, Optional[bool]], num_vars: int, node: Optional['DpllNode'] = None) -> bool:
-        """DPLL algorithm implementation with binary tree representation."""
-        if len(clauses) == 0:
-            return True
-        
-        if any(len(clause) == 0 for clause in clauses):
-            return False
-
-        
-        # Unit propagation
+            value[var] = 1 if lit > 0 else -1
+            trail.append(var)
+            for index in occurrences[_index(lit)]:
+                num_true[index] += 1
+            conflict: bool = False
+            for index in occurrences[_index(-lit)]:
+                num_false[index] += 1
+                if num_true[index] or conflict:
+                    continue
+                clause: List[int] = clauses[index]
+                free: int = len(clause) - num_false[index]
+                if free == 0:
+                    conflict = True
+                elif free == 1:
+                    for other in clause:
+                        if not value[abs(other)]:
+                            queue.append(other)
+                            break
+            if conflict:
+                counts[1] += 1
+                return False
+        return True
+
+    def undo(size: int) -> None:
+        """Unassign every variable above trail position ``size``."""
+        propagated[0] += len(trail) - size
+        while len(trail) > size:
+            var: int = trail.pop()
+            lit: int = var if value[var] > 0 else -var
+            value[var] = 0
+            for index in occurrences[_index(lit)]:
+                num_true[index] -= 1
+            for index in occurrences[_index(-lit)]:
+                num_false[index] -= 1
+
+    def search() -> bool:
+        """The search itself, from the initial unit clauses."""
+        # Initial unit clauses
+        for clause in clauses:
+            if len(clause) == 1 and not assign(clause[0]):
+                return False
+
+        # Decision stack: (variable, trail size before the decision, False branch tried)
+        decisions: List[Tuple[int, int, bool]] = []
+        last: Optional[DpllNode] = None
+        next_var: int = 1
         while True:
-            unit_found: bool = False
-            for clause in clauses:
-                if len(clause) == 1:
-                    unit_found = True
-                    lit: int = clause[0]
-                    var: int = abs(lit)
-                    val: bool = lit > 0
-                    assignment[var] = val
-                    
-                    new_clauses: List[List[int]] = []
-                    for c in clauses:
-                        if lit in c:
-                            continue
-                        if -lit in c:
-                            new_c: List[int] = [l for l in c if l != -lit]
-                            if new_c:
-                                new_clauses.append(new_c)
-                            else:
-                                return False
-                        else:
-                            new_clauses.append(c)
-                    
-                    clauses = new_clauses
-                    break
-            
-            if not unit_found or not clauses:
+            while next_var <= num_vars and value[next_var]:
+                next_var += 1
+            if next_var > num_vars:
                 break
-        
-        # Pure literal elimination
-        literals: Set[int] = set()
-        for clause in clauses:
-            literals.update(clause)
-        
-        pure_lits: Set[int] = set()
-        for lit in literals:
-            if -lit not in literals:
-                pure_lits.add(lit)
-        
-        if pure_lits:
-            for lit in pure_lits:
-                var: int = abs(lit)
-                if assignment[var] is None:
-                    assignment[var] = bool(lit > 0)
-                    clauses = [c for c in clauses if lit not in c]
-        
-        if len(clauses) == 0:
-            return True
-        
-        # Choose variable and branch
+
+            var: int = next_var
+            decisions.append((var, len(trail), False))
+            counts[0] += 1
+            if trace is not None:
+                last = DpllNode(var, True, len(decisions))
+                trace.record(last)
+            ok: bool = assign(var)
+
+            while not ok:
+                # Backtrack to the deepest decision whose False branch is untried
+                while decisions and decisions[-1][2]:
+                    decisions.pop()
+                if not decisions:
+                    undo(0)
+                    return False
+                var, size, _ = decisions.pop()
+                undo(size)
+                decisions.append((var, size, True))
+                counts[0] += 1
+                if trace is not None:
+                    last = DpllNode(var, False, len(decisions))
+                    trace.record(last)
+                ok = assign(-var)
+            next_var = min(next_var, decisions[-1][0]) if decisions else 1
+
+        if trace is not None:
+            trace.solution(last)
         for var in range(1, num_vars + 1):
-            if assignment[var] is None:
-                # True branch
-                true_assignment: Dict[int, Optional[bool]] = assignment.copy()
-                true_assignment[var] = True
-                new_clauses_true: Optional[List[List[int]]] = DpllNode.apply_assignment(clauses, var, True)
-                
-                true_node: DpllNode = DpllNode(true_assignment, var, True)
-                if node:
-                    node.right = true_node
-                
-                if new_clauses_true is not None and DpllNode.dpll(new_clauses_true, true_assignment, num_vars, true_node):
-                    true_node.is_solution = True
-                    for k, v in true_assignment.items():
-                        assignment[k] = v
-                    return True
-                
-                # False branch
-                false_assignment: Dict[int, Optional[bool]] = assignment.copy()
-                false_assignment[var] = False
-                new_clauses_false: Optional[List[List[int]]] = DpllNode.apply_assignment(clauses, var, False)
-                
-                false_node: DpllNode = DpllNode(false_assignment, var, False)
-                if node:
-                    node.left = false_node
-                    
-                if new_clauses_false is not None and DpllNode.dpll(new_clauses_false, false_assignment, num_vars, false_node):
-                    false_node.is_solution = True
-                    for k, v in false_assignment.items():
-                        assignment[k] = v
-                    return True
-                
-                return False
-        
-        return True
\ No newline at end of file
+            assignment[var] = value[var] > 0
+        return True
+
+    result: bool = search()
+    if stats is not None:
+        stats.decisions += counts[0]
+        stats.conflicts += counts[1]
+        stats.propagations += propagated[0] + len(trail)
+    return result
@@ -0,0 +1,279 @@
+"""
+Encodage vectorisé d'une grille NoriNori avec NumPy.
+
+Ce module produit les mêmes clauses que regles.py (dans le même ordre, avec
+la même numérotation des variables auxiliaires), mais sans boucle Python par
+cellule ni par clause :
+
+- la deuxième règle (adjacence) est construite en une fois par arithmétique
+  d'indices sur la grille des variables ;
+- la première règle est encodée symboliquement une seule fois par taille de
+  région (gabarit sur les variables 1..n), puis instanciée pour toutes les
+  régions de cette taille par indexation ;
+- les clauses sont représentées par un tableau plat de littéraux et un
+  tableau de décalages (la clause i est ``litteraux[decalages[i]:decalages[i + 1]]``),
+  forme directement acceptée par SatSolver, et ne sont converties en texte
+  DIMACS qu'à la demande (formater_dimacs, ecrire_dimacs_vectorise).
+
+NumPy est nécessaire ; sans lui, utiliser regles.py et DimacsGen.py.
+"""
+from functools import lru_cache
+from typing import IO, List, Tuple
+import io
+
+from Module.NoriGrid import NoriGrid
+from Module.regles import COMMENTAIRE_REGLE_1, COMMENTAIRE_REGLE_2
+from Module.cardinalite import (CompteurVariables, ENCODAGE_PAR_DEFAUT, exactement_k,
+                                nombre_auxiliaires, verifier_encodage)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel pour le reste du paquet
+    np = None
+
+# Nombre de clauses converties en texte par écriture dans le fichier
+TAILLE_LOT: int = 65536
+
+
+def numpy_disponible() -> bool:
+    """Indique si NumPy est installé (et donc si ce module est utilisable)."""
+    return np is not None
+
+
+def _exiger_numpy() -> None:
+    if np is None:
+        raise ImportError("L'encodage vectorisé nécessite NumPy (pip install numpy) ; "
+                          "utiliser regles.py / DimacsGen.py sans NumPy")
+
+
+def clauses_adjacence(height: int, width: int) -> "np.ndarray":
+    """
+    Construit les clauses de la deuxième règle : deux cellules adjacentes ne
+    sont pas toutes deux colorées.
+
+    Args:
+        height: Hauteur de la grille
+        width: Largeur de la grille
+
+    Returns:
+        Un tableau (nombre de clauses, 2) de littéraux négatifs, dans l'ordre
+        de clauses_deuxieme_regle (par cellule : voisine de droite puis du dessous)
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+    """
+    _exiger_numpy()
+    if height <= 0 or width <= 0:
+        return np.empty((0, 2), dtype=np.int32)
+    variables = np.arange(1, height * width + 1, dtype=np.int32).reshape(height, width)
+    # paires[r, c, 0] : cellule et sa voisine de droite, paires[r, c, 1] : voisine du dessous
+    paires = np.empty((height, width, 2, 2), dtype=np.int32)
+    paires[:, :, :, 0] = -variables[:, :, None]
+    paires[:, :, 0, 1] = -(variables + 1)
+    paires[:, :, 1, 1] = -(variables + width)
+    valides = np.ones((height, width, 2), dtype=bool)
+    valides[:, -1, 0] = False
+    valides[-1, :, 1] = False
+    return paires[valides]
+
+
+@lru_cache(maxsize=None)
+def _gabarit(n: int, encodage: str) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Encode « exactement 2 parmi n » une seule fois, sur les variables 1..n
+    (cellules) et n+1.. (auxiliaires).
+
+    Returns:
+        Un couple (littéraux du gabarit à plat, longueurs des clauses)
+    """
+    clauses: List[List[int]] = exactement_k(list(range(1, n + 1)), 2,
+                                            CompteurVariables(n + 1), encodage)
+    litteraux = np.fromiter((lit for clause in clauses for lit in clause), dtype=np.int64)
+    longueurs = np.fromiter((len(clause) for clause in clauses), dtype=np.int64,
+                            count=len(clauses))
+    return litteraux, longueurs
+
+
+def nombre_clauses_adjacence(height: int, width: int) -> int:
+    """Nombre de clauses produites par clauses_adjacence."""
+    if height <= 0 or width <= 0:
+        return 0
+    return height * (width - 1) + (height - 1) * width
+
+
+def clauses_regions(grille: NoriGrid,
+                    encodage: str = ENCODAGE_PAR_DEFAUT) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Construit les clauses de la première règle : chaque région contient
+    exactement 2 cellules colorées.
+
+    Les régions d'une même taille partagent un gabarit d'encodage, instancié
+    pour toutes à la fois en remplaçant les variables du gabarit par celles de
+    chaque région (cellules, puis auxiliaires numérotées après les cellules).
+
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé (voir cardinalite.ENCODAGES)
+
+    Returns:
+        Un couple (littéraux, décalages) identique à clauses_premiere_regle
+
+    Raises:
+        ValueError: Si une région a moins de 2 cellules ou si l'encodage est inconnu
+        ImportError: Si NumPy n'est pas installé
+    """
+    litteraux, decalages, _ = _clauses_regions(grille, encodage)
+    return litteraux, decalages
+
+
+def _clauses_regions(grille: NoriGrid, encodage: str
+                     ) -> Tuple["np.ndarray", "np.ndarray", int]:
+    """clauses_regions, plus le nombre total de variables auxiliaires."""
+    _exiger_numpy()
+    verifier_encodage(encodage)
+    ids, tailles, cellules = grille.regions_plates()
+    tailles = np.frombuffer(tailles, dtype=np.uint32).astype(np.int64)
+    cellules = np.frombuffer(cellules, dtype=np.uint32).astype(np.int64) + 1
+
+    trop_petites = np.flatnonzero(tailles < 2)
+    if len(trop_petites):
+        raise ValueError(f"La région {ids[trop_petites[0]]} a moins de 2 cellules")
+
+    # Par région : début de ses cellules, de ses auxiliaires, de ses littéraux et de ses clauses
+    distinctes = np.unique(tailles)
+    gabarits = {int(n): _gabarit(int(n), encodage) for n in distinctes}
+    auxiliaires = np.zeros(len(tailles), dtype=np.int64)
+    nb_litteraux = np.zeros(len(tailles), dtype=np.int64)
+    nb_clauses = np.zeros(len(tailles), dtype=np.int64)
+    for n in gabarits:
+        masque = tailles == n
+        auxiliaires[masque] = nombre_auxiliaires(n, 2, encodage)
+        nb_litteraux[masque] = len(gabarits[n][0])
+        nb_clauses[masque] = len(gabarits[n][1])
+
+    def debuts(quantites: "np.ndarray", premier: int = 0) -> "np.ndarray":
+        return premier + np.concatenate(([0], np.cumsum(quantites)[:-1])).astype(np.int64)
+
+    debut_cellules = debuts(tailles)
+    debut_auxiliaires = debuts(auxiliaires, grille.width * grille.height + 1)
+    debut_litteraux = debuts(nb_litteraux)
+    debut_clauses = debuts(nb_clauses)
+
+    litteraux = np.empty(int(nb_litteraux.sum()), dtype=np.int32)
+    longueurs = np.empty(int(nb_clauses.sum()), dtype=np.int64)
+    for n, (gabarit, longueurs_gabarit) in gabarits.items():
+        regions = np.flatnonzero(tailles == n)
+        a: int = nombre_auxiliaires(n, 2, encodage)
+        # correspondance[i, v] : variable de la région i associée à la variable v du gabarit
+        correspondance = np.empty((len(regions), n + a + 1), dtype=np.int64)
+        correspondance[:, 0] = 0
+        correspondance[:, 1:n + 1] = cellules[debut_cellules[regions, None] + np.arange(n)]
+        correspondance[:, n + 1:] = debut_auxiliaires[regions, None] + np.arange(a)
+        instances = np.sign(gabarit) * correspondance[:, np.abs(gabarit)]
+        litteraux[debut_litteraux[regions, None] + np.arange(len(gabarit))] = instances
+        longueurs[debut_clauses[regions, None] + np.arange(len(longueurs_gabarit))] = longueurs_gabarit
+
+    decalages = np.concatenate(([0], np.cumsum(longueurs))).astype(np.int64)
+    return litteraux, decalages, int(auxiliaires.sum())
+
+
+def encoder_grille(grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT
+                   ) -> Tuple[int, "np.ndarray", "np.ndarray"]:
+    """
+    Encode une grille complète (deuxième règle, puis première règle, comme DimacsGen).
+
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé pour la première règle
+
+    Returns:
+        Un triplet (nombre de variables, littéraux, décalages)
+
+    Raises:
+        ValueError: Si une région a moins de 2 cellules ou si l'encodage est inconnu
+        ImportError: Si NumPy n'est pas installé
+    """
+    adjacence = clauses_adjacence(grille.height, grille.width)
+    litteraux_regions, decalages_regions, auxiliaires = _clauses_regions(grille, encodage)
+    litteraux = np.concatenate((adjacence.ravel(), litteraux_regions))
+    decalages = np.concatenate((np.arange(0, adjacence.size, 2, dtype=np.int64),
+                                decalages_regions + adjacence.size))
+    num_vars: int = grille.width * grille.height + auxiliaires
+    return num_vars, litteraux, decalages
+
+
+def formater_dimacs(litteraux: "np.ndarray", decalages: "np.ndarray") -> str:
+    """
+    Convertit des clauses à plat en lignes DIMACS (une clause par ligne, terminée par 0).
+
+    Args:
+        litteraux: Les littéraux de toutes les clauses, à plat
+        decalages: Les bornes des clauses (len = nombre de clauses + 1)
+
+    Returns:
+        Le texte des clauses, chaque ligne terminée par un retour à la ligne
+    """
+    _exiger_numpy()
+    if len(decalages) < 2:
+        return ""
+    # Insérer le 0 terminal de chaque clause ; « 0 » n'apparaît qu'en fin de clause
+    jetons = np.insert(np.asarray(litteraux)[decalages[0]:decalages[-1]],
+                       np.asarray(decalages[1:]) - decalages[0], 0)
+    # Un seul formatage % pour tout le lot (plus rapide que str() jeton par jeton)
+    texte: str = ("%d " * len(jetons)) % tuple(jetons.tolist())
+    return texte.replace(" 0 ", " 0\n")
+
+
+def _ecrire_par_lots(f: IO[str], litteraux: "np.ndarray", decalages: "np.ndarray",
+                     taille_lot: int) -> int:
+    """Écrit des clauses à plat par lots de ``taille_lot`` clauses ; retourne leur nombre."""
+    nombre: int = len(decalages) - 1
+    for debut in range(0, nombre, taille_lot):
+        f.write(formater_dimacs(litteraux, decalages[debut:min(debut + taille_lot, nombre) + 1]))
+    return max(nombre, 0)
+
+
+def generer_dimacs_vectorise(grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT) -> str:
+    """
+    Équivalent vectorisé de DimacsGen.generer_dimacs (même contenu).
+
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé pour la première règle
+
+    Returns:
+        Le contenu complet du fichier DIMACS
+    """
+    contenu: io.StringIO = io.StringIO()
+    ecrire_dimacs_vectorise(grille, contenu, encodage)
+    return contenu.getvalue()
+
+
+def ecrire_dimacs_vectorise(grille: NoriGrid, f: IO[str], encodage: str = ENCODAGE_PAR_DEFAUT,
+                            taille_lot: int = TAILLE_LOT) -> int:
+    """
+    Écrit le fichier DIMACS d'une grille (même contenu que DimacsGen.generer_dimacs).
+
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+        f: Fichier (ou tampon texte) de destination
+        encodage: L'encodage de cardinalité utilisé pour la première règle
+        taille_lot: Nombre de clauses converties en texte par écriture
+
+    Returns:
+        Le nombre de clauses écrites
+
+    Raises:
+        ValueError: Si une région a moins de 2 cellules ou si l'encodage est inconnu
+        ImportError: Si NumPy n'est pas installé
+    """
+    num_vars, litteraux, decalages = encoder_grille(grille, encodage)
+    nb_adjacence: int = nombre_clauses_adjacence(grille.height, grille.width)
+    num_clauses: int = len(decalages) - 1
+    f.write(f"c Fichier DIMACS CNF pour un puzzle NoriNori de taille {grille.width}x{grille.height}\n")
+    f.write(f"p cnf {num_vars} {num_clauses}\n")
+    f.write(COMMENTAIRE_REGLE_2 + "\n")
+    _ecrire_par_lots(f, litteraux, decalages[:nb_adjacence + 1], taille_lot)
+    f.write(COMMENTAIRE_REGLE_1 + "\n")
+    _ecrire_par_lots(f, litteraux, decalages[nb_adjacence:], taille_lot)
+    return num_clauses
@@ -0,0 +1,519 @@
+"""
+Génération de grilles NoriNori à solution unique.
+
+NoriGrid.generate_random_regions découpe la grille au hasard : la grille
+obtenue n'a souvent aucune solution, ou en a plusieurs. Ce module part au
+contraire d'une solution :
+
+1. plantation : des paires de cellules colorées sont posées à distance 2
+   (en ligne ou en diagonale), sans que deux cellules colorées se touchent ;
+   chaque paire forme le noyau d'une région avec une cellule qui la relie.
+   Une cellule qui ne touche aucune cellule colorée (un « trou ») pourrait
+   presque toujours remplacer une cellule colorée de la région qui
+   l'absorbera : les régions autour d'un trou sont défaites et replantées en
+   commençant par lui, puis sur toutes les cellules libérées ;
+2. croissance : les cellules restantes (toutes blanches) sont réparties entre
+   les régions voisines, au hasard, jusqu'à couvrir la grille. La coloration
+   plantée est alors une solution ;
+3. unicité : un solveur CDCL incrémental, gardé d'une réparation à l'autre,
+   cherche une deuxième solution (la solution plantée est bloquée par une
+   clause retirée après la recherche). S'il en trouve une, la grille est
+   réparée localement plutôt que régénérée : les régions qui touchent les
+   cellules où les deux solutions diffèrent sont défaites, replantées puis
+   regrandies, le reste de la grille est conservé. On recommence jusqu'à
+   l'unicité, ou jusqu'à ``reparations_max`` réparations avant de repartir
+   d'une nouvelle plantation.
+
+La difficulté est mesurée, une fois l'unicité obtenue, par le nombre de
+décisions d'un solveur CDCL neuf pour trouver la première solution ; les
+grilles hors de l'intervalle demandé sont écartées.
+
+Usage:
+    python -m Module.generateur --size 8 --count 100 --seed 0 --output puzzles.jsonl
+    python -m Module.generateur --size 10 --count 20 --min-decisions 5
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import argparse
+import json
+import random
+import sys
+import time
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT, ENCODAGES, CompteurVariables, exactement_k
+from Module.cdcl import TRUE, CdclSolver
+from Module.regles import clauses_deuxieme_regle
+
+# Position de la deuxième cellule d'une paire et cellules pouvant les relier
+_PAIRES: Tuple[Tuple[int, int, Tuple[Tuple[int, int], ...]], ...] = (
+    (0, 2, ((0, 1),)),
+    (2, 0, ((1, 0),)),
+    (1, 1, ((0, 1), (1, 0))),
+    (1, -1, ((0, -1), (1, 0))),
+)
+
+# Plantations tentées par cellule de la grille avant d'échouer, par défaut
+ESSAIS_PAR_CELLULE: int = 20
+
+
+def solution_unique_possible(width: int, height: int) -> bool:
+    """
+    Indique si une grille de cette taille peut avoir une solution unique.
+
+    Vérifié par recherche exhaustive sur les découpages en régions connexes
+    d'au moins 3 cellules : une bande de largeur 1 n'en a que si sa longueur
+    vaut 3 modulo 4, et les grilles 2x2, 2x3 et 2x5 n'en ont jamais.
+
+    Args:
+        width: Largeur de la grille
+        height: Hauteur de la grille
+
+    Returns:
+        False si aucune grille de cette taille n'a de solution unique
+    """
+    petit, grand = sorted((width, height))
+    if petit < 1:
+        return False
+    if petit == 1:
+        return grand % 4 == 3
+    return not (petit == 2 and grand in (2, 3, 5))
+
+
+class Puzzle:
+    """
+    Une grille générée et sa solution.
+    """
+    def __init__(self, grille: NoriGrid, colorees: List[int], decisions: int,
+                 reparations: int) -> None:
+        self.grille: NoriGrid = grille
+        # Indices plats (row * width + col) des cellules colorées de l'unique solution
+        self.colorees: List[int] = colorees
+        # Décisions du solveur CDCL pour trouver la solution
+        self.decisions: int = decisions
+        # Réparations locales appliquées avant d'obtenir l'unicité
+        self.reparations: int = reparations
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Retourne le puzzle sous une forme sérialisable en JSON (lisible par batch.py)."""
+        return {
+            "grid": self.grille.grid,
+            "shaded": self.colorees,
+            "decisions": self.decisions,
+            "repairs": self.reparations,
+        }
+
+
+class StatistiquesGeneration:
+    """
+    Compteurs d'une session de génération.
+    """
+    def __init__(self) -> None:
+        self.puzzles: int = 0
+        # Solutions plantées (une par grille de départ)
+        self.plantations: int = 0
+        self.reparations: int = 0
+        # Grilles abandonnées : plus de réparation possible ou trop de réparations
+        self.abandons: int = 0
+        # Grilles uniques écartées car hors de l'intervalle de difficulté
+        self.hors_difficulte: int = 0
+        self.duree: float = 0.0
+
+    @property
+    def puzzles_par_seconde(self) -> float:
+        """Débit de la génération."""
+        return self.puzzles / self.duree if self.duree > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Retourne les statistiques sous une forme sérialisable en JSON."""
+        return {
+            "puzzles": self.puzzles,
+            "plantings": self.plantations,
+            "repairs": self.reparations,
+            "abandoned": self.abandons,
+            "off_difficulty": self.hors_difficulte,
+            "wall_time": self.duree,
+            "puzzles_per_second": self.puzzles_par_seconde,
+        }
+
+
+class _RechercheIncrementale:
+    """
+    Un solveur CDCL incrémental qui suit le découpage en régions d'une plantation.
+
+    Les clauses d'adjacence sont ajoutées une fois. Les clauses « exactement
+    deux » de chaque région sont gardées par un sélecteur (variable supposée
+    vraie à chaque résolution) : une région inchangée par une réparation
+    garde son encodage, une région défaite est désactivée par le littéral
+    unitaire opposé à son sélecteur. Les clauses apprises restent valables
+    d'une réparation à l'autre.
+    """
+    def __init__(self, width: int, height: int, encodage: str) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.encodage: str = encodage
+        self.solveur: CdclSolver = CdclSolver(width * height)
+        for clause in clauses_deuxieme_regle(NoriGrid.from_grid([[0] * width] * height)):
+            self.solveur.add_clause(clause)
+        self.compteur: CompteurVariables = CompteurVariables(width * height + 1)
+        # Cellules de chaque région encodée -> son sélecteur
+        self.selecteurs: Dict[Tuple[int, ...], int] = {}
+
+    def synchroniser(self, regions: List[int]) -> None:
+        """Encode les nouvelles régions et désactive celles qui ont disparu."""
+        cellules: Dict[int, List[int]] = {}
+        for i, region_id in enumerate(regions):
+            cellules.setdefault(region_id, []).append(i)
+        actuelles: Dict[Tuple[int, ...], None] = dict.fromkeys(map(tuple, cellules.values()))
+        for cells in [cells for cells in self.selecteurs if cells not in actuelles]:
+            self.solveur.add_clause([-self.selecteurs.pop(cells)])
+        for cells in actuelles:
+            if cells in self.selecteurs:
+                continue
+            selecteur: int = self.compteur.nouvelle()
+            self.selecteurs[cells] = selecteur
+            for clause in exactement_k([i + 1 for i in cells], 2, self.compteur, self.encodage):
+                self.solveur.add_clause([-selecteur] + clause)
+
+    def autre_solution(self, colorees: Set[int]) -> Optional[Set[int]]:
+        """
+        Cherche une solution différente de la solution plantée.
+
+        Args:
+            colorees: La solution plantée (qui satisfait le découpage courant)
+
+        Returns:
+            Les cellules colorées d'une autre solution, ou None si la
+            solution plantée est unique
+        """
+        # Clause de blocage de la solution plantée, retirée après la recherche
+        blocage: int = self.compteur.nouvelle()
+        self.solveur.add_clause([-blocage] + [-(i + 1) if i in colorees else i + 1
+                                              for i in range(self.width * self.height)])
+        hypotheses: List[int] = list(self.selecteurs.values()) + [blocage]
+        trouvee: Optional[bool] = self.solveur.solve(assumptions=hypotheses)
+        autre: Optional[Set[int]] = None
+        if trouvee:
+            valeurs: List[int] = self.solveur.values
+            autre = {i for i in range(self.width * self.height) if valeurs[2 * i + 2] == TRUE}
+        self.solveur.add_clause([-blocage])
+        return autre
+
+
+class Generateur:
+    """
+    Générateur de grilles à solution unique.
+    """
+    def __init__(self, width: int, height: int, densite: float = 0.7,
+                 decisions_min: int = 0, decisions_max: Optional[int] = None,
+                 reparations_max: Optional[int] = None, essais_max: Optional[int] = None,
+                 encodage: str = ENCODAGE_PAR_DEFAUT, graine: Optional[int] = None) -> None:
+        """
+        Args:
+            width: Largeur des grilles
+            height: Hauteur des grilles
+            densite: Probabilité de tenter une paire sur chaque cellule lors de
+                la plantation ; plus elle est faible, plus les régions sont grandes
+            decisions_min: Difficulté minimale, en décisions du solveur
+            decisions_max: Difficulté maximale (pas de limite si None)
+            reparations_max: Réparations tentées avant d'abandonner une grille
+                (width * height par défaut)
+            essais_max: Plantations tentées pour une grille avant d'échouer
+                (ESSAIS_PAR_CELLULE * width * height par défaut)
+            encodage: L'encodage de cardinalité utilisé pour la première règle
+            graine: Graine du générateur aléatoire, pour des résultats reproductibles
+
+        Raises:
+            ValueError: Si aucune grille de cette taille n'a de solution unique
+        """
+        if not solution_unique_possible(width, height):
+            raise ValueError(f"Aucune grille {width}x{height} n'a de solution unique")
+        self.width: int = width
+        self.height: int = height
+        self.densite: float = densite
+        self.decisions_min: int = decisions_min
+        self.decisions_max: Optional[int] = decisions_max
+        self.reparations_max: int = reparations_max if reparations_max is not None else width * height
+        self.essais_max: int = (essais_max if essais_max is not None
+                                else ESSAIS_PAR_CELLULE * width * height)
+        self.encodage: str = encodage
+        self.random: random.Random = random.Random(graine)
+        self.stats: StatistiquesGeneration = StatistiquesGeneration()
+
+    def _voisins(self, i: int) -> List[int]:
+        r, c = divmod(i, self.width)
+        voisins: List[int] = []
+        if c > 0:
+            voisins.append(i - 1)
+        if c + 1 < self.width:
+            voisins.append(i + 1)
+        if r > 0:
+            voisins.append(i - self.width)
+        if r + 1 < self.height:
+            voisins.append(i + self.width)
+        return voisins
+
+    def _bloquee(self, i: int, colorees: Set[int]) -> bool:
+        """La cellule est-elle colorée ou voisine d'une cellule colorée ?"""
+        return i in colorees or any(v in colorees for v in self._voisins(i))
+
+    def _planter_paire(self, regions: List[int], colorees: Set[int], a: int,
+                       region_id: int) -> bool:
+        """Pose une paire colorée (a, b) et la cellule qui la relie, si la place le permet."""
+        width, height = self.width, self.height
+        r, c = divmod(a, width)
+        for dr, dc, liens in self.random.sample(_PAIRES, len(_PAIRES)):
+            if not (0 <= r + dr < height and 0 <= c + dc < width):
+                continue
+            b: int = (r + dr) * width + c + dc
+            if regions[b] or self._bloquee(b, colorees):
+                continue
+            libres: List[int] = [(r + lr) * width + c + lc for lr, lc in liens
+                                 if not regions[(r + lr) * width + c + lc]]
+            if not libres:
+                continue
+            for i in (a, b, self.random.choice(libres)):
+                regions[i] = region_id
+            colorees.update((a, b))
+            return True
+        return False
+
+    def planter(self, regions: Optional[List[int]] = None, colorees: Optional[Set[int]] = None,
+                prioritaires: Sequence[int] = ()) -> Tuple[List[int], Set[int]]:
+        """
+        Pose des paires de cellules colorées et le noyau de leur région.
+
+        Args:
+            regions: Région de chaque cellule (0 si non assignée), complétée sur
+                place ; une grille vide si None
+            colorees: Cellules déjà colorées, complété sur place
+            prioritaires: Cellules essayées en premier, quelle que soit la densité
+
+        Returns:
+            Un couple (région de chaque cellule, 0 si non assignée ; cellules colorées)
+        """
+        if regions is None or colorees is None:
+            regions, colorees = [0] * (self.width * self.height), set()
+        region_id: int = max(regions)
+        autres: List[int] = [i for i in range(len(regions)) if not regions[i]]
+        self.random.shuffle(autres)
+        premieres: List[int] = list(prioritaires)
+        self.random.shuffle(premieres)
+        forcees: Set[int] = set(premieres)
+        for a in premieres + autres:
+            if regions[a] or self._bloquee(a, colorees):
+                continue
+            if a not in forcees and self.random.random() >= self.densite:
+                continue
+            if self._planter_paire(regions, colorees, a, region_id + 1):
+                region_id += 1
+        return regions, colorees
+
+    def _replanter(self, regions: List[int], colorees: Set[int], zone: Sequence[int]) -> None:
+        """
+        Replante une zone défaite par ``liberer`` (sur place).
+
+        Les cellules de la zone sont essayées en premier, puis toutes les
+        cellules libérées, quelle que soit la densité : une cellule libérée
+        laissée vide deviendrait presque toujours un nouveau trou.
+        """
+        self.planter(regions, colorees, zone)
+        self.planter(regions, colorees, [i for i in range(len(regions)) if not regions[i]])
+
+    def trous(self, regions: List[int], colorees: Set[int]) -> List[int]:
+        """
+        Cellules non assignées qui ne touchent aucune cellule colorée.
+
+        Une telle cellule, quelle que soit la région qui l'absorbe, peut
+        presque toujours y remplacer une cellule colorée : c'est la principale
+        source de solutions multiples.
+        """
+        return [i for i in range(len(regions)) if not regions[i] and not self._bloquee(i, colorees)]
+
+    def grandir(self, regions: List[int], colorees: Set[int]) -> None:
+        """
+        Répartit les cellules non assignées entre les régions voisines (sur place).
+
+        Une cellule voisine d'une cellule colorée d'une autre région ne peut
+        pas être colorée dans sa région tant que l'autre région garde sa
+        coloration : elle n'ajoute pas d'ambiguïté. Ces affectations sont
+        faites en priorité, les autres seulement quand il n'en reste plus.
+
+        Args:
+            regions: Région de chaque cellule (0 si non assignée), avec au moins une région
+            colorees: La solution plantée
+        """
+        # Frontières : couples (cellule non assignée, région voisine), sûrs ou non
+        sures: List[Tuple[int, int]] = []
+        autres: List[Tuple[int, int]] = []
+
+        def ajouter(cellule: int, region_id: int) -> None:
+            for v in self._voisins(cellule):
+                if not regions[v]:
+                    bloquee: bool = any(u in colorees and regions[u] != region_id
+                                        for u in self._voisins(v))
+                    (sures if bloquee else autres).append((v, region_id))
+
+        for i in range(len(regions)):
+            if regions[i]:
+                ajouter(i, regions[i])
+        while sures or autres:
+            frontiere: List[Tuple[int, int]] = sures if sures else autres
+            k: int = self.random.randrange(len(frontiere))
+            frontiere[k], frontiere[-1] = frontiere[-1], frontiere[k]
+            cellule, region_id = frontiere.pop()
+            if regions[cellule]:
+                continue
+            regions[cellule] = region_id
+            ajouter(cellule, region_id)
+
+    def liberer(self, regions: List[int], colorees: Set[int], cellules: Iterable[int],
+                rayon: int = 1) -> None:
+        """
+        Défait les régions proches de certaines cellules (sur place).
+
+        Args:
+            regions: Région de chaque cellule
+            colorees: Cellules colorées
+            cellules: Centre de la zone à défaire
+            rayon: Distance (en nombre de pas orthogonaux) autour des cellules
+        """
+        zone: Set[int] = set(cellules)
+        bord: Set[int] = set(zone)
+        for _ in range(rayon):
+            bord = {v for i in bord for v in self._voisins(i)} - zone
+            zone |= bord
+        defaites: Set[int] = {regions[i] for i in zone}
+        for i, region_id in enumerate(regions):
+            if region_id in defaites:
+                regions[i] = 0
+                colorees.discard(i)
+
+    def _grille(self, regions: List[int]) -> NoriGrid:
+        """Construit la grille, en renumérotant les régions 1, 2, ..."""
+        numeros: Dict[int, int] = {}
+        cellules: List[int] = [numeros.setdefault(r, len(numeros) + 1) for r in regions]
+        w: int = self.width
+        return NoriGrid.from_grid([cellules[r * w:(r + 1) * w] for r in range(self.height)])
+
+    def generer_un(self) -> Puzzle:
+        """
+        Génère une grille à solution unique dans l'intervalle de difficulté.
+
+        Les réparations locales défont les régions autour d'un trou (voir
+        ``trous``) ou des cellules où une autre solution diffère de la
+        solution plantée, puis replantent et regrandissent cette zone seulement.
+        Un même solveur incrémental (``_RechercheIncrementale``) sert à toutes
+        les recherches d'une autre solution pour une plantation.
+
+        Returns:
+            Le puzzle généré
+
+        Raises:
+            RuntimeError: Si aucune grille ne convient après ``essais_max`` plantations
+        """
+        essais: int = 0
+        while True:
+            if essais >= self.essais_max:
+                raise RuntimeError(f"Aucune grille {self.width}x{self.height} trouvée "
+                                   f"en {essais} essais")
+            essais += 1
+            regions, colorees = self.planter()
+            self.stats.plantations += 1
+            recherche: _RechercheIncrementale = _RechercheIncrementale(self.width, self.height,
+                                                                       self.encodage)
+            reparations: int = 0
+            grille: Optional[NoriGrid] = None
+            while reparations <= self.reparations_max:
+                trous: List[int] = self.trous(regions, colorees)
+                if trous or not colorees:
+                    zone: List[int] = [self.random.choice(trous)] if trous else []
+                    self.liberer(regions, colorees, zone, 2)
+                    self._replanter(regions, colorees, zone)
+                    reparations += 1
+                    continue
+                self.grandir(regions, colorees)
+                recherche.synchroniser(regions)
+                autre: Optional[Set[int]] = recherche.autre_solution(colorees)
+                if autre is None:
+                    grille = self._grille(regions)
+                    break
+                zone = sorted(autre ^ colorees)
+                self.liberer(regions, colorees, zone)
+                self._replanter(regions, colorees, zone)
+                reparations += 1
+            self.stats.reparations += reparations
+            if grille is None:
+                self.stats.abandons += 1
+                continue
+            # Difficulté : décisions d'un solveur neuf pour trouver la solution
+            solveur: SatSolver = SatSolver()
+            solveur.solve_grid(grille, self.encodage)
+            decisions: int = solveur.stats.decisions
+            if decisions < self.decisions_min or (self.decisions_max is not None
+                                                  and decisions > self.decisions_max):
+                self.stats.hors_difficulte += 1
+                continue
+            self.stats.puzzles += 1
+            return Puzzle(grille, sorted(colorees), decisions, reparations)
+
+    def generer(self, nombre: int) -> Iterator[Puzzle]:
+        """
+        Génère plusieurs grilles ; ``stats.duree`` est mise à jour au fil de l'eau.
+
+        Args:
+            nombre: Le nombre de grilles à produire
+
+        Returns:
+            Un itérateur de puzzles
+        """
+        debut: float = time.perf_counter() - self.stats.duree
+        for _ in range(nombre):
+            try:
+                puzzle: Puzzle = self.generer_un()
+            finally:
+                self.stats.duree = time.perf_counter() - debut
+            yield puzzle
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate uniquely solvable NoriNori grids.")
+    parser.add_argument("--size", type=int, default=8, help="grid width and height")
+    parser.add_argument("--width", type=int, help="grid width (overrides --size)")
+    parser.add_argument("--height", type=int, help="grid height (overrides --size)")
+    parser.add_argument("--count", type=int, default=10, help="number of grids to generate")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--density", type=float, default=0.7,
+                        help="probability of planting a pair at each cell")
+    parser.add_argument("--min-decisions", type=int, default=0, help="minimum solver decisions")
+    parser.add_argument("--max-decisions", type=int, help="maximum solver decisions")
+    parser.add_argument("--max-attempts", type=int,
+                        help="plantings tried per grid before giving up "
+                             f"(default: {ESSAIS_PAR_CELLULE} x the number of cells)")
+    parser.add_argument("--encodage", choices=ENCODAGES, default=ENCODAGE_PAR_DEFAUT)
+    parser.add_argument("--output", help="write the grids to this JSONL file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        generateur: Generateur = Generateur(args.width or args.size, args.height or args.size,
+                                            args.density, args.min_decisions, args.max_decisions,
+                                            essais_max=args.max_attempts,
+                                            encodage=args.encodage, graine=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for index, puzzle in enumerate(generateur.generer(args.count)):
+            out.write(json.dumps(dict(puzzle.as_dict(), id=str(index))) + "\n")
+            out.flush()
+    except RuntimeError as e:
+        print(json.dumps(generateur.stats.as_dict()), file=sys.stderr)
+        parser.exit(1, f"{parser.prog}: {e}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(generateur.stats.as_dict()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Branching Heuristics
+
+Pluggable decision strategies for the CDCL solver in cdcl.py. A heuristic
+chooses the next decision variable and its polarity; the solver notifies it
+when variables are created, bumped during conflict analysis and unassigned on
+backtracking, and tells it where the trail was cut.
+
+Available strategies:
+- "index": lowest-numbered unassigned variable first (static order);
+- "shuffled": a static random permutation of the variables;
+- "vsids": Variable State Independent Decaying Sum, with activity decay;
+- "region": NoriNori-aware, branches on a cell of the most constrained region
+  (fewest remaining candidate cells), built from ``NoriGrid.iter_regions``.
+"""
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import heapq
+import random
+
+from Module.NoriGrid import NoriGrid
+
+if TYPE_CHECKING:
+    from Module.cdcl import CdclSolver
+
+HEURISTICS: Tuple[str, ...] = ("index", "shuffled", "vsids", "region")
+POLARITIES: Tuple[str, ...] = ("true", "false", "random")
+
+# Internal literal value, mirrored from cdcl.py to avoid a circular import
+_UNDEF: int = 0
+
+
+class BranchingHeuristic:
+    """
+    Base class of the decision strategies.
+
+    Subclasses implement ``pick``; they may override ``literal`` to choose the
+    polarity and the notification hooks to maintain their own state.
+    """
+    default_polarity: str = "true"
+
+    def __init__(self, seed: Optional[int] = None, polarity: Optional[str] = None) -> None:
+        """
+        Args:
+            seed: Seed of the heuristic's random generator
+            polarity: Value tried first, "true", "false" or "random"
+                (strategy default if None)
+
+        Raises:
+            ValueError: If the polarity name is unknown
+        """
+        polarity = polarity or self.default_polarity
+        if polarity not in POLARITIES:
+            raise ValueError(f"Unknown polarity: {polarity} (expected one of {POLARITIES})")
+        self.polarity: str = polarity
+        self.rng: random.Random = random.Random(seed)
+        self.solver: Optional["CdclSolver"] = None
+
+    def attach(self, solver: "CdclSolver") -> None:
+        """Bind the heuristic to the solver whose assignment it reads."""
+        self.solver = solver
+
+    def new_vars(self, variables: List[int]) -> None:
+        """Called when the solver allocates new variables."""
+
+    def bump(self, var: int) -> None:
+        """Called for every variable involved in a conflict."""
+
+    def decay(self) -> None:
+        """Called once after each conflict."""
+
+    def unassigned(self, var: int) -> None:
+        """Called when a variable is unassigned by backtracking."""
+
+    def backtrack(self, start: int) -> None:
+        """Called after backtracking, once the trail is cut back to ``start`` entries."""
+
+    def pick(self) -> Optional[int]:
+        """
+        Choose the next decision variable.
+
+        Returns:
+            An unassigned variable, or None if every variable is assigned
+        """
+        raise NotImplementedError
+
+    def literal(self, var: int) -> int:
+        """
+        Choose the polarity of a decision on ``var``: its saved phase when the
+        solver does phase saving and ``var`` was assigned before, the
+        configured polarity otherwise.
+
+        Returns:
+            The internal literal to assign (``2 * var`` for True, ``2 * var + 1`` for False)
+        """
+        solver = self.solver
+        if solver is not None and solver.phase_saving and solver.phase[var] >= 0:
+            return 2 * var + solver.phase[var]
+        if self.polarity == "true":
+            return 2 * var
+        if self.polarity == "false":
+            return 2 * var + 1
+        return 2 * var + self.rng.randint(0, 1)
+
+
+class StaticOrder(BranchingHeuristic):
+    """
+    Branch on the first unassigned variable of a fixed order.
+    """
+    def __init__(self, shuffled: bool = False, seed: Optional[int] = None,
+                 polarity: Optional[str] = None) -> None:
+        """
+        Args:
+            shuffled: Use a random permutation (drawn from ``seed``) instead of
+                increasing variable numbers
+            seed: Seed of the heuristic's random generator
+            polarity: Value tried first, "true", "false" or "random"
+        """
+        super().__init__(seed, polarity)
+        self.shuffled: bool = shuffled
+        self._order: List[int] = []
+        self._position: List[int] = [0]
+        # Every variable before this position in the order is assigned
+        self._hint: int = 0
+
+    def new_vars(self, variables: List[int]) -> None:
+        variables = list(variables)
+        if self.shuffled:
+            self.rng.shuffle(variables)
+        self._position.extend([0] * len(variables))
+        for var in variables:
+            self._position[var] = len(self._order)
+            self._order.append(var)
+
+    def unassigned(self, var: int) -> None:
+        if self._position[var] < self._hint:
+            self._hint = self._position[var]
+
+    def pick(self) -> Optional[int]:
+        assert self.solver is not None
+        values: List[int] = self.solver.values
+        order: List[int] = self._order
+        for i in range(self._hint, len(order)):
+            if values[2 * order[i]] == _UNDEF:
+                self._hint = i + 1
+                return order[i]
+        self._hint = len(order)
+        return None
+
+
+class Vsids(BranchingHeuristic):
+    """
+    Variable State Independent Decaying Sum.
+
+    Variables involved in conflicts get their activity bumped; older bumps
+    decay geometrically (implemented by growing the bump increment). The most
+    active unassigned variable is found with a lazy binary heap.
+    """
+    default_polarity: str = "false"
+
+    def __init__(self, decay: float = 0.95, seed: Optional[int] = None,
+                 polarity: Optional[str] = None) -> None:
+        """
+        Args:
+            decay: Activity decay factor applied after each conflict (0 < decay < 1)
+            seed: Seed of the heuristic's random generator (used for tie-breaking noise)
+            polarity: Value tried first, "true", "false" or "random"
+        """
+        super().__init__(seed, polarity)
+        self.decay_factor: float = decay
+        self.increment: float = 1.0
+        self.activity: List[float] = [0.0]
+        # Entries are (-activity, var); stale entries are skipped in pick
+        self._heap: List[Tuple[float, int]] = []
+
+    def new_vars(self, variables: List[int]) -> None:
+        for var in variables:
+            # Tiny random initial activity breaks ties differently per seed
+            self.activity.append(self.rng.random() * 1e-5)
+            heapq.heappush(self._heap, (-self.activity[var], var))
+
+    def bump(self, var: int) -> None:
+        activity: List[float] = self.activity
+        activity[var] += self.increment
+        if activity[var] > 1e100:
+            # Rescale every activity to avoid overflow
+            for v in range(1, len(activity)):
+                activity[v] *= 1e-100
+            self.increment *= 1e-100
+            self._rebuild()
+
+    def decay(self) -> None:
+        self.increment /= self.decay_factor
+
+    def unassigned(self, var: int) -> None:
+        heapq.heappush(self._heap, (-self.activity[var], var))
+        if len(self._heap) > 4 * len(self.activity) + 64:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Rebuild the heap from the unassigned variables only."""
+        assert self.solver is not None
+        values: List[int] = self.solver.values
+        self._heap = [(-self.activity[var], var) for var in range(1, len(self.activity))
+                      if values[2 * var] == _UNDEF]
+        heapq.heapify(self._heap)
+
+    def pick(self) -> Optional[int]:
+        assert self.solver is not None
+        values: List[int] = self.solver.values
+        activity: List[float] = self.activity
+        heap: List[Tuple[float, int]] = self._heap
+        while heap:
+            neg_activity, var = heapq.heappop(heap)
+            if values[2 * var] == _UNDEF and -neg_activity == activity[var]:
+                return var
+        # Entries of unassigned variables may all have been stale
+        self._rebuild()
+        if self._heap:
+            return heapq.heappop(self._heap)[1]
+        return None
+
+
+class RegionHeuristic(BranchingHeuristic):
+    """
+    NoriNori-aware strategy: shade a cell of the most constrained region.
+
+    Among the regions that still miss shaded cells, the one with the fewest
+    remaining candidate cells (unassigned cell variables) is chosen and one of
+    its candidates is decided True. Variables that are not cells (auxiliary
+    variables of the cardinality encodings) and leftovers are handled by a
+    static order fallback.
+
+    The candidate and shaded counts of each region are kept up to date from
+    the solver trail (read incrementally at each pick, and again from the cut
+    after a ``backtrack``) and from the ``unassigned`` notifications; the most
+    constrained region is found with a lazy binary heap, so a pick does not
+    rescan the grid.
+    """
+    def __init__(self, grille: NoriGrid, seed: Optional[int] = None,
+                 polarity: Optional[str] = None) -> None:
+        """
+        Args:
+            grille: The grid whose cell variables are ``row * width + col + 1``
+            seed: Seed of the heuristic's random generator
+            polarity: Polarity used for the fallback decisions
+        """
+        super().__init__(seed, polarity)
+        width: int = grille.width
+        self.regions: List[List[int]] = [[r * width + c + 1 for r, c in cells]
+                                         for _, cells in grille.iter_regions()]
+        self.fallback: StaticOrder = StaticOrder(seed=seed, polarity=polarity)
+        self._region_pick: bool = False
+        # Region index of each cell variable (-1 for the other variables)
+        self._region_of: List[int] = [-1] * (grille.width * grille.height + 1)
+        for index, cells in enumerate(self.regions):
+            for var in cells:
+                self._region_of[var] = index
+        # Unassigned and shaded cells of each region
+        self._free: List[int] = [len(cells) for cells in self.regions]
+        self._shaded: List[int] = [0] * len(self.regions)
+        # Counted state of each cell variable: 0 not counted, 1 false, 2 true
+        self._counted: List[int] = [0] * len(self._region_of)
+        # Trail entries before this position are counted
+        self._synced: int = 0
+        # Entries are (free cells, region); stale entries are skipped in pick
+        self._heap: List[Tuple[int, int]] = [(free, index) for index, free in enumerate(self._free)]
+        heapq.heapify(self._heap)
+
+    def attach(self, solver: "CdclSolver") -> None:
+        super().attach(solver)
+        self.fallback.attach(solver)
+
+    def new_vars(self, variables: List[int]) -> None:
+        self.fallback.new_vars(variables)
+
+    def unassigned(self, var: int) -> None:
+        self.fallback.unassigned(var)
+        if var >= len(self._counted) or not self._counted[var]:
+            return
+        region: int = self._region_of[var]
+        if self._counted[var] == 2:
+            self._shaded[region] -= 1
+        self._counted[var] = 0
+        self._free[region] += 1
+        heapq.heappush(self._heap, (self._free[region], region))
+
+    def backtrack(self, start: int) -> None:
+        # Whatever variable the cut falls on, the entries pushed after it
+        # must be read again
+        if start < self._synced:
+            self._synced = start
+
+    def _sync(self) -> None:
+        """Count the cell assignments made since the last pick."""
+        assert self.solver is not None
+        trail: List[int] = self.solver.trail
+        region_of: List[int] = self._region_of
+        counted: List[int] = self._counted
+        free: List[int] = self._free
+        heap: List[Tuple[int, int]] = self._heap
+        cells: int = len(region_of)
+        for i in range(self._synced, len(trail)):
+            lit: int = trail[i]
+            var: int = lit >> 1
+            if var >= cells or counted[var]:
+                continue
+            region: int = region_of[var]
+            if region < 0:
+                continue
+            if lit & 1:
+                counted[var] = 1
+            else:
+                counted[var] = 2
+                self._shaded[region] += 1
+            free[region] -= 1
+            heapq.heappush(heap, (free[region], region))
+        self._synced = len(trail)
+        if len(heap) > 4 * len(free) + 64:
+            self._heap = [(count, region) for region, count in enumerate(free)
+                          if count and self._shaded[region] < 2]
+            heapq.heapify(self._heap)
+
+    def pick(self) -> Optional[int]:
+        assert self.solver is not None
+        self._sync()
+        values: List[int] = self.solver.values
+        free: List[int] = self._free
+        shaded: List[int] = self._shaded
+        heap: List[Tuple[int, int]] = self._heap
+        best: Optional[int] = None
+        while heap:
+            count, region = heap[0]
+            if count != free[region] or not count or shaded[region] >= 2:
+                # Stale, or the region needs no more decisions for now; an
+                # unassignment pushes it back
+                heapq.heappop(heap)
+                continue
+            best = next((var for var in self.regions[region] if values[2 * var] == _UNDEF), None)
+            if best is None:
+                # A count out of step with the assignment must not end the search
+                heapq.heappop(heap)
+                continue
+            break
+        self._region_pick = best is not None
+        if best is not None:
+            return best
+        return self.fallback.pick()
+
+    def literal(self, var: int) -> int:
+        if self._region_pick:
+            return 2 * var
+        return self.fallback.literal(var)
+
+
+def make_heuristic(name: str, seed: Optional[int] = None, polarity: Optional[str] = None,
+                   grille: Optional[NoriGrid] = None) -> BranchingHeuristic:
+    """
+    Build a branching heuristic by name.
+
+    Args:
+        name: One of HEURISTICS
+        seed: Seed of the heuristic's random generator
+        polarity: Value tried first, "true", "false" or "random" (strategy default if None)
+        grille: The NoriNori grid, required by the "region" strategy
+
+    Returns:
+        A new, unattached heuristic
+
+    Raises:
+        ValueError: If the name is unknown or a grid is missing for "region"
+    """
+    if name == "index":
+        return StaticOrder(seed=seed, polarity=polarity)
+    if name == "shuffled":
+        return StaticOrder(shuffled=True, seed=seed, polarity=polarity)
+    if name == "vsids":
+        return Vsids(seed=seed, polarity=polarity)
+    if name == "region":
+        if grille is None:
+            raise ValueError("The region heuristic needs the NoriNori grid (use SatSolver.solve_grid)")
+        return RegionHeuristic(grille, seed=seed, polarity=polarity)
+    raise ValueError(f"Unknown heuristic: {name} (expected one of {HEURISTICS})")
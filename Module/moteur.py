@@ -0,0 +1,317 @@
+"""
+Moteur de résolution natif pour NoriNori.
+
+Plutôt que d'encoder la grille en CNF puis de laisser le solveur SAT
+redécouvrir sa structure, ce moteur travaille directement sur la grille.
+L'état d'une recherche tient en deux entiers utilisés comme ensembles de bits
+(bit ``row * width + col``) : les cellules colorées et les cellules blanches ;
+revenir en arrière revient à reprendre les deux entiers du nœud précédent.
+
+Chaque région a un masque de ses cellules : le nombre de cellules colorées
+d'une région et ses cellules candidates s'obtiennent par un ET et un
+``bit_count``. Les voisines d'un ensemble de cellules s'obtiennent par
+décalage (d'une colonne ou d'une ligne), les masques de bord de colonne
+empêchant les décalages horizontaux de passer d'une ligne à l'autre.
+
+La propagation traite une file de régions modifiées jusqu'à un point fixe :
+
+- une région qui a déjà 2 cellules colorées rend ses autres cellules
+  blanches ;
+- une région qui n'a plus que autant de candidates que de cellules à colorer
+  les colore toutes (et leurs voisines deviennent blanches) ;
+- avec 2 cellules à colorer, une candidate sans partenaire non adjacente dans
+  sa région devient blanche ;
+- une cellule d'une autre région dont les voisines couvriraient trop de
+  candidates de la région (il n'en resterait pas assez à colorer) devient
+  blanche.
+
+La recherche choisit la région la plus contrainte (le moins de candidates
+par cellule restant à colorer) et branche sur sa première candidate :
+colorée, puis blanche.
+
+MoteurNoriNori offre la même interface de résolution de grilles que
+SatSolver (``solve_grid``, ``count_solutions``, ``status``, ``stats``) : le
+backend "natif" de batch.py et benchmark.py, à comparer au backend "sat".
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import time
+
+from Module.NoriGrid import NoriGrid
+from Module.stats import SolverStats
+
+# Backends de résolution de grilles : encodage SAT ou moteur natif
+BACKENDS: Tuple[str, ...] = ("sat", "natif")
+BACKEND_PAR_DEFAUT: str = "sat"
+
+# Nombre de décisions entre deux vérifications du budget de temps et de la fonction d'arrêt
+_INTERVALLE_TEMPS: int = 256
+
+
+def _bits(masque: int) -> Iterator[int]:
+    """Parcourt les indices des bits à 1 d'un masque, du plus faible au plus fort."""
+    while masque:
+        bas: int = masque & -masque
+        yield bas.bit_length() - 1
+        masque ^= bas
+
+
+class MoteurNoriNori:
+    """
+    Solveur NoriNori à base d'ensembles de bits et de propagation dédiée.
+    """
+    def __init__(self) -> None:
+        self.grid: Optional[NoriGrid] = None
+        # "SAT", "UNSAT" ou "UNKNOWN" (budget épuisé) après la dernière résolution
+        self.status: Optional[str] = None
+        self.stats: SolverStats = SolverStats()
+        # Fonction optionnelle appelée avec le budget de temps : si elle retourne
+        # True, la recherche s'arrête avec le statut "UNKNOWN"
+        self.arret: Optional[Callable[[], bool]] = None
+        self._width: int = 0
+        self._plein: int = 0
+        self._sans_premiere_colonne: int = 0
+        self._sans_derniere_colonne: int = 0
+        # Masque des cellules de chaque région, et région de chaque cellule
+        self._masques: List[int] = []
+        self._region_de: List[int] = []
+        # Masque des voisines orthogonales de chaque cellule
+        self._voisines: List[int] = []
+
+    def charger(self, grille: NoriGrid) -> None:
+        """
+        Prépare les masques de la grille.
+
+        Args:
+            grille: Une grille où chaque cellule contient l'identifiant de sa région
+        """
+        start: float = time.perf_counter()
+        width: int = grille.width
+        height: int = grille.height
+        self._width = width
+        self._plein = (1 << (width * height)) - 1
+        premiere_colonne: int = 0
+        for r in range(height):
+            premiere_colonne |= 1 << (r * width)
+        self._sans_premiere_colonne = self._plein & ~premiere_colonne
+        self._sans_derniere_colonne = self._plein & ~(premiere_colonne << (width - 1))
+        self._voisines = [self._etendre(1 << i) for i in range(width * height)]
+
+        self._masques = []
+        self._region_de = [0] * (width * height)
+        for index, (_, cells) in enumerate(grille.iter_regions()):
+            masque: int = 0
+            for r, c in cells:
+                masque |= 1 << (r * width + c)
+                self._region_de[r * width + c] = index
+            self._masques.append(masque)
+        self.grid = grille
+        self.stats = SolverStats(encode_time=time.perf_counter() - start)
+
+    def _etendre(self, masque: int) -> int:
+        """Retourne les voisines orthogonales des cellules d'un masque (hors du masque ou non)."""
+        width: int = self._width
+        return ((((masque << 1) & self._sans_premiere_colonne)
+                 | ((masque >> 1) & self._sans_derniere_colonne)
+                 | (masque << width) | (masque >> width)) & self._plein)
+
+    def _colorer(self, colorees: int, blanches: int,
+                 cellules: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Colore des cellules candidates et rend leurs voisines blanches.
+
+        Returns:
+            Le triplet (colorées, blanches, cellules modifiées), ou None si
+            deux cellules colorées se touchent
+        """
+        voisines: int = self._etendre(cellules)
+        if voisines & (colorees | cellules):
+            return None
+        nouvelles: int = voisines & ~blanches
+        return colorees | cellules, blanches | nouvelles, cellules | nouvelles
+
+    def _propager(self, colorees: int, blanches: int,
+                  a_revoir: Set[int]) -> Optional[Tuple[int, int]]:
+        """
+        Applique les règles de propagation jusqu'à un point fixe.
+
+        Args:
+            colorees: Masque des cellules colorées
+            blanches: Masque des cellules blanches
+            a_revoir: Indices des régions à examiner (vidé par l'appel)
+
+        Returns:
+            Le couple (colorées, blanches) au point fixe, ou None en cas de
+            contradiction
+        """
+        masques: List[int] = self._masques
+        region_de: List[int] = self._region_de
+        voisines: List[int] = self._voisines
+        stats: SolverStats = self.stats
+        while a_revoir:
+            region: int = a_revoir.pop()
+            masque: int = masques[region]
+            reste: int = 2 - (colorees & masque).bit_count()
+            libres: int = masque & ~(colorees | blanches)
+            nombre: int = libres.bit_count()
+            if reste < 0 or nombre < reste:
+                return None
+            if nombre == 0:
+                continue
+
+            modifiees: int = 0
+            if reste == 0:
+                blanches |= libres
+                modifiees = libres
+            elif nombre == reste:
+                resultat: Optional[Tuple[int, int, int]] = self._colorer(colorees, blanches, libres)
+                if resultat is None:
+                    return None
+                colorees, blanches, modifiees = resultat
+            else:
+                exclues: int = 0
+                if reste == 2:
+                    # Une candidate sans partenaire non adjacente ne peut pas être colorée
+                    for i in _bits(libres):
+                        if not libres & ~voisines[i] & ~(1 << i):
+                            exclues |= 1 << i
+                # Cellules voisines de la région dont les voisines couvriraient trop de candidates
+                if nombre - reste < 4:
+                    autour: int = self._etendre(libres) & ~masque & ~(colorees | blanches)
+                    for i in _bits(autour):
+                        if (libres & ~voisines[i]).bit_count() < reste:
+                            exclues |= 1 << i
+                blanches |= exclues
+                modifiees = exclues
+
+            if modifiees:
+                stats.propagations += modifiees.bit_count()
+                for i in _bits(modifiees):
+                    a_revoir.add(region_de[i])
+        return colorees, blanches
+
+    def _choisir(self, colorees: int, blanches: int) -> Optional[int]:
+        """
+        Choisit la cellule de branchement.
+
+        Returns:
+            Une candidate de la région la plus contrainte, ou None si toutes
+            les cellules sont décidées
+        """
+        if not self._plein & ~(colorees | blanches):
+            return None
+        meilleure: int = 0
+        meilleur_score: float = float("inf")
+        for masque in self._masques:
+            libres: int = masque & ~(colorees | blanches)
+            if not libres:
+                continue
+            reste: int = 2 - (colorees & masque).bit_count()
+            score: float = libres.bit_count() / reste
+            if score < meilleur_score:
+                meilleur_score = score
+                meilleure = libres
+        return (meilleure & -meilleure).bit_length() - 1
+
+    def _modele(self, colorees: int) -> Dict[int, bool]:
+        """Convertit un masque de cellules colorées en modèle (variable ``i + 1`` par cellule)."""
+        return {i + 1: bool(colorees >> i & 1) for i in range(self._plein.bit_length())}
+
+    def solutions(self, limit: Optional[int] = None,
+                  time_limit: Optional[float] = None) -> Iterator[Dict[int, bool]]:
+        """
+        Énumère les solutions de la grille chargée.
+
+        Args:
+            limit: Nombre maximal de solutions (None : toutes)
+            time_limit: Budget optionnel en secondes pour toute l'énumération
+
+        Returns:
+            Un itérateur de modèles au format de SatSolver.solve_grid ;
+            ``status`` vaut "SAT" si au moins une solution a été trouvée,
+            "UNSAT" si aucune, "UNKNOWN" si le budget est épuisé ou si
+            ``arret`` a interrompu la recherche
+
+        Raises:
+            ValueError: Si aucune grille n'est chargée
+        """
+        if self.grid is None:
+            raise ValueError("Aucune grille chargée")
+        start: float = time.perf_counter()
+        deadline: Optional[float] = None if time_limit is None else time.monotonic() + time_limit
+        stats: SolverStats = self.stats
+        self.status = "UNSAT"
+        trouvees: int = 0
+        # Nœuds en attente : (colorées, blanches, régions à revoir)
+        pile: List[Tuple[int, int, Set[int]]] = [(0, 0, set(range(len(self._masques))))]
+        try:
+            while pile and (limit is None or trouvees < limit):
+                colorees, blanches, a_revoir = pile.pop()
+                etat: Optional[Tuple[int, int]] = self._propager(colorees, blanches, a_revoir)
+                if etat is None:
+                    stats.conflicts += 1
+                    continue
+                colorees, blanches = etat
+                cellule: Optional[int] = self._choisir(colorees, blanches)
+                if cellule is None:
+                    trouvees += 1
+                    self.status = "SAT"
+                    yield self._modele(colorees)
+                    continue
+
+                stats.decisions += 1
+                if (stats.decisions % _INTERVALLE_TEMPS == 0
+                        and ((deadline is not None and time.monotonic() > deadline)
+                             or (self.arret is not None and self.arret()))):
+                    self.status = "UNKNOWN"
+                    return
+                region: int = self._region_de[cellule]
+                bit: int = 1 << cellule
+                pile.append((colorees, blanches | bit, {region}))
+                resultat: Optional[Tuple[int, int, int]] = self._colorer(colorees, blanches, bit)
+                if resultat is None:
+                    stats.conflicts += 1
+                    continue
+                colorees, blanches, modifiees = resultat
+                pile.append((colorees, blanches, {self._region_de[i] for i in _bits(modifiees)}))
+        finally:
+            stats.solve_time += time.perf_counter() - start
+
+    def solve_grid(self, grille: NoriGrid,
+                   time_limit: Optional[float] = None) -> Optional[Dict[int, bool]]:
+        """
+        Résout une grille.
+
+        Args:
+            grille: La grille à résoudre
+            time_limit: Budget optionnel en secondes
+
+        Returns:
+            Un modèle comme SatSolver.solve_grid (variable ``row * width + col + 1``
+            vraie si la cellule est colorée), ou None si la grille n'a pas de
+            solution ou si le budget est épuisé (voir ``status``)
+        """
+        self.charger(grille)
+        return next(self.solutions(1, time_limit), None)
+
+    def count_solutions(self, grille: NoriGrid, limit: Optional[int] = 2,
+                        time_limit: Optional[float] = None) -> int:
+        """
+        Compte les solutions d'une grille.
+
+        Args:
+            grille: La grille
+            limit: Arrête le comptage à ce nombre de solutions (None : toutes)
+            time_limit: Budget optionnel en secondes
+
+        Returns:
+            Le nombre de solutions trouvées (au plus limit)
+
+        Raises:
+            TimeoutError: Si le budget est épuisé avant la fin du comptage
+        """
+        self.charger(grille)
+        nombre: int = sum(1 for _ in self.solutions(limit, time_limit))
+        if self.status == "UNKNOWN":
+            raise TimeoutError(f"Comptage interrompu après {nombre} solution(s)")
+        return nombre
+
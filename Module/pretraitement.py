@@ -0,0 +1,227 @@
+"""
+Prétraitement d'une grille NoriNori avant l'encodage SAT.
+
+Des déductions structurelles simples sont appliquées jusqu'à un point fixe :
+
+- une région qui n'a plus que autant de cellules possibles que de cellules
+  à colorer les colore toutes (en particulier une région de 2 cellules) ;
+- une région qui a déjà 2 cellules colorées interdit ses autres cellules ;
+- une cellule colorée interdit ses voisines orthogonales ;
+- une cellule qui n'a aucune partenaire possible non adjacente dans sa
+  région (quand il reste 2 cellules à colorer) ne peut pas être colorée :
+  par exemple la cellule du milieu d'une région de 3 cellules en ligne ;
+- une cellule dont la coloration laisserait une région voisine avec moins
+  de cellules possibles que de cellules à colorer ne peut pas être colorée.
+
+Les cellules ainsi fixées sont retirées de l'encodage : clauses_reduites ne
+produit la règle d'adjacence que entre cellules encore libres et, pour chaque
+région, une contrainte « exactement k » sur ses seules cellules libres (k
+étant le nombre de cellules qu'il reste à colorer).
+"""
+from array import array
+from typing import Dict, List, Tuple
+
+from Module.NoriGrid import NoriGrid
+from Module.cardinalite import (CompteurVariables, ENCODAGE_PAR_DEFAUT, exactement_k,
+                                verifier_encodage)
+
+# États d'une cellule
+INCONNUE: int = 0
+COLOREE: int = 1
+BLANCHE: int = -1
+
+
+class ResultatPretraitement:
+    """
+    États des cellules après propagation.
+    """
+    def __init__(self, grille: NoriGrid, etats: array, contradiction: bool) -> None:
+        self.grille: NoriGrid = grille
+        # etats[row * width + col] : INCONNUE, COLOREE ou BLANCHE
+        self.etats: array = etats
+        # True si la grille n'a pas de solution
+        self.contradiction: bool = contradiction
+
+    @property
+    def colorees(self) -> List[int]:
+        """Indices plats des cellules forcées à être colorées."""
+        return [i for i, etat in enumerate(self.etats) if etat == COLOREE]
+
+    @property
+    def blanches(self) -> List[int]:
+        """Indices plats des cellules forcées à rester blanches."""
+        return [i for i, etat in enumerate(self.etats) if etat == BLANCHE]
+
+    @property
+    def libres(self) -> int:
+        """Nombre de cellules encore indéterminées."""
+        return self.etats.count(INCONNUE)
+
+    def clauses_unitaires(self) -> List[List[int]]:
+        """
+        Retourne une clause unitaire par cellule fixée.
+
+        Returns:
+            [v] pour chaque cellule colorée et [-v] pour chaque cellule blanche,
+            v étant la variable de la cellule
+        """
+        return [[i + 1] if etat == COLOREE else [-(i + 1)]
+                for i, etat in enumerate(self.etats) if etat != INCONNUE]
+
+
+def _voisins(i: int, width: int, height: int) -> List[int]:
+    r, c = divmod(i, width)
+    voisins: List[int] = []
+    if c > 0:
+        voisins.append(i - 1)
+    if c + 1 < width:
+        voisins.append(i + 1)
+    if r > 0:
+        voisins.append(i - width)
+    if r + 1 < height:
+        voisins.append(i + width)
+    return voisins
+
+
+def propager(grille: NoriGrid) -> ResultatPretraitement:
+    """
+    Applique les déductions structurelles jusqu'à un point fixe.
+
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+
+    Returns:
+        Les états des cellules ; ``contradiction`` est vrai si une règle ne
+        peut plus être satisfaite
+    """
+    width: int = grille.width
+    height: int = grille.height
+    region_de: array = grille.cell_regions()
+    ids, tailles, cellules_plates = grille.regions_plates()
+    regions: Dict[int, List[int]] = {}
+    debut: int = 0
+    for region_id, taille in zip(ids, tailles):
+        regions[region_id] = cellules_plates[debut:debut + taille].tolist()
+        debut += taille
+    voisins: List[List[int]] = [_voisins(i, width, height) for i in range(width * height)]
+    etats: array = array('b', bytes(width * height))
+
+    def contradiction() -> ResultatPretraitement:
+        return ResultatPretraitement(grille, etats, True)
+
+    def colorer(i: int) -> bool:
+        if etats[i] == BLANCHE:
+            return False
+        etats[i] = COLOREE
+        for v in voisins[i]:
+            if etats[v] == COLOREE:
+                return False
+            etats[v] = BLANCHE
+        return True
+
+    def possibles(region_id: int) -> Tuple[int, List[int]]:
+        """(cellules colorées, cellules inconnues) d'une région."""
+        colorees: int = 0
+        inconnues: List[int] = []
+        for i in regions[region_id]:
+            if etats[i] == COLOREE:
+                colorees += 1
+            elif etats[i] == INCONNUE:
+                inconnues.append(i)
+        return colorees, inconnues
+
+    def admissible(i: int) -> bool:
+        """Colorer i laisse-t-il assez de cellules possibles aux régions voisines ?"""
+        exclues: Dict[int, int] = {}
+        for v in voisins[i]:
+            if etats[v] == INCONNUE and region_de[v] != region_de[i]:
+                exclues[region_de[v]] = exclues.get(region_de[v], 0) + 1
+        for region_id, nombre in exclues.items():
+            colorees, inconnues = possibles(region_id)
+            if len(inconnues) - nombre < 2 - colorees:
+                return False
+        return True
+
+    change: bool = True
+    while change:
+        change = False
+        for region_id in regions:
+            colorees, inconnues = possibles(region_id)
+            reste: int = 2 - colorees
+            if reste < 0 or len(inconnues) < reste:
+                return contradiction()
+            if not inconnues:
+                continue
+            if reste == 0:
+                for i in inconnues:
+                    etats[i] = BLANCHE
+                change = True
+                continue
+            if len(inconnues) == reste:
+                for i in inconnues:
+                    if not colorer(i):
+                        return contradiction()
+                change = True
+                continue
+            for i in inconnues:
+                if etats[i] != INCONNUE:
+                    continue
+                # Avec 2 cellules à colorer, i a besoin d'une partenaire non adjacente
+                sans_partenaire: bool = reste == 2 and all(
+                    j == i or j in voisins[i] for j in inconnues if etats[j] == INCONNUE)
+                if sans_partenaire or not admissible(i):
+                    etats[i] = BLANCHE
+                    change = True
+    return ResultatPretraitement(grille, etats, False)
+
+
+def clauses_reduites(resultat: ResultatPretraitement,
+                     encodage: str = ENCODAGE_PAR_DEFAUT) -> Tuple[int, List[List[int]]]:
+    """
+    Encode la grille prétraitée, sans les contraintes déjà décidées.
+
+    Les cellules gardent leur variable ``row * width + col + 1`` ; les cellules
+    fixées n'apparaissent que dans leur clause unitaire, et les variables
+    auxiliaires sont numérotées après les cellules.
+
+    Args:
+        resultat: Le résultat de propager
+        encodage: L'encodage de cardinalité utilisé pour la première règle
+
+    Returns:
+        Un couple (nombre de variables, clauses) ; les clauses se réduisent à
+        la clause vide si le prétraitement a trouvé une contradiction
+    """
+    verifier_encodage(encodage)
+    grille: NoriGrid = resultat.grille
+    width: int = grille.width
+    height: int = grille.height
+    if resultat.contradiction:
+        return width * height, [[]]
+    etats: array = resultat.etats
+    clauses: List[List[int]] = resultat.clauses_unitaires()
+
+    # Deuxième règle, entre cellules libres uniquement
+    for i in range(width * height):
+        if etats[i] != INCONNUE:
+            continue
+        if (i + 1) % width and etats[i + 1] == INCONNUE:
+            clauses.append([-(i + 1), -(i + 2)])
+        if i + width < width * height and etats[i + width] == INCONNUE:
+            clauses.append([-(i + 1), -(i + width + 1)])
+
+    # Première règle : exactement (2 - colorées) parmi les cellules libres de chaque région
+    compteur: CompteurVariables = CompteurVariables(width * height + 1)
+    for region_id, cells in grille.iter_regions():
+        variables: List[int] = []
+        colorees: int = 0
+        for r, c in cells:
+            etat: int = etats[r * width + c]
+            if etat == INCONNUE:
+                variables.append(r * width + c + 1)
+            elif etat == COLOREE:
+                colorees += 1
+        if variables:
+            clauses.extend(exactement_k(variables, 2 - colorees, compteur, encodage))
+    return compteur.prochaine - 1, clauses
+
@@ -1,7 +1,9 @@
 from Module.NoriGrid import NoriGrid
 
-from typing import List
-import itertools
+from Module.cardinalite import (CompteurVariables, ENCODAGE_PAR_DEFAUT,
+                                exactement_k, nombre_auxiliaires, verifier_encodage)
+
+from typing import Iterator, List
 
 def get_var_id(row: int, col: int, width: int) -> int:
     """
@@ -17,57 +19,55 @@ def get_var_id(row: int, col: int, width: int) -> int:
     """
     return row * width + col + 1
 
-def premiere_regle(Nori: NoriGrid)->str:
+COMMENTAIRE_REGLE_1: str = "c Règle 1: Chaque région doit contenir exactement 2 cellules colorées"
+COMMENTAIRE_REGLE_2: str = "c Règle 2: Les cellules colorées ne peuvent pas se toucher par les côtés"
+
+def formater_clause(clause: List[int]) -> str:
+    """
+    Formate une clause au format DIMACS (terminée par 0, sans retour à la ligne).
+    """
+    return " ".join(map(str, clause)) + " 0"
+
+def clauses_premiere_regle(Nori: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT) -> Iterator[List[int]]:
+    """
+    Produit les clauses de la première règle : chaque région contient exactement 2 cellules colorées.
+    Args:
+        Nori: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé (voir cardinalite.ENCODAGES)
+    Returns:
+        Un itérateur de clauses, chaque clause étant une liste d'entiers
+    Raises:
+        ValueError: Si une région a moins de 2 cellules ou si l'encodage est inconnu
+    """
+    verifier_encodage(encodage)
     height: int = Nori.height
     width: int = Nori.width if height > 0 else 0
     
-    clauses: List[str] = []
+    # Les variables auxiliaires sont numérotées après les variables des cellules
+    compteur: CompteurVariables = CompteurVariables(height * width + 1)
     
     # Pour chaque région
-    for region_id, cells in Nori.regions.items():
+    for region_id, cells in Nori.iter_regions():
         if len(cells) < 2:
             raise ValueError(f"La région {region_id} a moins de 2 cellules")
         
         # Récupérer les variables associées aux cellules
         vars_in_region: List[int] = [get_var_id(r, c, width) for (r, c) in cells]
         
-        # --- Au moins deux cellules sont colorées ---
-        # Pour cela, on impose qu'il existe au moins une paire de variables vraies
-        # On génère une clause par paire, chaque clause disant que cette paire est activée
-        # En SAT, pour "au moins deux", on peut écrire la clause suivante :
-        # (v1 AND v2) OR (v1 AND v3) OR ... 
-        # Mais SAT ne gère pas directement les AND/OR, donc on encode en CNF :
-        # On crée une clause par paire : v_i v_j 0
-        # Puis on combine ces clauses avec une clause globale (ici on fait la simplification)
-        
-        # En fait, pour "au moins deux", on peut utiliser cette technique :
-        # Ajouter une clause qui est la disjonction de toutes les paires, mais ce n'est pas CNF.
-        # Donc on ajoute toutes les clauses v_i v_j 0 (une par paire)
-        for v1, v2 in itertools.combinations(vars_in_region, 2):
-            clauses.append(f"{v1} {v2} 0")
-        
-        # --- Au plus deux cellules sont colorées ---
-        # Pour chaque triplet, au moins une des trois doit être fausse
-        if len(cells) > 2:
-            for v1, v2, v3 in itertools.combinations(vars_in_region, 3):
-                clauses.append(f"-{v1} -{v2} -{v3} 0")
-    
-    header: str = "c Règle 1: Chaque région doit contenir exactement 2 cellules colorées\n"
-    return header + "\n".join(clauses) + "\n"
+        # --- Exactement deux cellules sont colorées ---
+        yield from exactement_k(vars_in_region, 2, compteur, encodage)
 
-def deuxieme_regle(grille: NoriGrid)->str:
+def clauses_deuxieme_regle(grille: NoriGrid) -> Iterator[List[int]]:
     """
-    Génère les clauses CNF pour la deuxième règle : les cellules colorées ne peuvent pas se toucher par les côtés.
+    Produit les clauses de la deuxième règle : les cellules colorées ne peuvent pas se toucher par les côtés.
     Args:
         grille: Une grille où chaque cellule contient l'identifiant de sa région
     Returns:
-        Une chaîne de caractères contenant les clauses CNF pour cette règle
+        Un itérateur de clauses, chaque clause étant une liste d'entiers
     """
     height: int = grille.height
     width: int = grille.width if height > 0 else 0
     
-    clauses: List[str] = []
-    
     # Pour chaque paire de cellules adjacentes
     for r in range(height):
         for c in range(width):
@@ -75,40 +75,64 @@ def deuxieme_regle(grille: NoriGrid)->str:
             
             # Vérifier la cellule à droite
             if c + 1 < width:
-                var_right: int = get_var_id(r, c + 1, width)
                 # Pas deux cellules adjacentes colorées
-                clauses.append(f"-{var_id} -{var_right} 0")
+                yield [-var_id, -(var_id + 1)]
             
             # Vérifier la cellule en dessous
             if r + 1 < height:
-                var_below: int = get_var_id(r + 1, c, width)
                 # Pas deux cellules adjacentes colorées
-                clauses.append(f"-{var_id} -{var_below} 0")
-    
-    # Ajouter un commentaire expliquant ces clauses
-    header: str = "c Règle 2: Les cellules colorées ne peuvent pas se toucher par les côtés\n"
-    return header + "\n".join(clauses) + "\n"
+                yield [-var_id, -(var_id + width)]
+
+def premiere_regle(Nori: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT)->str:
+    """
+    Génère les clauses CNF pour la première règle : chaque région contient exactement 2 cellules colorées.
+    Args:
+        Nori: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé (voir cardinalite.ENCODAGES)
+    Returns:
+        Une chaîne de caractères contenant les clauses CNF pour cette règle
+    Raises:
+        ValueError: Si une région a moins de 2 cellules ou si l'encodage est inconnu
+    """
+    clauses: List[str] = [formater_clause(clause) for clause in clauses_premiere_regle(Nori, encodage)]
+    return COMMENTAIRE_REGLE_1 + "\n" + "\n".join(clauses) + "\n"
+
+def deuxieme_regle(grille: NoriGrid)->str:
+    """
+    Génère les clauses CNF pour la deuxième règle : les cellules colorées ne peuvent pas se toucher par les côtés.
+    Args:
+        grille: Une grille où chaque cellule contient l'identifiant de sa région
+    Returns:
+        Une chaîne de caractères contenant les clauses CNF pour cette règle
+    """
+    clauses: List[str] = [formater_clause(clause) for clause in clauses_deuxieme_regle(grille)]
+    return COMMENTAIRE_REGLE_2 + "\n" + "\n".join(clauses) + "\n"
 
-def nombre_variables(Nori: NoriGrid) -> int:
+def nombre_variables(Nori: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT) -> int:
     """
     Calcule le nombre total de variables nécessaires.
     
     Args:
         grille: Une grille où chaque cellule contient l'identifiant de sa région
+        encodage: L'encodage de cardinalité utilisé par la première règle
         
     Returns:
-        Le nombre total de variables (une par cellule)
+        Le nombre total de variables (une par cellule, plus les variables
+        auxiliaires de l'encodage de cardinalité)
     """
+    verifier_encodage(encodage)
     height: int = Nori.height
     width: int = Nori.width if height > 0 else 0
-    return height * width
+    auxiliaires: int = sum(nombre_auxiliaires(len(cells), 2, encodage)
+                           for _, cells in Nori.iter_regions())
+    return height * width + auxiliaires
 
 
 if __name__ == "__main__":
     nr = NoriGrid(5, 5, 6)
     
     print("première règle: \n",premiere_regle(nr))
-    print("deuxième règle: \n",deuxieme_regle(nr.grid))
+    print("deuxième règle: \n",deuxieme_regle(nr))
     """
     try:
         with open('test.txt', 'w', encoding='utf-8') as f:
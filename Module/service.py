@@ -0,0 +1,437 @@
+"""
+Solve Service Module
+
+A long-running asyncio server that solves NoriNori grids and raw CNF
+formulas for other programs, on a Unix socket or a localhost TCP port.
+Messages are JSON objects, one per line, in both directions.
+
+Requests:
+    {"op": "solve", "id": "a1", "grid": [[1, 1, 2], ...]}
+        optional: "backend" ("sat" or "natif"), "encodage", "timeout" (seconds)
+    {"op": "solve", "id": "a2", "cnf": "p cnf 3 2\\n1 -2 0\\n2 3 0\\n"}
+    {"op": "solve", "id": "a3", "clauses": [[1, -2], [2, 3]], "num_vars": 3}
+    {"op": "cancel", "id": "a1"}
+    {"op": "stats"}
+
+Ids are strings or integers, unique among a client's unfinished jobs.
+Each solve request gets exactly one response once it finishes, in completion
+order: {"id", "status", "time", "decisions", "conflicts"} plus "shaded" (flat
+indices of the shaded cells) for a grid or "model" (true and false DIMACS
+literals) for a CNF. The status is "SAT", "UNSAT", "UNKNOWN" (deadline
+reached), "CANCELLED" or "ERROR" (with an "error" message).
+
+Jobs wait in a bounded queue: when it is full the server stops reading the
+connection, which pushes back on the client. They run on a process pool that
+is started (and warmed up) with the server, so a job does not pay for Python
+startup and imports. A job's deadline counts from its arrival; the remaining
+time is the solver's time limit, and a job whose deadline passed while
+queued is answered "UNKNOWN" without running. Cancelling a job, or closing
+its connection, drops it if it is queued; if it is running, the job is
+answered at once and its search is stopped: every dispatcher owns a slot of a
+shared cancel-flag array, which the worker polls every CANCEL_CHECK_INTERVAL
+conflicts (SAT) or decisions (native engine), so the worker is freed for the
+next job without waiting for the search or its deadline.
+
+Usage:
+    python -m Module.service --socket /tmp/norinori.sock --workers 4
+    python -m Module.service --port 8765 --queue-size 128 --timeout 30
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT
+from Module.moteur import BACKEND_PAR_DEFAUT, BACKENDS, MoteurNoriNori
+
+logger = logging.getLogger(__name__)
+
+# Longest accepted request line, in bytes
+MAX_LINE: int = 64 * 1024 * 1024
+# Conflicts (SAT) between two checks of the job's cancel flag; the native
+# engine checks it every moteur._INTERVALLE_TEMPS decisions
+CANCEL_CHECK_INTERVAL: int = 64
+
+# Cancel flags shared with the service, one per dispatcher (set in each worker process)
+_cancel_flags: Any = None
+
+
+def _init_worker(cancel_flags: Any) -> None:
+    """Pool initializer: keep the shared cancel flags."""
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def _warm_up() -> int:
+    """Worker no-op run at startup, so that the processes exist before the first job."""
+    return os.getpid()
+
+
+def _solve_request(request: Dict[str, Any], time_limit: Optional[float],
+                   slot: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Worker entry point: solve one grid or CNF request.
+
+    Args:
+        request: The decoded solve request
+        time_limit: Remaining time before the job's deadline, or None
+        slot: Index of the job's cancel flag; the search stops with the
+            status "UNKNOWN" once the flag is set
+
+    Returns:
+        The response fields, except "id"
+
+    Raises:
+        ValueError: If the request has no grid, cnf or clauses field, or an
+            invalid one
+    """
+    start: float = time.perf_counter()
+    response: Dict[str, Any] = {}
+
+    def cancelled() -> bool:
+        return _cancel_flags is not None and slot is not None and bool(_cancel_flags[slot])
+
+    def new_sat_solver() -> SatSolver:
+        sat_solver: SatSolver = SatSolver()
+        sat_solver.progress = lambda stats: not cancelled()
+        sat_solver.progress_interval = CANCEL_CHECK_INTERVAL
+        return sat_solver
+
+    solver: Any
+    if "grid" in request:
+        grille: NoriGrid = NoriGrid.from_grid(request["grid"])
+        backend: str = request.get("backend", BACKEND_PAR_DEFAUT)
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (expected one of {BACKENDS})")
+        if backend == "natif":
+            solver = MoteurNoriNori()
+            solver.arret = cancelled
+            model: Optional[Dict[int, bool]] = solver.solve_grid(grille, time_limit)
+        else:
+            solver = new_sat_solver()
+            model = solver.solve_grid(grille, request.get("encodage", ENCODAGE_PAR_DEFAUT),
+                                      time_limit=time_limit)
+        response["shaded"] = (None if model is None else
+                              [cell for cell in range(grille.width * grille.height)
+                               if model[cell + 1]])
+    elif "cnf" in request or "clauses" in request:
+        solver = new_sat_solver()
+        if "cnf" in request:
+            solver.parse_dimacs_text(request["cnf"])
+        else:
+            solver.load_clauses(request["clauses"], request.get("num_vars"))
+        model = solver.solve(time_limit)
+        response["model"] = (None if model is None else
+                             [var if value else -var for var, value in sorted(model.items())])
+    else:
+        raise ValueError("A solve request needs a grid, cnf or clauses field")
+    response.update(status=solver.status, decisions=solver.stats.decisions,
+                    conflicts=solver.stats.conflicts, time=time.perf_counter() - start)
+    return response
+
+
+class _Connection:
+    """
+    A client connection: its writer and its unfinished jobs.
+    """
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer: asyncio.StreamWriter = writer
+        self.jobs: Dict[Any, "_Job"] = {}
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.closed: bool = False
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Write one JSON line, unless the client is gone."""
+        if self.closed:
+            return
+        async with self.lock:
+            try:
+                self.writer.write(json.dumps(message).encode() + b"\n")
+                await self.writer.drain()
+            except (ConnectionError, RuntimeError):
+                self.closed = True
+
+
+class _Job:
+    """
+    A queued or running solve request.
+    """
+    def __init__(self, connection: _Connection, job_id: Any, request: Dict[str, Any],
+                 deadline: Optional[float]) -> None:
+        self.connection: _Connection = connection
+        self.id: Any = job_id
+        self.request: Dict[str, Any] = request
+        # Event loop time after which the job is answered "UNKNOWN"
+        self.deadline: Optional[float] = deadline
+        self.cancelled: bool = False
+        # Cancel flag slot of the dispatcher running the job, None while queued
+        self.slot: Optional[int] = None
+
+    async def finish(self, response: Dict[str, Any]) -> None:
+        """Send the job's only response and forget the job."""
+        self.connection.jobs.pop(self.id, None)
+        await self.connection.send(dict(response, id=self.id))
+
+
+class SolveService:
+    """
+    Asyncio JSON-lines solve server over a warm process pool.
+    """
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 64,
+                 default_timeout: Optional[float] = None) -> None:
+        """
+        Args:
+            workers: Number of worker processes (os.cpu_count() if None)
+            queue_size: Maximum number of jobs waiting for a worker
+            default_timeout: Deadline in seconds of the jobs that do not set
+                one (None: no deadline)
+        """
+        self.workers: int = workers or os.cpu_count() or 1
+        self.queue_size: int = queue_size
+        self.default_timeout: Optional[float] = default_timeout
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.queue: Optional["asyncio.Queue[_Job]"] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._dispatchers: List["asyncio.Task[None]"] = []
+        self._connections: Set[_Connection] = set()
+        # One cancel flag per dispatcher, polled by the worker running its job
+        self._cancel_flags: Any = multiprocessing.Array('b', self.workers, lock=False)
+        # Counters reported by the "stats" request
+        self.received: int = 0
+        self.completed: int = 0
+        self.cancelled: int = 0
+        self.expired: int = 0
+        self.running: int = 0
+
+    async def start(self, path: Optional[str] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> asyncio.AbstractServer:
+        """
+        Start the worker pool and listen for clients.
+
+        Args:
+            path: Unix socket path; if None, listen on TCP ``host:port``
+            host: TCP host (localhost by default)
+            port: TCP port (0 picks a free port, see ``server.sockets``)
+
+        Returns:
+            The listening asyncio server
+        """
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self._cancel_flags,))
+        pids = await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up)
+                                      for _ in range(self.workers)))
+        logger.info("Started %d workers (%d processes)", self.workers, len(set(pids)))
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._dispatchers = [asyncio.create_task(self._dispatch(slot))
+                             for slot in range(self.workers)]
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle, path=path, limit=MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE)
+        for sock in self.server.sockets:
+            logger.info("Listening on %s", sock.getsockname())
+        return self.server
+
+    async def close(self) -> None:
+        """
+        Stop listening, close the client connections, stop the dispatchers,
+        cancel the running jobs and shut the worker pool down.
+        """
+        if self.server is not None:
+            self.server.close()
+            for connection in self._connections:
+                connection.writer.close()
+            await self.server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self.pool is not None:
+            # Stop the running searches, and wait for the workers off the event loop
+            for slot in range(self.workers):
+                self._cancel_flags[slot] = 1
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self.pool.shutdown, wait=True, cancel_futures=True))
+            self.pool = None
+
+    def statistics(self) -> Dict[str, Any]:
+        """Return the service counters as a JSON-friendly dictionary."""
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "running": self.running,
+            "received": self.received,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "expired": self.expired,
+        }
+
+    def _cancel(self, job: _Job) -> None:
+        """Mark a job cancelled and, if it is running, tell its worker to stop."""
+        job.cancelled = True
+        if job.slot is not None:
+            self._cancel_flags[job.slot] = 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read the requests of one client until it disconnects."""
+        connection: _Connection = _Connection(writer)
+        self._connections.add(connection)
+        try:
+            while True:
+                try:
+                    line: bytes = await reader.readline()
+                except (ConnectionError, ValueError) as e:
+                    # ValueError: line longer than MAX_LINE
+                    await connection.send({"id": None, "status": "ERROR", "error": str(e)})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await self._request(connection, line)
+        finally:
+            connection.closed = True
+            for job in connection.jobs.values():
+                self._cancel(job)
+            connection.jobs.clear()
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _request(self, connection: _Connection, line: bytes) -> None:
+        """Handle one request line; waits while the job queue is full."""
+        try:
+            request: Any = json.loads(line)
+        except ValueError as e:
+            await connection.send({"id": None, "status": "ERROR", "error": f"Invalid JSON: {e}"})
+            return
+        if not isinstance(request, dict):
+            await connection.send({"id": None, "status": "ERROR",
+                                   "error": "A request must be a JSON object"})
+            return
+        op: Any = request.get("op", "solve")
+        job_id: Any = request.get("id")
+        if job_id is not None and (isinstance(job_id, bool) or not isinstance(job_id, (str, int))):
+            await connection.send({"id": None, "status": "ERROR",
+                                   "error": "The id must be a string or an integer"})
+            return
+        if op == "stats":
+            await connection.send({"id": job_id, "stats": self.statistics()})
+        elif op == "cancel":
+            job: Optional[_Job] = connection.jobs.get(job_id)
+            if job is None:
+                await connection.send({"id": job_id, "status": "ERROR", "error": "Unknown job"})
+                return
+            self._cancel(job)
+            self.cancelled += 1
+            await job.finish({"status": "CANCELLED"})
+        elif op == "solve":
+            if job_id is None or job_id in connection.jobs:
+                await connection.send({"id": job_id, "status": "ERROR",
+                                       "error": "A solve request needs an id unique among unfinished jobs"})
+                return
+            timeout: Optional[float] = request.get("timeout", self.default_timeout)
+            if timeout is not None and (isinstance(timeout, bool)
+                                        or not isinstance(timeout, (int, float))):
+                await connection.send({"id": job_id, "status": "ERROR",
+                                       "error": "The timeout must be a number of seconds or null"})
+                return
+            deadline: Optional[float] = (None if timeout is None
+                                         else asyncio.get_running_loop().time() + timeout)
+            job = _Job(connection, job_id, request, deadline)
+            connection.jobs[job_id] = job
+            self.received += 1
+            assert self.queue is not None
+            await self.queue.put(job)
+        else:
+            await connection.send({"id": job_id, "status": "ERROR", "error": f"Unknown op: {op}"})
+
+    async def _dispatch(self, slot: int) -> None:
+        """
+        Feed one worker: take the next job, run it in the pool and send its result.
+
+        Args:
+            slot: Index of the cancel flag of the jobs run by this dispatcher
+        """
+        assert self.queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job: _Job = await self.queue.get()
+            try:
+                if job.cancelled:
+                    continue
+                remaining: Optional[float] = None
+                if job.deadline is not None:
+                    remaining = job.deadline - loop.time()
+                    if remaining <= 0:
+                        self.expired += 1
+                        await job.finish({"status": "UNKNOWN", "error": "Deadline expired in queue"})
+                        continue
+                self.running += 1
+                self._cancel_flags[slot] = 0
+                job.slot = slot
+                try:
+                    response: Dict[str, Any] = await loop.run_in_executor(
+                        self.pool, _solve_request, job.request, remaining, slot)
+                except Exception as e:
+                    logger.warning("Job %r failed: %s", job.id, e)
+                    response = {"status": "ERROR", "error": str(e)}
+                finally:
+                    job.slot = None
+                    self.running -= 1
+                if job.cancelled:
+                    # Already answered "CANCELLED"
+                    continue
+                self.completed += 1
+                await job.finish(response)
+            finally:
+                self.queue.task_done()
+
+
+async def serve(path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0,
+                workers: Optional[int] = None, queue_size: int = 64,
+                default_timeout: Optional[float] = None) -> None:
+    """Run a SolveService until the task is cancelled (see SolveService for the arguments)."""
+    service: SolveService = SolveService(workers, queue_size, default_timeout)
+    server: asyncio.AbstractServer = await service.start(path, host, port)
+    task: Optional["asyncio.Task[Any]"] = asyncio.current_task()
+    if task is not None:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve NoriNori and CNF solving over a socket.")
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument("--socket", help="Unix socket path")
+    address.add_argument("--port", type=int, default=8765, help="localhost TCP port")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="maximum number of jobs waiting for a worker")
+    parser.add_argument("--timeout", type=float, help="default per-job deadline in seconds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port, args.workers, args.queue_size,
+                          args.timeout))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
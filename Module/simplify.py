@@ -0,0 +1,390 @@
+"""
+CNF Simplification Module
+
+A standalone preprocessor for arbitrary CNF formulas (NoriNori encodings or
+external DIMACS files), run between parsing and solving:
+
+- unit propagation at the top level;
+- backward subsumption: clauses that contain another clause are removed;
+- self-subsuming resolution (strengthening): if C = A or l and D contains A
+  and -l, the literal -l is removed from D;
+- bounded variable elimination: a variable is replaced by all the
+  non-tautological resolvents of its clauses when that does not increase
+  the number of clauses.
+
+All three rely on occurrence lists (clause indices per literal). Eliminated
+and fixed variables are recorded on a reconstruction stack, so that a model
+of the simplified formula can be extended to a model of the original one
+(``extend_model``). Frozen variables are never eliminated and keep a unit
+clause when fixed, so that callers can still refer to them (e.g. as the cell
+variables of a grid, or in assumptions).
+
+Usage:
+    python -m Module.simplify input.cnf output.cnf
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import sys
+
+# A reconstruction step: the pivot literal and the removed clauses containing it
+Step = Tuple[int, List[List[int]]]
+
+
+def _index(lit: int) -> int:
+    """Index of a literal in the occurrence lists."""
+    return 2 * lit if lit > 0 else -2 * lit + 1
+
+
+def _signature(clause: List[int]) -> int:
+    """64-bit variable signature used to reject subsumption candidates quickly."""
+    signature: int = 0
+    for lit in clause:
+        signature |= 1 << (abs(lit) & 63)
+    return signature
+
+
+class Simplifier:
+    """
+    Occurrence-list based CNF simplifier with model reconstruction.
+    """
+    def __init__(self, num_vars: int, clauses: Iterable[List[int]],
+                 frozen: Iterable[int] = (), max_occurrences: int = 16,
+                 max_resolvent: int = 24, grow: int = 0) -> None:
+        """
+        Args:
+            num_vars: Number of variables of the formula
+            clauses: The clauses, lists of non-zero DIMACS literals
+            frozen: Variables that must not be eliminated
+            max_occurrences: Variables with more occurrences than this on
+                both polarities are not considered for elimination
+            max_resolvent: Eliminations producing a longer resolvent are abandoned
+            grow: Number of extra clauses an elimination may add
+        """
+        self.num_vars: int = num_vars
+        self.frozen: Set[int] = set(frozen)
+        self.max_occurrences: int = max_occurrences
+        self.max_resolvent: int = max_resolvent
+        self.grow: int = grow
+        self.ok: bool = True
+
+        # clauses[i] is None once clause i has been removed
+        self.clauses: List[Optional[List[int]]] = []
+        self.signatures: List[int] = []
+        self.occurrences: List[Set[int]] = [set() for _ in range(2 * num_vars + 2)]
+        # value[var]: 1 true, -1 false, 0 unassigned
+        self.value: List[int] = [0] * (num_vars + 1)
+        self.eliminated: List[bool] = [False] * (num_vars + 1)
+        self.stack: List[Step] = []
+        self._units: List[int] = []
+        self._queue: List[int] = []
+
+        # Statistics
+        self.subsumed: int = 0
+        self.strengthened: int = 0
+        self.eliminated_vars: int = 0
+        self.fixed: int = 0
+
+        for clause in clauses:
+            self._add(clause)
+            if not self.ok:
+                break
+
+    # --- Clause database -------------------------------------------------
+
+    def _add(self, clause: Iterable[int]) -> Optional[int]:
+        """Add a clause (after removing duplicates and false literals); returns its index."""
+        literals: Set[int] = set()
+        for lit in clause:
+            var: int = abs(lit)
+            if var > self.num_vars:
+                self._grow(var)
+            if self.value[var]:
+                if (self.value[var] > 0) == (lit > 0):
+                    return None
+                continue
+            if -lit in literals:
+                return None
+            literals.add(lit)
+        if not literals:
+            self.ok = False
+            return None
+        if len(literals) == 1:
+            self._units.append(next(iter(literals)))
+        sorted_clause: List[int] = sorted(literals, key=abs)
+        index: int = len(self.clauses)
+        self.clauses.append(sorted_clause)
+        self.signatures.append(_signature(sorted_clause))
+        for lit in sorted_clause:
+            self.occurrences[_index(lit)].add(index)
+        self._queue.append(index)
+        return index
+
+    def _grow(self, num_vars: int) -> None:
+        self.occurrences.extend(set() for _ in range(2 * (num_vars - self.num_vars)))
+        self.value.extend([0] * (num_vars - self.num_vars))
+        self.eliminated.extend([False] * (num_vars - self.num_vars))
+        self.num_vars = num_vars
+
+    def _remove(self, index: int) -> None:
+        clause: Optional[List[int]] = self.clauses[index]
+        if clause is None:
+            return
+        for lit in clause:
+            self.occurrences[_index(lit)].discard(index)
+        self.clauses[index] = None
+
+    def _strengthen(self, index: int, lit: int) -> None:
+        """Remove ``lit`` from clause ``index``."""
+        clause: Optional[List[int]] = self.clauses[index]
+        assert clause is not None
+        clause.remove(lit)
+        self.occurrences[_index(lit)].discard(index)
+        self.signatures[index] = _signature(clause)
+        self.strengthened += 1
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._units.append(clause[0])
+        self._queue.append(index)
+
+    # --- Unit propagation ------------------------------------------------
+
+    def _propagate(self) -> bool:
+        while self._units and self.ok:
+            lit: int = self._units.pop()
+            var: int = abs(lit)
+            if self.value[var]:
+                if (self.value[var] > 0) != (lit > 0):
+                    self.ok = False
+                continue
+            self.value[var] = 1 if lit > 0 else -1
+            self.fixed += 1
+            self.stack.append((lit, [[lit]]))
+            for index in list(self.occurrences[_index(lit)]):
+                self._remove(index)
+            for index in list(self.occurrences[_index(-lit)]):
+                self._strengthen(index, -lit)
+                if not self.ok:
+                    break
+        return self.ok
+
+    # --- Subsumption and strengthening ------------------------------------
+
+    @staticmethod
+    def _subsumes(c: List[int], d: Set[int]) -> Optional[int]:
+        """
+        Check whether clause c subsumes or strengthens clause d.
+
+        Returns:
+            0 if c subsumes d, a literal l of c if d contains -l and the rest
+            of c (so -l can be removed from d), None otherwise
+        """
+        flipped: int = 0
+        for lit in c:
+            if lit in d:
+                continue
+            if flipped == 0 and -lit in d:
+                flipped = lit
+                continue
+            return None
+        return flipped
+
+    def _backward(self, index: int) -> None:
+        """Use clause ``index`` to remove or strengthen the clauses it (self-)subsumes."""
+        c: Optional[List[int]] = self.clauses[index]
+        if c is None:
+            return
+        occurrences: List[Set[int]] = self.occurrences
+        pivot: int = min(c, key=lambda lit: len(occurrences[_index(lit)]) + len(occurrences[_index(-lit)]))
+        signature: int = self.signatures[index]
+        candidates: List[int] = list(occurrences[_index(pivot)] | occurrences[_index(-pivot)])
+        for other in candidates:
+            d: Optional[List[int]] = self.clauses[other]
+            if other == index or d is None or len(d) < len(c) or signature & ~self.signatures[other]:
+                continue
+            result: Optional[int] = self._subsumes(c, set(d))
+            if result is None:
+                continue
+            if result == 0:
+                self._remove(other)
+                self.subsumed += 1
+            else:
+                self._strengthen(other, -result)
+                if not self.ok:
+                    return
+            if self.clauses[index] is None:
+                return
+
+    def _subsumption(self) -> bool:
+        while self._queue and self.ok:
+            if not self._propagate():
+                break
+            # Shortest clauses first: they subsume the most
+            queue: List[int] = sorted(set(self._queue),
+                                      key=lambda i: len(self.clauses[i] or ()))
+            self._queue = []
+            for index in queue:
+                self._backward(index)
+                if not self.ok:
+                    break
+        return self._propagate()
+
+    # --- Bounded variable elimination --------------------------------------
+
+    def _eliminate(self, var: int) -> bool:
+        """Try to eliminate ``var``; returns True if it was eliminated."""
+        pos: List[int] = list(self.occurrences[_index(var)])
+        neg: List[int] = list(self.occurrences[_index(-var)])
+        if len(pos) > self.max_occurrences and len(neg) > self.max_occurrences:
+            return False
+        limit: int = len(pos) + len(neg) + self.grow
+        resolvents: List[List[int]] = []
+        for p in pos:
+            for n in neg:
+                resolvent: Optional[List[int]] = self._resolve(self.clauses[p], self.clauses[n], var)
+                if resolvent is None:
+                    continue
+                if len(resolvent) > self.max_resolvent or len(resolvents) >= limit:
+                    return False
+                resolvents.append(resolvent)
+
+        # Keep the clauses of the smaller side for model reconstruction
+        side, pivot = (pos, var) if len(pos) <= len(neg) else (neg, -var)
+        self.stack.append((pivot, [list(self.clauses[i]) for i in side]))  # type: ignore
+        for index in pos + neg:
+            self._remove(index)
+        self.eliminated[var] = True
+        self.eliminated_vars += 1
+        for resolvent in resolvents:
+            self._add(resolvent)
+            if not self.ok:
+                break
+        return True
+
+    @staticmethod
+    def _resolve(c: Optional[List[int]], d: Optional[List[int]], var: int) -> Optional[List[int]]:
+        """Resolvent of c and d on var, or None if it is a tautology."""
+        assert c is not None and d is not None
+        literals: Set[int] = {lit for lit in c if lit != var}
+        for lit in d:
+            if lit == -var:
+                continue
+            if -lit in literals:
+                return None
+            literals.add(lit)
+        return sorted(literals, key=abs)
+
+    def _elimination(self) -> bool:
+        occurrences: List[Set[int]] = self.occurrences
+        candidates: List[int] = [var for var in range(1, self.num_vars + 1)
+                                 if var not in self.frozen and not self.value[var]]
+        candidates.sort(key=lambda v: len(occurrences[2 * v]) * len(occurrences[2 * v + 1]))
+        for var in candidates:
+            if self.value[var] or self.eliminated[var]:
+                continue
+            if not occurrences[2 * var] and not occurrences[2 * var + 1]:
+                continue
+            if self._eliminate(var) and not self._subsumption():
+                return False
+        return self.ok
+
+    # --- Public interface ------------------------------------------------
+
+    def simplify(self, eliminate: bool = True) -> bool:
+        """
+        Run unit propagation, subsumption, strengthening and (optionally)
+        bounded variable elimination.
+
+        Args:
+            eliminate: Also run bounded variable elimination
+
+        Returns:
+            False if the formula was found unsatisfiable, True otherwise
+        """
+        if self.ok and self._subsumption() and eliminate:
+            self._elimination()
+        return self.ok
+
+    def simplified_clauses(self) -> List[List[int]]:
+        """
+        Return the simplified formula.
+
+        Returns:
+            The remaining clauses, plus a unit clause for every fixed frozen
+            variable; a single empty clause if the formula is unsatisfiable
+        """
+        if not self.ok:
+            return [[]]
+        clauses: List[List[int]] = [list(clause) for clause in self.clauses if clause is not None]
+        for var in sorted(self.frozen):
+            if var <= self.num_vars and self.value[var]:
+                clauses.append([var if self.value[var] > 0 else -var])
+        return clauses
+
+    def extend_model(self, model: Dict[int, bool]) -> Dict[int, bool]:
+        """
+        Extend a model of the simplified formula to a model of the original one.
+
+        Args:
+            model: Values of the variables (those missing default to False)
+
+        Returns:
+            A new model assigning every variable of the original formula
+        """
+        extended: Dict[int, bool] = {var: model.get(var, False) for var in range(1, self.num_vars + 1)}
+        for pivot, clauses in reversed(self.stack):
+            var: int = abs(pivot)
+            extended[var] = pivot < 0
+            for clause in clauses:
+                if not any(extended[abs(lit)] == (lit > 0) for lit in clause if lit != pivot):
+                    extended[var] = pivot > 0
+                    break
+        return extended
+
+
+def simplify_cnf(num_vars: int, clauses: Iterable[List[int]], frozen: Iterable[int] = (),
+                 eliminate: bool = True) -> Tuple[List[List[int]], Simplifier]:
+    """
+    Simplify a CNF formula.
+
+    Args:
+        num_vars: Number of variables of the formula
+        clauses: The clauses, lists of non-zero DIMACS literals
+        frozen: Variables that must not be eliminated
+        eliminate: Also run bounded variable elimination
+
+    Returns:
+        A tuple (simplified clauses, simplifier); use ``simplifier.extend_model``
+        to rebuild a model of the original formula
+    """
+    simplifier: Simplifier = Simplifier(num_vars, clauses, frozen)
+    simplifier.simplify(eliminate)
+    return simplifier.simplified_clauses(), simplifier
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from Module.SatSolver import SatSolver
+
+    parser = argparse.ArgumentParser(description="Simplify a DIMACS CNF file.")
+    parser.add_argument("input", help="DIMACS CNF file to simplify")
+    parser.add_argument("output", help="simplified DIMACS CNF file")
+    parser.add_argument("--no-elimination", action="store_true",
+                        help="skip bounded variable elimination")
+    args = parser.parse_args(argv)
+
+    solver: SatSolver = SatSolver()
+    solver.parse_dimacs_bulk(args.input)
+    clauses, simplifier = simplify_cnf(solver.num_vars, solver.iter_clauses(),
+                                       eliminate=not args.no_elimination)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(f"p cnf {simplifier.num_vars} {len(clauses)}\n")
+        for clause in clauses:
+            f.write(" ".join(map(str, clause)) + " 0\n")
+    print(f"{sum(1 for _ in solver.iter_clauses())} -> {len(clauses)} clauses, "
+          f"{simplifier.fixed} fixed, {simplifier.eliminated_vars} eliminated, "
+          f"{simplifier.subsumed} subsumed, {simplifier.strengthened} strengthened",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Solver Statistics Module
+
+SolverStats is the structured view of a solve: search counters (decisions,
+propagations, conflicts, restarts, learned clauses) and the time spent in
+each phase (parsing, encoding, propagation, branching, conflict analysis).
+SatSolver exposes the statistics of its last solve as ``SatSolver.stats``;
+CdclSolver keeps cumulative counters and returns snapshots that can be
+subtracted to get the cost of a single call.
+
+A progress callback receives a snapshot every N conflicts and can stop the
+search early by returning False.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Search counters, in as_dict order
+COUNTERS: Tuple[str, ...] = ("decisions", "propagations", "conflicts", "restarts", "learned")
+# Phase timings in seconds, in as_dict order
+TIMERS: Tuple[str, ...] = ("parse_time", "encode_time", "propagate_time", "branch_time",
+                           "analyze_time", "solve_time")
+
+# Called with the current statistics; returning False aborts the search
+ProgressCallback = Callable[["SolverStats"], Optional[bool]]
+
+
+class SolverStats:
+    """
+    Counters and phase timings of a solve.
+    """
+    __slots__ = COUNTERS + TIMERS
+
+    def __init__(self, **values: float) -> None:
+        """
+        Args:
+            **values: Initial values of counters and timers (zero otherwise)
+
+        Raises:
+            TypeError: If a name is neither a counter nor a timer
+        """
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        for name in TIMERS:
+            setattr(self, name, 0.0)
+        for name, value in values.items():
+            if name not in self.__slots__:
+                raise TypeError(f"Unknown statistic: {name}")
+            setattr(self, name, value)
+
+    def __sub__(self, other: "SolverStats") -> "SolverStats":
+        """Difference of two snapshots of the same solver, field by field."""
+        return SolverStats(**{name: getattr(self, name) - getattr(other, name)
+                              for name in self.__slots__})
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.as_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        fields: str = ", ".join(f"{name}={getattr(self, name)}" for name in COUNTERS)
+        return f"SolverStats({fields}, solve_time={self.solve_time:.6f})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-friendly dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
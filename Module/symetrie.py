@@ -0,0 +1,244 @@
+"""
+Canonicalisation des grilles NoriNori et mémorisation des solutions.
+
+Deux grilles qui ne diffèrent que par une rotation, une symétrie ou une
+renumérotation des régions ont les mêmes solutions, à la transformation près.
+Ce module calcule une forme canonique :
+
+1. les cellules sont réordonnées selon l'une des symétries du rectangle (les
+   8 symétries du carré si la grille est carrée, sinon les 4 qui conservent
+   ses dimensions) ;
+2. les régions sont renumérotées 1, 2, ... par ordre de première apparition
+   (ligne par ligne) ;
+3. la plus petite des formes obtenues (ordre lexicographique) est retenue.
+
+MemoSolutions associe ensuite une forme canonique à sa solution, et ramène
+celle-ci dans l'orientation de la grille demandée.
+"""
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import struct
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cardinalite import ENCODAGE_PAR_DEFAUT
+
+# Noms des symétries, dans l'ordre de symetries()
+NOMS_SYMETRIES: Tuple[str, ...] = ("identite", "rotation90", "rotation180", "rotation270",
+                                   "miroir_horizontal", "miroir_vertical",
+                                   "transposition", "antitransposition")
+
+# Préfixe des clés canoniques : hauteur et largeur de la forme canonique
+_DIMENSIONS = struct.Struct('<HH')
+
+
+def symetries(height: int, width: int) -> List[Tuple[int, int, int, array]]:
+    """
+    Énumère les symétries applicables à une grille height x width.
+
+    Args:
+        height: Hauteur de la grille
+        width: Largeur de la grille
+
+    Returns:
+        Une liste de (indice dans NOMS_SYMETRIES, hauteur et largeur de l'image,
+        permutation) où ``permutation[j]`` est l'indice plat, dans la grille
+        d'origine, de la cellule j de l'image
+    """
+    # (r, c) de l'image -> (r, c) d'origine ; h, w : dimensions de l'image
+    def rot90(r: int, c: int) -> Tuple[int, int]: return height - 1 - c, r
+    def rot180(r: int, c: int) -> Tuple[int, int]: return height - 1 - r, width - 1 - c
+    def rot270(r: int, c: int) -> Tuple[int, int]: return c, width - 1 - r
+    def miroir_h(r: int, c: int) -> Tuple[int, int]: return r, width - 1 - c
+    def miroir_v(r: int, c: int) -> Tuple[int, int]: return height - 1 - r, c
+    def transp(r: int, c: int) -> Tuple[int, int]: return c, r
+    def antitransp(r: int, c: int) -> Tuple[int, int]: return width - 1 - c, height - 1 - r
+
+    candidates = [(0, height, width, lambda r, c: (r, c)),
+                  (2, height, width, rot180),
+                  (4, height, width, miroir_h),
+                  (5, height, width, miroir_v)]
+    if height == width:
+        candidates += [(1, width, height, rot90), (3, width, height, rot270),
+                       (6, width, height, transp), (7, width, height, antitransp)]
+        candidates.sort(key=lambda candidate: candidate[0])
+
+    resultat: List[Tuple[int, int, int, array]] = []
+    for indice, h, w, origine in candidates:
+        permutation: array = array('I')
+        for r in range(h):
+            for c in range(w):
+                r0, c0 = origine(r, c)
+                permutation.append(r0 * width + c0)
+        resultat.append((indice, h, w, permutation))
+    return resultat
+
+
+def _renumeroter(regions: Sequence[int]) -> array:
+    """Renumérote les régions 1, 2, ... par ordre de première apparition."""
+    etiquettes: Dict[int, int] = {}
+    # Les étiquettes ne dépassent pas le nombre de cellules
+    code: str = 'H' if len(regions) <= 0xFFFF else 'I'
+    return array(code, (etiquettes.setdefault(region, len(etiquettes) + 1) for region in regions))
+
+
+class FormeCanonique:
+    """
+    Forme canonique d'une grille et transformation qui y mène.
+    """
+    def __init__(self, grille: NoriGrid) -> None:
+        """
+        Args:
+            grille: La grille à canonicaliser
+        """
+        cellules: array = grille.cell_regions()
+        meilleure: Optional[Tuple[bytes, int, int, int, array, array]] = None
+        for indice, h, w, permutation in symetries(grille.height, grille.width):
+            image: array = _renumeroter([cellules[i] for i in permutation])
+            cle: bytes = _DIMENSIONS.pack(h, w) + image.tobytes()
+            if meilleure is None or (h, w, image) < (meilleure[2], meilleure[3], meilleure[5]):
+                meilleure = (cle, indice, h, w, permutation, image)
+        assert meilleure is not None
+        self.cle: bytes
+        self.symetrie: int
+        self.height: int
+        self.width: int
+        self.permutation: array
+        self.cellules: array
+        self.cle, self.symetrie, self.height, self.width, self.permutation, self.cellules = meilleure
+
+    @property
+    def nom_symetrie(self) -> str:
+        """Le nom de la symétrie appliquée (voir NOMS_SYMETRIES)."""
+        return NOMS_SYMETRIES[self.symetrie]
+
+    def grille(self) -> NoriGrid:
+        """Construit la grille canonique."""
+        w: int = self.width
+        return NoriGrid.from_grid([self.cellules[i * w:(i + 1) * w].tolist()
+                                   for i in range(self.height)])
+
+    def vers_origine(self, cellules: Sequence[int]) -> List[int]:
+        """
+        Ramène des indices plats de cellules de la grille canonique dans la grille d'origine.
+
+        Args:
+            cellules: Indices plats ``row * width + col`` dans la grille canonique
+
+        Returns:
+            Les indices plats correspondants dans la grille d'origine, triés
+        """
+        return sorted(self.permutation[j] for j in cellules)
+
+    def vers_canonique(self, cellules: Sequence[int]) -> List[int]:
+        """
+        Transporte des indices plats de cellules de la grille d'origine vers la grille canonique.
+
+        Args:
+            cellules: Indices plats ``row * width + col`` dans la grille d'origine
+
+        Returns:
+            Les indices plats correspondants dans la grille canonique, triés
+        """
+        position: Dict[int, int] = {i: j for j, i in enumerate(self.permutation)}
+        return sorted(position[i] for i in cellules)
+
+
+class MemoSolutions:
+    """
+    Table forme canonique -> solution, bornée (les entrées les moins
+    récemment utilisées sont oubliées en premier).
+    """
+    def __init__(self, taille_max: Optional[int] = None) -> None:
+        """
+        Args:
+            taille_max: Nombre maximal de formes mémorisées (illimité si None)
+        """
+        self.taille_max: Optional[int] = taille_max
+        # Valeur : cellules colorées de la grille canonique, ou None si sans solution
+        self.table: "OrderedDict[bytes, Optional[Tuple[int, ...]]]" = OrderedDict()
+        # Identifiant de la grille résolue pour chaque forme, quand il est connu
+        self.origines: Dict[bytes, str] = {}
+        self.succes: int = 0
+        self.echecs: int = 0
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def chercher(self, forme: FormeCanonique) -> Tuple[bool, Optional[List[int]]]:
+        """
+        Cherche la solution mémorisée d'une forme canonique.
+
+        Args:
+            forme: La forme canonique de la grille
+
+        Returns:
+            Un couple (trouvée, cellules colorées dans la grille d'origine ou
+            None si la grille n'a pas de solution)
+        """
+        if forme.cle not in self.table:
+            self.echecs += 1
+            return False, None
+        self.succes += 1
+        self.table.move_to_end(forme.cle)
+        solution: Optional[Tuple[int, ...]] = self.table[forme.cle]
+        return True, None if solution is None else forme.vers_origine(solution)
+
+    def origine(self, forme: FormeCanonique) -> Optional[str]:
+        """Retourne l'identifiant de la grille dont la solution a été mémorisée pour cette forme."""
+        return self.origines.get(forme.cle)
+
+    def memoriser(self, forme: FormeCanonique, colorees: Optional[Sequence[int]],
+                  origine: Optional[str] = None) -> None:
+        """
+        Mémorise la solution d'une grille.
+
+        Args:
+            forme: La forme canonique de la grille
+            colorees: Les cellules colorées dans la grille d'origine, ou None
+                si la grille n'a pas de solution
+            origine: Identifiant de la grille résolue (voir ``origine``)
+        """
+        self.table[forme.cle] = None if colorees is None else tuple(forme.vers_canonique(colorees))
+        self.table.move_to_end(forme.cle)
+        if origine is not None:
+            self.origines[forme.cle] = origine
+        if self.taille_max is not None and len(self.table) > self.taille_max:
+            cle, _ = self.table.popitem(last=False)
+            self.origines.pop(cle, None)
+
+    def resoudre(self, grille: NoriGrid, encodage: str = ENCODAGE_PAR_DEFAUT,
+                 solveur: Optional[SatSolver] = None,
+                 time_limit: Optional[float] = None) -> Optional[List[int]]:
+        """
+        Résout une grille, en réutilisant la solution d'une grille équivalente si possible.
+
+        Args:
+            grille: La grille à résoudre
+            encodage: L'encodage de cardinalité utilisé pour la première règle
+            solveur: Le solveur à utiliser (un SatSolver par défaut) ; son
+                ``status`` est mis à jour, y compris lorsque la solution est mémorisée
+            time_limit: Budget optionnel en secondes ; un résultat inconnu n'est pas mémorisé
+
+        Returns:
+            Les indices plats des cellules colorées, ou None si la grille n'a pas
+            de solution (ou si le budget est épuisé)
+        """
+        solveur = solveur if solveur is not None else SatSolver()
+        forme: FormeCanonique = FormeCanonique(grille)
+        trouvee, colorees = self.chercher(forme)
+        if trouvee:
+            solveur.status = "UNSAT" if colorees is None else "SAT"
+            return colorees
+
+        # La grille est résolue telle quelle : la forme canonique ne sert que de clé
+        modele: Optional[Dict[int, bool]] = solveur.solve_grid(grille, encodage,
+                                                               time_limit=time_limit)
+        if solveur.status == "UNKNOWN":
+            return None
+        colorees = None
+        if modele is not None:
+            colorees = [i for i in range(grille.width * grille.height) if modele[i + 1]]
+        self.memoriser(forme, colorees)
+        return colorees
@@ -0,0 +1,189 @@
+"""
+Vérification vectorisée de solutions NoriNori avec NumPy.
+
+Un lot de grilles de même taille et leurs solutions sont empilés en deux
+tableaux (lot, hauteur, largeur) : les identifiants de régions et les
+cellules colorées. Les deux règles sont vérifiées pour tout le lot en une
+seule passe, sans boucle Python par grille ni par cellule :
+
+- « exactement 2 cellules colorées par région » : les régions de chaque
+  grille reçoivent un indice global (np.unique sur les couples grille,
+  région), puis un seul np.bincount compte les cellules colorées de toutes
+  les régions du lot ;
+- « pas de cellules colorées adjacentes » : ET entre le tableau et lui-même
+  décalé d'une colonne, puis d'une ligne.
+
+Le résultat donne, par grille, le verdict et les cellules fautives : celles
+des régions qui n'ont pas 2 cellules colorées, et les cellules colorées qui
+en touchent une autre. Ce module sert de contrôle peu coûteux après
+résolution (batch.py --verify).
+
+NumPy est nécessaire.
+"""
+from array import array
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from Module.NoriGrid import NoriGrid
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel pour le reste du paquet
+    np = None
+
+# Une solution : un modèle de SatSolver ({variable: bool}) ou les indices plats des cellules colorées
+Solution = Union[Dict[int, bool], Sequence[int]]
+
+
+def _exiger_numpy() -> None:
+    if np is None:
+        raise ImportError("La vérification vectorisée nécessite NumPy (pip install numpy)")
+
+
+class ResultatVerification:
+    """
+    Verdicts et cellules fautives d'un lot de solutions.
+    """
+    def __init__(self, valides: "np.ndarray", cellules_region: "np.ndarray",
+                 cellules_adjacentes: "np.ndarray") -> None:
+        # valides[b] : la solution b respecte les deux règles
+        self.valides: "np.ndarray" = valides
+        # cellules_region[b, r, c] : la cellule est dans une région sans exactement 2 cellules colorées
+        self.cellules_region: "np.ndarray" = cellules_region
+        # cellules_adjacentes[b, r, c] : la cellule colorée touche une autre cellule colorée
+        self.cellules_adjacentes: "np.ndarray" = cellules_adjacentes
+
+    def __len__(self) -> int:
+        return len(self.valides)
+
+    @property
+    def toutes_valides(self) -> bool:
+        """Indique si toutes les solutions du lot sont valides."""
+        return bool(self.valides.all())
+
+    def fautes(self, index: int) -> Dict[str, List[int]]:
+        """
+        Retourne les cellules fautives d'une solution du lot.
+
+        Args:
+            index: Position de la grille dans le lot
+
+        Returns:
+            Un dictionnaire {"region": ..., "adjacence": ...} d'indices plats
+            ``row * width + col`` triés
+        """
+        return {
+            "region": np.flatnonzero(self.cellules_region[index]).tolist(),
+            "adjacence": np.flatnonzero(self.cellules_adjacentes[index]).tolist(),
+        }
+
+    def as_dict(self, index: int) -> Dict[str, Any]:
+        """Retourne le verdict et les cellules fautives d'une solution, sérialisables en JSON."""
+        return {"valid": bool(self.valides[index]), **self.fautes(index)}
+
+
+def empiler(grilles: Sequence[NoriGrid],
+            solutions: Sequence[Solution]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Empile des grilles de même taille et leurs solutions.
+
+    Args:
+        grilles: Les grilles
+        solutions: Une solution par grille, modèle de SatSolver ou liste des
+            indices plats des cellules colorées
+
+    Returns:
+        Un couple (régions, colorées) de tableaux (lot, hauteur, largeur),
+        d'identifiants de régions et de booléens
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+        ValueError: Si les grilles n'ont pas toutes la même taille, ou si le
+            nombre de solutions diffère du nombre de grilles
+    """
+    _exiger_numpy()
+    if len(grilles) != len(solutions):
+        raise ValueError(f"{len(grilles)} grilles pour {len(solutions)} solutions")
+    if not grilles:
+        return np.zeros((0, 0, 0), dtype=np.uint16), np.zeros((0, 0, 0), dtype=bool)
+    height: int = grilles[0].height
+    width: int = grilles[0].width
+    if any(g.height != height or g.width != width for g in grilles):
+        raise ValueError("Les grilles d'un lot doivent avoir la même taille")
+
+    taille: int = width * height
+    cellules: List[array] = [grille.cell_regions() for grille in grilles]
+    # cell_regions passe en 32 bits au-delà de l'identifiant 65535
+    dtype: type = np.uint16 if all(c.typecode == 'H' for c in cellules) else np.uint32
+    regions: "np.ndarray" = np.empty((len(grilles), taille), dtype=dtype)
+    colorees: "np.ndarray" = np.zeros((len(grilles), taille), dtype=bool)
+    for b, (grille, solution) in enumerate(zip(grilles, solutions)):
+        regions[b] = cellules[b]
+        if isinstance(solution, dict):
+            colorees[b] = np.fromiter((solution[i + 1] for i in range(taille)), bool, taille)
+        else:
+            colorees[b, np.asarray(solution, dtype=np.intp)] = True
+    return regions.reshape(-1, height, width), colorees.reshape(-1, height, width)
+
+
+def verifier_lot(regions: "np.ndarray", colorees: "np.ndarray") -> ResultatVerification:
+    """
+    Vérifie un lot de solutions en une passe vectorisée.
+
+    Args:
+        regions: Tableau (lot, hauteur, largeur) des identifiants de régions
+        colorees: Tableau (lot, hauteur, largeur) des cellules colorées
+
+    Returns:
+        Les verdicts et les cellules fautives de chaque solution
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+        ValueError: Si les deux tableaux n'ont pas la même forme (lot, hauteur, largeur)
+    """
+    _exiger_numpy()
+    regions = np.asarray(regions)
+    colorees = np.asarray(colorees, dtype=bool)
+    if regions.ndim != 3 or regions.shape != colorees.shape:
+        raise ValueError(f"Formes incompatibles : {regions.shape} et {colorees.shape}")
+    lot: int = regions.shape[0]
+    if regions.size == 0:
+        vide: "np.ndarray" = np.zeros(regions.shape, dtype=bool)
+        return ResultatVerification(np.ones(lot, dtype=bool), vide, vide)
+
+    # Première règle : un indice global par couple (grille, région), puis un seul bincount
+    cles: "np.ndarray" = (np.arange(lot, dtype=np.int64)[:, None, None] << 32) | regions
+    _, indices = np.unique(cles.ravel(), return_inverse=True)
+    comptes: "np.ndarray" = np.bincount(indices, weights=colorees.ravel())
+    fautives: "np.ndarray" = comptes != 2
+    cellules_region: "np.ndarray" = fautives[indices].reshape(regions.shape)
+
+    # Deuxième règle : ET avec le tableau décalé d'une colonne et d'une ligne
+    horizontales: "np.ndarray" = colorees[:, :, 1:] & colorees[:, :, :-1]
+    verticales: "np.ndarray" = colorees[:, 1:, :] & colorees[:, :-1, :]
+    cellules_adjacentes: "np.ndarray" = np.zeros(regions.shape, dtype=bool)
+    cellules_adjacentes[:, :, 1:] |= horizontales
+    cellules_adjacentes[:, :, :-1] |= horizontales
+    cellules_adjacentes[:, 1:, :] |= verticales
+    cellules_adjacentes[:, :-1, :] |= verticales
+
+    valides: "np.ndarray" = ~(cellules_region.any(axis=(1, 2)) | cellules_adjacentes.any(axis=(1, 2)))
+    return ResultatVerification(valides, cellules_region, cellules_adjacentes)
+
+
+def verifier(grilles: Sequence[NoriGrid], solutions: Sequence[Solution]) -> ResultatVerification:
+    """
+    Vérifie les solutions de grilles de même taille (empiler puis verifier_lot).
+
+    Args:
+        grilles: Les grilles
+        solutions: Une solution par grille, modèle de SatSolver ou liste des
+            indices plats des cellules colorées
+
+    Returns:
+        Les verdicts et les cellules fautives de chaque solution
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+        ValueError: Si les grilles n'ont pas toutes la même taille
+    """
+    return verifier_lot(*empiler(grilles, solutions))
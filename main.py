@@ -11,15 +11,15 @@ def main():
         Nori = NoriGrid(s, s, reg)
         Nori.printGrid()
 
-        #generation du fichier dimacs
-        ecrire_dimacs(Nori, "DIMACS/clauses.cnf")
+        #generation du fichier dimacs (optionnelle, la résolution se fait en mémoire)
         ans = input("souhaiter vous voir tout les clauses pour ce terrain ?\n")
-        with open("DIMACS/clauses.cnf") as f:
-            if ans.lower() == "oui" or ans.lower()== "yes":
+        if ans.lower() == "oui" or ans.lower()== "yes":
+            ecrire_dimacs(Nori, "DIMACS/clauses.cnf")
+            with open("DIMACS/clauses.cnf", encoding="utf-8") as f:
                 print(f.read())
-            print("voici la solution au problème :")
-            s = SatSolver()
-            print(s.solve_file("DIMACS/clauses.cnf"))
+        print("voici la solution au problème :")
+        s = SatSolver()
+        print(s.solve_grid(Nori))
         ans = input("do you want another NoriNori grid ?")
         if ans.lower() == "non" or ans.lower()== "no":
             break
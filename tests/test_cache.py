@@ -0,0 +1,63 @@
+import random
+import tempfile
+import unittest
+
+from Module.DimacsGen import generer_clauses
+from Module.NoriGrid import NoriGrid
+from Module.cache import CnfCache, flatten_clauses
+from Module.regles import nombre_variables
+
+
+class CnfCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        random.seed(11)
+        self.grilles = [NoriGrid(size, size, size * size // 4) for size in (4, 6, 8)]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def put(self, cache: CnfCache, grille: NoriGrid) -> str:
+        literals, offsets = flatten_clauses(generer_clauses(grille))
+        return cache.put(grille, "sequentiel", nombre_variables(grille), literals, offsets)
+
+    def test_round_trip(self) -> None:
+        cache = CnfCache(self.directory.name)
+        for grille in self.grilles:
+            self.assertIsNone(cache.get(grille, "sequentiel"))
+            key = self.put(cache, grille)
+            model = {var: var % 3 == 0 for var in range(1, nombre_variables(grille) + 1)}
+            cache.store_result(key, "SAT", model)
+            entry = cache.get(grille, "sequentiel")
+            self.assertIsNotNone(entry)
+            self.assertEqual(entry.key, key)
+            self.assertEqual(entry.num_vars, nombre_variables(grille))
+            clauses = [entry.literals[entry.offsets[i]:entry.offsets[i + 1]].tolist()
+                       for i in range(len(entry.offsets) - 1)]
+            self.assertEqual(clauses, list(generer_clauses(grille)))
+            self.assertEqual(entry.status, "SAT")
+            self.assertEqual(entry.model, model)
+        self.assertIsNone(cache.get(self.grilles[0], "totalisateur"))
+
+    def test_overwrites_keep_the_tracked_size(self) -> None:
+        cache = CnfCache(self.directory.name)
+        for _ in range(3):
+            for grille in self.grilles:
+                key = self.put(cache, grille)
+                cache.store_result(key, "UNSAT")
+        self.assertEqual(cache._approx_size, cache.size())
+
+    def test_eviction_bound(self) -> None:
+        cache = CnfCache(self.directory.name)
+        self.put(cache, self.grilles[-1])
+        cache.max_bytes = 2 * cache.size()
+        for _ in range(4):
+            for grille in self.grilles:
+                self.put(cache, grille)
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+        self.assertIsNotNone(cache.get(self.grilles[-1], "sequentiel"))
+
+
+if __name__ == "__main__":
+    unittest.main()
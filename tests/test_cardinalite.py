@@ -0,0 +1,65 @@
+import itertools
+import unittest
+from typing import List
+
+from Module.NoriGrid import NoriGrid
+from Module.cardinalite import ENCODAGES, CompteurVariables, exactement_k
+from Module.cdcl import CdclSolver
+from Module.generateur import Generateur
+
+
+def brute_force_count(grille: NoriGrid) -> int:
+    width, height = grille.width, grille.height
+    regions = [grille.get_cell_region(r, c) for r in range(height) for c in range(width)]
+    count = 0
+    for bits in range(1 << (width * height)):
+        shaded = [bool(bits >> i & 1) for i in range(width * height)]
+        per_region = {}
+        for i, region in enumerate(regions):
+            per_region[region] = per_region.get(region, 0) + shaded[i]
+        if any(n != 2 for n in per_region.values()):
+            continue
+        if any(shaded[i] and shaded[i + 1] for i in range(len(shaded))
+               if (i + 1) % width):
+            continue
+        if any(shaded[i] and shaded[i + width] for i in range(len(shaded) - width)):
+            continue
+        count += 1
+    return count
+
+
+class ExactlyKTest(unittest.TestCase):
+
+    def test_encodings_match_the_popcount(self) -> None:
+        for encodage in ENCODAGES:
+            for n in range(1, 7):
+                for k in range(0, 4):
+                    variables: List[int] = list(range(1, n + 1))
+                    compteur = CompteurVariables(n + 1)
+                    clauses = exactement_k(variables, k, compteur, encodage)
+                    solver = CdclSolver(compteur.prochaine - 1)
+                    consistent = all(solver.add_clause(clause) for clause in clauses)
+                    for values in itertools.product((False, True), repeat=n):
+                        with self.subTest(encodage=encodage, n=n, k=k, values=values):
+                            expected = sum(values) == k
+                            assumptions = [v if value else -v for v, value in zip(variables, values)]
+                            self.assertEqual(consistent and solver.solve(assumptions=assumptions),
+                                             expected)
+
+    def test_grid_solution_counts(self) -> None:
+        grids = [NoriGrid.from_grid([[1, 1, 2, 2], [1, 1, 2, 2], [3, 3, 3, 3]]),
+                 NoriGrid.from_grid([[1, 1, 1, 2], [3, 1, 2, 2], [3, 3, 4, 2], [3, 4, 4, 4]])]
+        for seed in range(3):
+            generateur = Generateur(4, 4, graine=seed)
+            regions, colorees = generateur.planter()
+            generateur.grandir(regions, colorees)
+            grids.append(generateur._grille(regions))
+        for grille in grids:
+            expected = brute_force_count(grille)
+            for encodage in ENCODAGES:
+                with self.subTest(grid=grille.grid, encodage=encodage):
+                    self.assertEqual(grille.count_solutions(None, encodage), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
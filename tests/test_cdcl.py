@@ -0,0 +1,117 @@
+import itertools
+import random
+import unittest
+from typing import List
+
+from Module.cdcl import RESTARTS, CdclSolver
+from Module.heuristics import HEURISTICS
+
+
+def random_3sat(rng: random.Random, num_vars: int, num_clauses: int) -> List[List[int]]:
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), 3)]
+            for _ in range(num_clauses)]
+
+
+def brute_force_sat(num_vars: int, clauses: List[List[int]]) -> bool:
+    for values in itertools.product((False, True), repeat=num_vars):
+        if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses):
+            return True
+    return False
+
+
+def pigeonhole(holes: int) -> List[List[int]]:
+    def var(p: int, h: int) -> int:
+        return p * holes + h + 1
+
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    for h in range(holes):
+        for p, q in itertools.combinations(range(holes + 1), 2):
+            clauses.append([-var(p, h), -var(q, h)])
+    return clauses
+
+
+def make_solver(num_vars: int, clauses: List[List[int]], **options) -> CdclSolver:
+    solver = CdclSolver(num_vars, **options)
+    for clause in clauses:
+        solver.add_clause(clause)
+    return solver
+
+
+class SearchTest(unittest.TestCase):
+
+    def test_random_formulas_match_brute_force(self) -> None:
+        rng = random.Random(0)
+        for index in range(60):
+            clauses = random_3sat(rng, 10, rng.randint(30, 55))
+            expected = brute_force_sat(10, clauses)
+            for heuristic in [h for h in HEURISTICS if h != "region"]:
+                with self.subTest(index=index, heuristic=heuristic):
+                    solver = make_solver(10, clauses, heuristic=heuristic, seed=index)
+                    self.assertEqual(solver.solve(), expected)
+                    if expected:
+                        model = solver.model()
+                        self.assertTrue(all(any(model[abs(lit)] == (lit > 0) for lit in clause)
+                                            for clause in clauses))
+
+    def test_pigeonhole_is_unsatisfiable(self) -> None:
+        for holes in range(1, 6):
+            with self.subTest(holes=holes):
+                self.assertFalse(make_solver(holes * (holes + 1), pigeonhole(holes)).solve())
+
+    def test_restarts_and_reduction(self) -> None:
+        # Unsatisfiable, and long enough for glucose restarts to trigger
+        clauses = random_3sat(random.Random(1), 100, 430)
+        for restarts in RESTARTS:
+            with self.subTest(restarts=restarts):
+                solver = make_solver(100, clauses, restarts=restarts, restart_base=2,
+                                     reduce_interval=20, reduce_increment=5)
+                self.assertFalse(solver.solve())
+                self.assertEqual(solver.restarts > 0, restarts != "none")
+                self.assertGreater(solver.next_reduce, 20)
+                self.assertLess(len(solver.learnts), solver.learned)
+
+    def test_satisfiable_with_restarts_and_reduction(self) -> None:
+        rng = random.Random(1)
+        clauses = random_3sat(rng, 60, 240)
+        solver = make_solver(60, clauses, restarts="luby", restart_base=1, reduce_interval=10,
+                             reduce_increment=2, heuristic="vsids", seed=1)
+        self.assertTrue(solver.solve())
+        model = solver.model()
+        self.assertTrue(all(any(model[abs(lit)] == (lit > 0) for lit in clause)
+                            for clause in clauses))
+
+
+class FailedAssumptionsTest(unittest.TestCase):
+
+    def test_contradictory_assumptions(self) -> None:
+        solver = CdclSolver(1)
+        self.assertFalse(solver.solve(assumptions=[1, -1]))
+        self.assertEqual(sorted(solver.failed_assumptions), [-1, 1])
+
+    def test_assumptions_excluded_by_a_clause(self) -> None:
+        solver = CdclSolver(2)
+        solver.add_clause([-1, -2])
+        self.assertFalse(solver.solve(assumptions=[1, 2]))
+        self.assertEqual(sorted(solver.failed_assumptions), [1, 2])
+        self.assertTrue(solver.solve(assumptions=[1]))
+
+
+class ProgressTest(unittest.TestCase):
+
+    def test_zero_interval_is_rejected(self) -> None:
+        solver = CdclSolver(2)
+        solver.add_clause([1, 2])
+        with self.assertRaises(ValueError):
+            solver.solve(progress=lambda stats: True, progress_interval=0)
+
+    def test_phase_timings_are_opt_in(self) -> None:
+        for timings in (False, True):
+            solver = CdclSolver(3, timings=timings)
+            solver.add_clause([1, 2, 3])
+            solver.add_clause([-1, -2])
+            self.assertTrue(solver.solve())
+            self.assertEqual(solver.statistics().branch_time > 0, timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import random
+import tempfile
+import unittest
+
+from Module.NoriGrid import NoriGrid
+from Module.corpus import CorpusReader, CorpusWriter, write_corpus
+
+
+class CorpusTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "grids.ncrp")
+        random.seed(5)
+        self.grilles = [NoriGrid(w, h, w * h // 4) for w, h in ((4, 4), (6, 6), (10, 10))]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip_with_solutions(self) -> None:
+        solutions = [[0, 5, 15], {var: var in (2, 9) for var in range(1, 37)}, None]
+        self.assertEqual(write_corpus(self.path, zip(self.grilles, solutions), solutions=True), 3)
+        with CorpusReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertTrue(reader.has_solutions)
+            self.assertEqual([g.grid for g in reader], [g.grid for g in self.grilles])
+            self.assertEqual(reader.dimensions(-1), (10, 10))
+            self.assertEqual(reader.grid_bytes(1), self.grilles[1].to_bytes())
+            self.assertEqual(reader.solution(0), [0, 5, 15])
+            self.assertEqual(reader.solution(1), [1, 8])
+            self.assertIsNone(reader.solution(2))
+            with self.assertRaises(IndexError):
+                reader[3]
+
+    def test_round_trip_without_solutions(self) -> None:
+        write_corpus(self.path, ((g, None) for g in self.grilles))
+        with CorpusReader(self.path) as reader:
+            self.assertFalse(reader.has_solutions)
+            self.assertEqual(reader[1].grid, self.grilles[1].grid)
+            self.assertIsNone(reader.solution(1))
+
+    def test_file_mode_follows_the_umask(self) -> None:
+        previous = os.umask(0o027)
+        try:
+            write_corpus(self.path, [(self.grilles[0], None)])
+        finally:
+            os.umask(previous)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+        self.assertEqual(os.listdir(self.directory.name), ["grids.ncrp"])
+
+    def test_failed_write_leaves_nothing(self) -> None:
+        with self.assertRaises(ValueError):
+            with CorpusWriter(self.path, solutions=True) as writer:
+                writer.add(self.grilles[0], [0])
+                writer.add(self.grilles[0], [16])
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_region_ids_above_16_bits_are_rejected(self) -> None:
+        with CorpusWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.add(NoriGrid.from_grid([[70000, 70000]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
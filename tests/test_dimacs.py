@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+from typing import List
+from unittest import mock
+
+import Module.SatSolver as sat_solver_module
+from Module.DimacsGen import ecrire_dimacs
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+
+IRREGULAR = """c a comment
+p cnf 5 4
+1 -2 0
+c a comment between clauses
+3   4 -5 0 0
+2 0
+-1 -3 5
+"""
+
+
+class BulkParserTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".cnf")
+        os.close(fd)
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def write(self, text: str) -> None:
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def assert_same_clauses(self) -> None:
+        text = SatSolver()
+        text.parse_dimacs(self.path)
+        expected: List[List[int]] = text.clauses
+        for numpy in (True, False):
+            with self.subTest(numpy=numpy):
+                bulk = SatSolver()
+                if numpy:
+                    bulk.parse_dimacs_bulk(self.path)
+                else:
+                    with mock.patch.object(sat_solver_module, 'np', None):
+                        bulk.parse_dimacs_bulk(self.path)
+                self.assertEqual(bulk.num_vars, text.num_vars)
+                self.assertEqual(list(bulk.iter_clauses()), expected)
+
+    def test_irregular_layout(self) -> None:
+        self.write(IRREGULAR)
+        self.assert_same_clauses()
+
+    def test_grid_files(self) -> None:
+        random.seed(3)
+        for size in (4, 6, 8):
+            ecrire_dimacs(NoriGrid(size, size), self.path)
+            self.assert_same_clauses()
+
+    def test_empty_file(self) -> None:
+        self.write("")
+        for parse in (SatSolver().parse_dimacs, SatSolver().parse_dimacs_bulk):
+            with self.assertRaisesRegex(ValueError, "problem specification line"):
+                parse(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import io
+import random
+import unittest
+from typing import List
+
+from Module.DimacsGen import generer_clauses, generer_dimacs
+from Module.NoriGrid import NoriGrid
+from Module.cardinalite import ENCODAGES
+from Module.encodage_vectorise import (ecrire_dimacs_vectorise, encoder_grille,
+                                       generer_dimacs_vectorise, numpy_disponible)
+from Module.generateur import Generateur
+from Module.regles import nombre_variables
+
+
+def sample_grids() -> List[NoriGrid]:
+    random.seed(0)
+    grids = [NoriGrid.from_grid([[1, 1, 2], [3, 3, 2], [3, 4, 4]]),
+             NoriGrid.from_grid([[1, 1, 1, 1, 2, 2, 2], [3, 3, 3, 3, 3, 3, 2]])]
+    grids += [NoriGrid(size, size, size * size // 4) for size in (4, 6, 9)]
+    for size in (5, 8):
+        generateur = Generateur(size + 2, size, graine=size)
+        regions, colorees = generateur.planter()
+        generateur.grandir(regions, colorees)
+        grids.append(generateur._grille(regions))
+    return grids
+
+
+@unittest.skipUnless(numpy_disponible(), "NumPy is not installed")
+class EncodageVectoriseTest(unittest.TestCase):
+
+    def test_same_clauses_as_dimacsgen(self) -> None:
+        for grille in sample_grids():
+            for encodage in ENCODAGES:
+                with self.subTest(grid=grille.grid, encodage=encodage):
+                    num_vars, litteraux, decalages = encoder_grille(grille, encodage)
+                    clauses = [litteraux[decalages[i]:decalages[i + 1]].tolist()
+                               for i in range(len(decalages) - 1)]
+                    self.assertEqual(num_vars, nombre_variables(grille, encodage))
+                    self.assertEqual(clauses, list(generer_clauses(grille, encodage)))
+
+    def test_same_dimacs_text(self) -> None:
+        for grille in sample_grids():
+            for encodage in ENCODAGES:
+                with self.subTest(grid=grille.grid, encodage=encodage):
+                    expected = generer_dimacs(grille, encodage)
+                    self.assertEqual(generer_dimacs_vectorise(grille, encodage), expected)
+                    buffer = io.StringIO()
+                    ecrire_dimacs_vectorise(grille, buffer, encodage, taille_lot=7)
+                    self.assertEqual(buffer.getvalue(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
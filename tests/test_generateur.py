@@ -0,0 +1,42 @@
+import unittest
+from typing import List
+
+from Module.NoriGrid import NoriGrid
+from Module.generateur import Generateur
+
+
+def follows_rules(grille: NoriGrid, shaded: List[int]) -> bool:
+    width = grille.width
+    cells = set(shaded)
+    for _, region in grille.iter_regions():
+        if sum(r * width + c in cells for r, c in region) != 2:
+            return False
+    for i in cells:
+        r, c = divmod(i, width)
+        neighbors = [(r + dr) * width + c + dc for dr, dc in ((0, 1), (0, -1), (1, 0), (-1, 0))
+                     if 0 <= r + dr < grille.height and 0 <= c + dc < width]
+        if any(v in cells for v in neighbors):
+            return False
+    return True
+
+
+class GenerateurTest(unittest.TestCase):
+
+    def test_puzzles_are_unique(self) -> None:
+        for size in (5, 6, 8):
+            generateur = Generateur(size, size, graine=size)
+            for puzzle in generateur.generer(3):
+                with self.subTest(size=size):
+                    self.assertTrue(follows_rules(puzzle.grille, puzzle.colorees))
+                    self.assertTrue(puzzle.grille.is_unique())
+
+    def test_repairs_converge(self) -> None:
+        # Most plantings must reach uniqueness without a restart
+        generateur = Generateur(10, 10, graine=0)
+        puzzles = list(generateur.generer(10))
+        self.assertLessEqual(generateur.stats.plantations, 15)
+        self.assertLess(sum(p.reparations for p in puzzles), 10 * 10 * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from typing import Any, List, Optional
+from unittest import mock
+
+from Module.DimacsGen import generer_clauses
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cdcl import CdclSolver
+from Module.generateur import Generateur
+from Module.heuristics import RegionHeuristic
+from Module.regles import nombre_variables
+
+
+def planted_grid(size: int, seed: int) -> NoriGrid:
+    generateur = Generateur(size, size, graine=seed)
+    regions, colorees = generateur.planter()
+    generateur.grandir(regions, colorees)
+    return generateur._grille(regions)
+
+
+class CheckedRegionHeuristic(RegionHeuristic):
+    """Compares every region pick with a rescan of all the regions."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.region_picks: int = 0
+
+    def rescan(self) -> Optional[int]:
+        values: List[int] = self.solver.values
+        best: Optional[int] = None
+        best_count: int = 0
+        for cells in self.regions:
+            free = [var for var in cells if values[2 * var] == 0]
+            shaded = sum(values[2 * var] == 1 for var in cells)
+            if shaded < 2 and free and (best is None or len(free) < best_count):
+                best, best_count = free[0], len(free)
+        return best
+
+    def pick(self) -> Optional[int]:
+        expected = self.rescan()
+        var = super().pick()
+        values: List[int] = self.solver.values
+        for region, cells in enumerate(self.regions):
+            assert self._free[region] == sum(values[2 * v] == 0 for v in cells), region
+            assert self._shaded[region] == sum(values[2 * v] == 1 for v in cells), region
+        if expected is not None:
+            assert var == expected, (var, expected)
+            self.region_picks += 1
+        return var
+
+
+class RegionHeuristicTest(unittest.TestCase):
+
+    def make_solver(self, grille: NoriGrid, **options: Any) -> CdclSolver:
+        solver = CdclSolver(nombre_variables(grille), heuristic=CheckedRegionHeuristic(grille),
+                            restarts="luby", restart_base=2, **options)
+        for clause in generer_clauses(grille):
+            solver.add_clause(clause)
+        return solver
+
+    def test_picks_match_a_full_rescan(self) -> None:
+        for size, seed in ((6, 1), (10, 2), (16, 3)):
+            solver = self.make_solver(planted_grid(size, seed))
+            with self.subTest(size=size):
+                self.assertTrue(solver.solve())
+                self.assertGreater(solver.heuristic.region_picks, 0)
+
+    def test_random_decisions(self) -> None:
+        # A random decision at a backjump cut is not a counted cell
+        for seed in range(24):
+            solver = self.make_solver(planted_grid(10, seed), random_freq=0.5, seed=seed)
+            with self.subTest(seed=seed):
+                self.assertTrue(solver.solve())
+
+    def test_assumptions(self) -> None:
+        # Assumptions on an auxiliary selector variable sit at the bottom of the trail
+        for seed in range(6):
+            grille = planted_grid(8, seed)
+            solver = self.make_solver(grille)
+            selector = solver.num_vars + 1
+            cells = range(1, grille.width * grille.height + 1)
+            found = 0
+            while found < 20 and solver.solve(assumptions=[selector]):
+                model = solver.model()
+                solver.add_clause([-selector] + [-v if model[v] else v for v in cells])
+                found += 1
+            with self.subTest(seed=seed):
+                self.assertGreater(found, 0)
+
+    def test_count_models(self) -> None:
+        for seed in range(6):
+            grille = planted_grid(6, seed)
+            cells = range(1, 37)
+            reference = SatSolver()
+            reference.load_grid(grille)
+            expected = reference.count_models(cells, 30)
+            solver = SatSolver(heuristic="region")
+            solver.load_grid(grille)
+            with mock.patch("Module.heuristics.RegionHeuristic", CheckedRegionHeuristic), \
+                    self.subTest(seed=seed):
+                self.assertEqual(solver.count_models(cells, 30), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+from typing import Dict, List
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.generateur import Generateur
+from Module.moteur import MoteurNoriNori
+
+
+def sample_grids() -> List[NoriGrid]:
+    random.seed(0)
+    grids = [NoriGrid(size, size, regions)
+             for size, regions in ((4, 4), (5, 6), (5, 5), (6, 7), (6, 9)) for _ in range(3)]
+    for seed in range(3):
+        generateur = Generateur(4, 4, graine=seed)
+        regions, colorees = generateur.planter()
+        generateur.grandir(regions, colorees)
+        grids.append(generateur._grille(regions))
+        grids.append(Generateur(8, 8, graine=seed).generer_un().grille)
+    return grids
+
+
+def shaded(model: Dict[int, bool], size: int) -> frozenset:
+    return frozenset(var - 1 for var in range(1, size + 1) if model[var])
+
+
+class MoteurTest(unittest.TestCase):
+
+    def test_solutions_match_the_sat_backend(self) -> None:
+        for grille in sample_grids():
+            size = grille.width * grille.height
+            solver = SatSolver()
+            solver.load_grid(grille)
+            expected = {shaded(model, size) for model in solver.enumerate_models(range(1, size + 1))}
+            moteur = MoteurNoriNori()
+            moteur.charger(grille)
+            found = [shaded(model, size) for model in moteur.solutions()]
+            with self.subTest(grid=grille.grid):
+                self.assertEqual(len(found), len(set(found)))
+                self.assertEqual(set(found), expected)
+                self.assertEqual(moteur.status, "SAT" if expected else "UNSAT")
+
+    def test_solve_and_count(self) -> None:
+        for grille in sample_grids():
+            size = grille.width * grille.height
+            expected = grille.count_solutions(2)
+            moteur = MoteurNoriNori()
+            with self.subTest(grid=grille.grid):
+                self.assertEqual(moteur.count_solutions(grille, 2), expected)
+                model = moteur.solve_grid(grille)
+                self.assertEqual(model is None, expected == 0)
+                if model is not None:
+                    solver = SatSolver()
+                    solver.load_grid(grille)
+                    cells = [var if value else -var for var, value in model.items()]
+                    self.assertIsNotNone(solver.solve(assumptions=cells))
+                    self.assertEqual(len(model), size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from Module.NoriGrid import NoriGrid
+
+LARGE_IDS = [[70000, 70000, 70001, 70001],
+             [70002, 70002, 65535, 65535]]
+
+
+class CompactLayoutTest(unittest.TestCase):
+
+    def assert_same_grid(self, compact: NoriGrid, grille: NoriGrid) -> None:
+        self.assertEqual(compact.grid, grille.grid)
+        self.assertEqual(compact.regions, grille.regions)
+        self.assertEqual(compact.regions_plates(), grille.regions_plates())
+        for r in range(grille.height):
+            for c in range(grille.width):
+                self.assertEqual(compact.get_cell_region(r, c), grille.get_cell_region(r, c))
+
+    def test_random_grids(self) -> None:
+        random.seed(7)
+        for size in (4, 7, 12):
+            grille = NoriGrid.from_grid(NoriGrid(size, size, size * size // 4).grid)
+            compact = NoriGrid.from_grid(grille.grid, compact=True)
+            self.assertTrue(compact.is_compact)
+            self.assertEqual(compact.cell_regions().typecode, 'H')
+            self.assert_same_grid(compact, grille)
+
+    def test_region_ids_above_16_bits(self) -> None:
+        grille = NoriGrid.from_grid(LARGE_IDS)
+        compact = NoriGrid.from_grid(LARGE_IDS, compact=True)
+        self.assertEqual(compact.cell_regions().typecode, 'I')
+        self.assert_same_grid(compact, grille)
+
+    def test_bytes_round_trip(self) -> None:
+        for grid in (LARGE_IDS, [[1, 1, 2], [3, 3, 2]]):
+            for compact in (False, True):
+                grille = NoriGrid.from_grid(grid, compact)
+                self.assertEqual(NoriGrid.from_bytes(grille.to_bytes()).grid, grid)
+
+
+if __name__ == "__main__":
+    unittest.main()
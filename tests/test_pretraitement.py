@@ -0,0 +1,55 @@
+import random
+import unittest
+from typing import List
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.cardinalite import ENCODAGES
+from Module.generateur import Generateur
+from Module.pretraitement import propager
+
+
+def sample_grids() -> List[NoriGrid]:
+    random.seed(0)
+    grids = [NoriGrid(size, size, regions)
+             for size, regions in ((4, 4), (5, 6), (5, 5), (6, 7)) for _ in range(3)]
+    for seed in range(3):
+        generateur = Generateur(4, 4, graine=seed)
+        regions, colorees = generateur.planter()
+        generateur.grandir(regions, colorees)
+        grids.append(generateur._grille(regions))
+        grids.append(Generateur(6, 6, graine=seed).generer_un().grille)
+    return grids
+
+
+def solutions(grille: NoriGrid, pretraitement: bool, encodage: str = "sequentiel") -> set:
+    solver = SatSolver()
+    solver.load_grid(grille, encodage, pretraitement=pretraitement)
+    cells = range(1, grille.width * grille.height + 1)
+    return {frozenset(var - 1 for var in cells if model[var])
+            for model in solver.enumerate_models(cells)}
+
+
+class PretraitementTest(unittest.TestCase):
+
+    def test_forced_cells_hold_in_every_solution(self) -> None:
+        for grille in sample_grids():
+            resultat = propager(grille)
+            found = solutions(grille, pretraitement=False)
+            with self.subTest(grid=grille.grid):
+                if resultat.contradiction:
+                    self.assertEqual(found, set())
+                for shaded in found:
+                    self.assertTrue(shaded.issuperset(resultat.colorees))
+                    self.assertTrue(shaded.isdisjoint(resultat.blanches))
+
+    def test_reduced_encoding_keeps_the_solutions(self) -> None:
+        for grille in sample_grids():
+            expected = solutions(grille, pretraitement=False)
+            for encodage in ENCODAGES:
+                with self.subTest(grid=grille.grid, encodage=encodage):
+                    self.assertEqual(solutions(grille, True, encodage), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import itertools
+import random
+import unittest
+from typing import Dict, List
+
+from Module.SatSolver import SatSolver
+from Module.cdcl import CdclSolver
+from Module.generateur import Generateur
+from Module.simplify import Simplifier
+
+
+def satisfies(model: Dict[int, bool], clauses: List[List[int]]) -> bool:
+    return all(any(model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+
+
+def random_formula(rng: random.Random, num_vars: int) -> List[List[int]]:
+    # Mixed clause lengths, so that units, subsumption and elimination all apply
+    return [[v if rng.random() < 0.5 else -v
+             for v in rng.sample(range(1, num_vars + 1),
+                                 min(num_vars, rng.choice((1, 2, 2, 3, 3, 3, 4))))]
+            for _ in range(rng.randint(num_vars, 4 * num_vars))]
+
+
+def projections(num_vars: int, clauses: List[List[int]], frozen: List[int]) -> set:
+    """Assignments of the frozen variables that extend to a model."""
+    found = set()
+    for values in itertools.product((False, True), repeat=num_vars):
+        model = dict(zip(range(1, num_vars + 1), values))
+        if satisfies(model, clauses):
+            found.add(tuple(model[var] for var in frozen))
+    return found
+
+
+class SimplifierTest(unittest.TestCase):
+
+    def test_equisatisfiable_with_model_extension(self) -> None:
+        rng = random.Random(0)
+        for index in range(150):
+            num_vars = rng.randint(3, 10)
+            clauses = random_formula(rng, num_vars)
+            frozen = sorted(rng.sample(range(1, num_vars + 1), rng.randint(0, 3)))
+            simplifier = Simplifier(num_vars, clauses, frozen)
+            simplifier.simplify()
+            simplified = simplifier.simplified_clauses()
+            with self.subTest(index=index):
+                expected = projections(num_vars, clauses, frozen)
+                self.assertEqual(projections(num_vars, simplified, frozen), expected)
+                solver = CdclSolver(num_vars)
+                for clause in simplified:
+                    solver.add_clause(clause)
+                if solver.solve():
+                    self.assertTrue(satisfies(simplifier.extend_model(solver.model()), clauses))
+                else:
+                    self.assertEqual(expected, set())
+
+    def test_grid_solution_counts(self) -> None:
+        for seed in range(4):
+            generateur = Generateur(5, 5, graine=seed)
+            regions, colorees = generateur.planter()
+            generateur.grandir(regions, colorees)
+            grille = generateur._grille(regions)
+            cells = range(1, 26)
+            counts = []
+            for simplified in (False, True):
+                solver = SatSolver()
+                solver.load_grid(grille)
+                if simplified:
+                    solver.simplify(frozen=cells)
+                counts.append(solver.count_models(cells))
+            with self.subTest(seed=seed):
+                self.assertEqual(counts[0], counts[1])
+                solver = SatSolver()
+                solver.load_grid(grille)
+                original = [list(clause) for clause in solver.iter_clauses()]
+                solver.simplify()
+                model = solver.solve()
+                self.assertIsNotNone(model)
+                self.assertTrue(satisfies(model, original))
+
+
+if __name__ == "__main__":
+    unittest.main()
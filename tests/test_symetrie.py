@@ -0,0 +1,92 @@
+import unittest
+from typing import List
+
+from Module.NoriGrid import NoriGrid
+from Module.batch import solve_batch
+from Module.encodage_vectorise import numpy_disponible
+from Module.generateur import Generateur
+from Module.symetrie import FormeCanonique, MemoSolutions
+
+
+def planted_grid(size: int, seed: int) -> NoriGrid:
+    generateur = Generateur(size, size, graine=seed)
+    regions, colorees = generateur.planter()
+    generateur.grandir(regions, colorees)
+    return generateur._grille(regions)
+
+
+def rotated(grid: List[List[int]]) -> List[List[int]]:
+    return [list(row) for row in zip(*grid[::-1])]
+
+
+def relabeled(grid: List[List[int]]) -> List[List[int]]:
+    return [[1000 - region for region in row] for row in grid]
+
+
+class CanonicalFormTest(unittest.TestCase):
+
+    def test_symmetric_grids_share_a_key(self) -> None:
+        grid = planted_grid(6, 1).grid
+        forme = FormeCanonique(NoriGrid.from_grid(grid))
+        for variant in (rotated(grid), rotated(rotated(grid)), [row[::-1] for row in grid],
+                        relabeled(grid)):
+            self.assertEqual(FormeCanonique(NoriGrid.from_grid(variant)).cle, forme.cle)
+        self.assertNotEqual(FormeCanonique(planted_grid(6, 2)).cle, forme.cle)
+
+    def test_cell_mappings_are_inverse(self) -> None:
+        forme = FormeCanonique(NoriGrid.from_grid(rotated(planted_grid(5, 3).grid)))
+        cells = [0, 3, 7, 12, 24]
+        self.assertEqual(forme.vers_origine(forme.vers_canonique(cells)), cells)
+
+
+class MemoSolutionsTest(unittest.TestCase):
+
+    def test_solutions_are_mapped_to_each_orientation(self) -> None:
+        grid = planted_grid(6, 4).grid
+        memo = MemoSolutions()
+        shaded = memo.resoudre(NoriGrid.from_grid(grid))
+        self.assertIsNotNone(shaded)
+        turned = NoriGrid.from_grid(rotated(grid))
+        found, mapped = memo.chercher(FormeCanonique(turned))
+        self.assertTrue(found)
+        self.assertEqual(FormeCanonique(turned).vers_canonique(mapped),
+                         FormeCanonique(NoriGrid.from_grid(grid)).vers_canonique(shaded))
+
+    def test_least_recently_used_forms_are_forgotten(self) -> None:
+        formes = [FormeCanonique(planted_grid(5, seed)) for seed in range(3)]
+        memo = MemoSolutions(taille_max=2)
+        memo.memoriser(formes[0], None, "a")
+        memo.memoriser(formes[1], [0], "b")
+        self.assertTrue(memo.chercher(formes[0])[0])
+        memo.memoriser(formes[2], None, "c")
+        self.assertEqual(len(memo), 2)
+        self.assertFalse(memo.chercher(formes[1])[0])
+        self.assertIsNone(memo.origine(formes[1]))
+        self.assertEqual(memo.origine(formes[0]), "a")
+
+
+class BatchDedupeTest(unittest.TestCase):
+
+    def test_duplicates_with_a_small_memo(self) -> None:
+        grids = [planted_grid(6, 5).grid, planted_grid(6, 6).grid]
+        tasks = []
+        for index in range(8):
+            grid = grids[index % 2]
+            if index % 3 == 1:
+                grid = rotated(grid)
+            tasks.append((str(index), NoriGrid.from_grid(grid).to_bytes()))
+        verify = numpy_disponible()
+        results = list(solve_batch(tasks, workers=1, dedupe=True, verify=verify, memo_size=1))
+        self.assertEqual(sorted(result["id"] for result in results),
+                         [str(index) for index in range(8)])
+        solved = [result for result in results if "duplicate_of" not in result]
+        self.assertGreaterEqual(len(solved), 2)
+        self.assertLess(len(solved), 8)
+        for result in results:
+            self.assertEqual(result["status"], "SAT")
+            if verify:
+                self.assertTrue(result["verified"])
+
+
+if __name__ == "__main__":
+    unittest.main()
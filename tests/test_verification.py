@@ -0,0 +1,88 @@
+import random
+import unittest
+from typing import Dict, List, Set
+
+from Module.NoriGrid import NoriGrid
+from Module.SatSolver import SatSolver
+from Module.encodage_vectorise import numpy_disponible
+from Module.generateur import Generateur
+from Module.verification import verifier
+
+
+def expected_faults(grille: NoriGrid, shaded: Set[int]) -> Dict[str, List[int]]:
+    width, height = grille.width, grille.height
+    region_faults = []
+    for _, region in grille.iter_regions():
+        cells = [r * width + c for r, c in region]
+        if sum(i in shaded for i in cells) != 2:
+            region_faults += cells
+    adjacent = [i for i in shaded
+                if (i % width + 1 < width and i + 1 in shaded)
+                or (i % width > 0 and i - 1 in shaded)
+                or (i + width < width * height and i + width in shaded)
+                or i - width in shaded]
+    return {"region": sorted(region_faults), "adjacence": sorted(adjacent)}
+
+
+@unittest.skipUnless(numpy_disponible(), "NumPy is not installed")
+class VerificationTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.puzzles = list(Generateur(6, 6, graine=0).generer(3))
+
+    def test_valid_solutions(self) -> None:
+        grilles = [puzzle.grille for puzzle in self.puzzles]
+        models = [SatSolver().solve_grid(grille) for grille in grilles]
+        for solutions in (models, [puzzle.colorees for puzzle in self.puzzles]):
+            resultat = verifier(grilles, solutions)
+            self.assertTrue(resultat.toutes_valides)
+            for index in range(len(grilles)):
+                self.assertEqual(resultat.as_dict(index),
+                                 {"valid": True, "region": [], "adjacence": []})
+
+    def test_invalid_solutions(self) -> None:
+        puzzle = self.puzzles[0]
+        shaded = set(puzzle.colorees)
+        removed = shaded - {puzzle.colorees[0]}
+        free = next(i for i in range(1, 36) if i not in shaded and i - 1 in shaded and i % 6)
+        added = shaded | {free}
+        variants = [removed, added, set(), set(range(36))]
+        resultat = verifier([puzzle.grille] * len(variants), [sorted(v) for v in variants])
+        self.assertFalse(resultat.valides.any())
+        for index, variant in enumerate(variants):
+            with self.subTest(index=index):
+                self.assertEqual(resultat.fautes(index), expected_faults(puzzle.grille, variant))
+        self.assertEqual(resultat.fautes(0)["adjacence"], [])
+        self.assertIn(free, resultat.fautes(1)["adjacence"])
+
+    def test_random_shadings_match_the_rules(self) -> None:
+        rng = random.Random(0)
+        grilles = [self.puzzles[rng.randrange(3)].grille for _ in range(200)]
+        shadings = [set(rng.sample(range(36), rng.randint(0, 14))) for _ in grilles]
+        # A few valid ones in the same batch
+        grilles += [puzzle.grille for puzzle in self.puzzles]
+        shadings += [set(puzzle.colorees) for puzzle in self.puzzles]
+        resultat = verifier(grilles, [sorted(s) for s in shadings])
+        for index, (grille, shaded) in enumerate(zip(grilles, shadings)):
+            faults = expected_faults(grille, shaded)
+            with self.subTest(index=index):
+                self.assertEqual(resultat.fautes(index), faults)
+                self.assertEqual(bool(resultat.valides[index]),
+                                 not faults["region"] and not faults["adjacence"])
+
+    def test_large_region_ids(self) -> None:
+        puzzle = self.puzzles[0]
+        grille = NoriGrid.from_grid([[region + 70000 for region in row]
+                                     for row in puzzle.grille.grid])
+        self.assertTrue(verifier([grille], [puzzle.colorees]).toutes_valides)
+        self.assertFalse(verifier([grille], [puzzle.colorees[1:]]).toutes_valides)
+
+    def test_sizes_must_match(self) -> None:
+        other = Generateur(5, 5, graine=0).generer_un()
+        with self.assertRaises(ValueError):
+            verifier([self.puzzles[0].grille, other.grille],
+                     [self.puzzles[0].colorees, other.colorees])
+
+
+if __name__ == "__main__":
+    unittest.main()